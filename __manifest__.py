@@ -1,6 +1,6 @@
 {
     'name': 'Mobile Physical Inventory',
-    'version': '19.0.1.0.0',
+    'version': '19.0.1.2.0',
     'category': 'Inventory',
     'summary': 'Mobile-friendly UI for Physical Inventory (Stock Adjustment)',
     'description': """
@@ -12,12 +12,19 @@
         - Easy quantity input with +/- controls
         - Barcode scanning support
         - Search/filter by product or location
+        - Daily ABC cycle count plan (count only what is due today)
+        - Cached product thumbnails on the counting cards
+        - Compact, gzip-compressed quant listings for slow mobile links
+        - Counting walk: quants in bin walking order, next bin prefetched
     """,
     'author': 'Custom',
     'depends': ['stock'],
     'data': [
         'security/ir.model.access.csv',
+        'data/mobile_inventory_data.xml',
         'views/mobile_inventory_views.xml',
+        'views/cycle_count_views.xml',
+        'views/stock_location_views.xml',
         'views/mobile_inventory_menus.xml',
     ],
     'assets': {
@@ -1,26 +1,67 @@
-from odoo import http
+import base64
+
+from odoo import fields, http
 from odoo.http import request
 
+# Thumbnail URLs embed the source image checksum, so their content never changes
+THUMBNAIL_CACHE_CONTROL = 'private, max-age=31536000, immutable'
+
+# Compact get_quants payload: columns whose repeated strings are sent once,
+# in the named lookup table, and replaced by their index in it
+COMPACT_LOOKUPS = {
+    'location_name': 'locations',
+    'product_category': 'categories',
+    'product_uom': 'uoms',
+    'lot_name': 'lots',
+}
+
+
+def _to_columns(rows):
+    """Encode a list of same-keyed dicts as column arrays, dictionary-
+    encoding the COMPACT_LOOKUPS columns. Decoded by decodeColumns() in
+    mobile_inventory.js."""
+    columns = {key: [] for key in rows[0]} if rows else {}
+    lookups = {table: [] for table in COMPACT_LOOKUPS.values()}
+    indexes = {table: {} for table in COMPACT_LOOKUPS.values()}
+    for row in rows:
+        for key, value in row.items():
+            table = COMPACT_LOOKUPS.get(key)
+            if table:
+                if value not in indexes[table]:
+                    indexes[table][value] = len(lookups[table])
+                    lookups[table].append(value)
+                value = indexes[table][value]
+            columns[key].append(value)
+    return {'columns': columns, 'lookups': lookups, 'encoded': COMPACT_LOOKUPS}
+
 
 class MobileInventoryController(http.Controller):
 
-    @http.route('/mobile_inventory/get_quants', type='json', auth='user')
-    def get_quants(self, location_id=None, product_id=None, search='', offset=0, limit=20):
-        """Fetch stock quants for mobile inventory view."""
+    def _quant_domain(self, location_id=None, product_id=None, search='', due_today=False):
         domain = [('location_id.usage', '=', 'internal')]
-        
+        if due_today:
+            domain.append(('cycle_count_date', '<=', fields.Date.context_today(request.env.user)))
         if location_id:
             domain.append(('location_id', '=', int(location_id)))
         if product_id:
             domain.append(('product_id', '=', int(product_id)))
         if search:
             domain.append(('product_id.name', 'ilike', search))
+        return domain
 
-        quants = request.env['stock.quant'].search(
+    @http.route('/mobile_inventory/get_quants', type='json', auth='user')
+    def get_quants(self, location_id=None, product_id=None, search='', offset=0, limit=20,
+                   due_today=False, compact=False):
+        """Fetch stock quants for mobile inventory view, in counting walk order.
+        With due_today, only the quants of today's cycle count plan.
+        With compact, the quants come as columns (see _to_columns)."""
+        domain = self._quant_domain(location_id, product_id, search, due_today)
+        # Bin by bin along the counting walk, see stock.location._compute_walk_sequences
+        quants = request.env['stock.quant']._search_walk_order(
             domain, offset=int(offset), limit=int(limit),
-            order='product_id asc'
         )
         total = request.env['stock.quant'].search_count(domain)
+        thumbnails = request.env['mobile.inventory.thumbnail']._get_urls(quants.product_id.ids)
 
         result = []
         for q in quants:
@@ -55,6 +96,7 @@ class MobileInventoryController(http.Controller):
                 'product_default_code': ref_code,
                 'product_category': category,
                 'product_variant': variant_str,
+                'product_image': thumbnails.get(product.id, False),
                 'product_uom': q.product_uom_id.name,
                 'location_id': q.location_id.id,
                 'location_name': q.location_id.display_name,
@@ -65,8 +107,22 @@ class MobileInventoryController(http.Controller):
                 'inventory_date': q.inventory_date.strftime('%Y-%m-%d %H:%M:%S') if q.inventory_date else False,
             })
 
+        if compact:
+            return {**_to_columns(result), 'total': total}
         return {'quants': result, 'total': total}
 
+    @http.route('/mobile_inventory/get_walk', type='json', auth='user')
+    def get_walk(self, search='', due_today=False):
+        """Locations holding quants to count, in counting walk order, so the
+        client can step (and prefetch) bin by bin."""
+        walk = request.env['stock.quant']._get_walk(
+            self._quant_domain(search=search, due_today=due_today),
+        )
+        return [
+            {'id': location.id, 'name': location.display_name, 'count': count}
+            for location, count in walk
+        ]
+
     @http.route('/mobile_inventory/set_quantity', type='json', auth='user')
     def set_quantity(self, quant_id, quantity):
         """Set inventory quantity for a quant."""
@@ -133,3 +189,25 @@ class MobileInventoryController(http.Controller):
                 return {'success': True, 'quant_id': quant.id}
         except Exception as e:
             return {'success': False, 'error': str(e)}
+
+    @http.route('/mobile_inventory/thumbnail/<string:checksum>/<int:size>',
+                type='http', auth='user', methods=['GET'])
+    def thumbnail(self, checksum, size):
+        """Serve a pre-rendered product thumbnail (see
+        mobile.inventory.thumbnail) straight from its table."""
+        request.env.cr.execute("""
+            SELECT data, mimetype FROM mobile_inventory_thumbnail
+             WHERE checksum = %s AND size = %s AND data IS NOT NULL
+        """, [checksum, size])
+        row = request.env.cr.fetchone()
+        if not row:
+            return request.not_found()
+        data, mimetype = row
+        etag = '"%s-%s"' % (checksum, size)
+        headers = [('Cache-Control', THUMBNAIL_CACHE_CONTROL), ('ETag', etag)]
+        if request.httprequest.headers.get('If-None-Match') == etag:
+            return request.make_response(b'', headers=headers, status=304)
+        return request.make_response(
+            base64.b64decode(bytes(data)),
+            headers=headers + [('Content-Type', mimetype)],
+        )
@@ -0,0 +1,6 @@
+from . import ir_http
+from . import product
+from . import product_thumbnail
+from . import stock_cycle_count
+from . import stock_location
+from . import stock_quant
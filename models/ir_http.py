@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+import gzip
+
+from odoo import models
+from odoo.http import request
+
+# JSON routes of the counting apps (this module's and the standalone app's)
+GZIP_PATH_PREFIXES = ('/mobile_inventory/', '/inventory-count/')
+GZIP_MIN_SIZE = 1400  # bytes, about one network packet
+
+
+class IrHttp(models.AbstractModel):
+    _inherit = 'ir.http'
+
+    @classmethod
+    def _post_dispatch(cls, response):
+        super()._post_dispatch(response)
+        cls._gzip_inventory_response(response)
+
+    @classmethod
+    def _gzip_inventory_response(cls, response):
+        """Compress the JSON responses of the counting apps when the client
+        accepts gzip: quant listings are the bulk of their traffic on poor
+        mobile connections."""
+        httprequest = request.httprequest
+        if (
+            not httprequest.path.startswith(GZIP_PATH_PREFIXES)
+            or response.mimetype != 'application/json'
+            or response.direct_passthrough
+            or 'Content-Encoding' in response.headers
+            or 'gzip' not in httprequest.headers.get('Accept-Encoding', '')
+        ):
+            return
+        data = response.get_data()
+        if len(data) < GZIP_MIN_SIZE:
+            return
+        response.set_data(gzip.compress(data, compresslevel=5))
+        response.headers['Content-Encoding'] = 'gzip'
+        response.vary.add('Accept-Encoding')
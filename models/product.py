@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+from odoo import api, models
+
+
+class ProductTemplate(models.Model):
+    _inherit = 'product.template'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        templates = super().create(vals_list)
+        if any(vals.get('image_1920') for vals in vals_list):
+            self.env['mobile.inventory.thumbnail']._schedule_generation()
+        return templates
+
+    def write(self, vals):
+        res = super().write(vals)
+        if vals.get('image_1920'):
+            self.env['mobile.inventory.thumbnail']._schedule_generation()
+        return res
+
+
+class ProductProduct(models.Model):
+    _inherit = 'product.product'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        products = super().create(vals_list)
+        if any(vals.get('image_variant_1920') for vals in vals_list):
+            self.env['mobile.inventory.thumbnail']._schedule_generation()
+        return products
+
+    def write(self, vals):
+        res = super().write(vals)
+        if vals.get('image_variant_1920'):
+            self.env['mobile.inventory.thumbnail']._schedule_generation()
+        return res
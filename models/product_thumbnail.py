@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+import base64
+import io
+import logging
+
+from PIL import Image, ImageOps, features
+
+from odoo import api, fields, models
+
+_logger = logging.getLogger(__name__)
+
+THUMBNAIL_SIZES = (64, 128)  # square bounding boxes, in pixels
+DEFAULT_SIZE = 64
+THUMBNAIL_BATCH = 200  # source images per committed batch
+THUMBNAIL_FORMAT = 'WEBP' if features.check('webp') else 'JPEG'
+
+# Image attachment of each product: the variant image, else the template's
+PRODUCT_IMAGE_QUERY = """
+    SELECT p.id AS product_id,
+           COALESCE(va.checksum, ta.checksum) AS checksum,
+           COALESCE(va.id, ta.id) AS attachment_id
+      FROM product_product p
+ LEFT JOIN ir_attachment va
+        ON va.res_model = 'product.product' AND va.res_field = 'image_variant_1920'
+       AND va.res_id = p.id
+ LEFT JOIN ir_attachment ta
+        ON ta.res_model = 'product.template' AND ta.res_field = 'image_1920'
+       AND ta.res_id = p.product_tmpl_id
+"""
+
+
+class ProductThumbnail(models.Model):
+    """Small, pre-rendered product image for the counting cards.
+
+    Keyed by the checksum of the source image, so variants sharing their
+    template's image share a thumbnail and URLs never change content: the
+    thumbnail route serves them straight from this table as immutable."""
+    _name = 'mobile.inventory.thumbnail'
+    _description = 'Product Thumbnail'
+    _log_access = False
+
+    checksum = fields.Char(required=True, readonly=True)
+    size = fields.Integer(required=True, readonly=True)
+    mimetype = fields.Char(readonly=True)
+    # In the table (not the filestore): the route reads it in one query
+    data = fields.Binary(attachment=False, readonly=True)
+
+    _checksum_size_uniq = models.Constraint(
+        'UNIQUE(checksum, size)',
+        'A source image has one thumbnail per size.',
+    )
+
+    @api.model
+    def _get_urls(self, product_ids, size=DEFAULT_SIZE):
+        """Return {product_id: thumbnail URL} for the products whose
+        thumbnail of that size is ready, in one query. Images that could not
+        be rendered (stored without data) get none."""
+        if not product_ids:
+            return {}
+        self.env.cr.execute("""
+            SELECT img.product_id, img.checksum
+              FROM (%s WHERE p.id = ANY(%%s)) img
+              JOIN mobile_inventory_thumbnail thumb
+                ON thumb.checksum = img.checksum AND thumb.size = %%s
+               AND thumb.data IS NOT NULL
+        """ % PRODUCT_IMAGE_QUERY, [list(product_ids), size])
+        return {
+            product_id: '/mobile_inventory/thumbnail/%s/%s' % (checksum, size)
+            for product_id, checksum in self.env.cr.fetchall()
+        }
+
+    @api.model
+    def _render(self, raw, size):
+        """Return the thumbnail bytes of an image fitting in size x size."""
+        image = ImageOps.exif_transpose(Image.open(io.BytesIO(raw)))
+        image.thumbnail((size, size))
+        if image.mode != 'RGB':
+            # Transparent product shots go on the white of the cards
+            background = Image.new('RGB', image.size, (255, 255, 255))
+            image = image.convert('RGBA')
+            background.paste(image, mask=image.getchannel('A'))
+            image = background
+        output = io.BytesIO()
+        image.save(output, format=THUMBNAIL_FORMAT, quality=80)
+        return output.getvalue()
+
+    @api.model
+    def _generate_missing(self, limit=THUMBNAIL_BATCH):
+        """Render the thumbnails of up to `limit` source images that have
+        none yet. Returns the number of source images processed."""
+        self.flush_model()
+        self.env.cr.execute("""
+            SELECT DISTINCT ON (img.checksum) img.checksum, img.attachment_id
+              FROM (%s WHERE p.active) img
+             WHERE img.checksum IS NOT NULL
+               AND NOT EXISTS (
+                    SELECT 1 FROM mobile_inventory_thumbnail thumb
+                     WHERE thumb.checksum = img.checksum
+               )
+             LIMIT %%s
+        """ % PRODUCT_IMAGE_QUERY, [limit])
+        rows = self.env.cr.fetchall()
+        attachments = self.env['ir.attachment'].sudo().browse([att_id for _checksum, att_id in rows])
+        vals = []
+        for (checksum, _att_id), attachment in zip(rows, attachments):
+            try:
+                raw = attachment.raw
+                vals += [{
+                    'checksum': checksum,
+                    'size': size,
+                    'mimetype': 'image/%s' % THUMBNAIL_FORMAT.lower(),
+                    'data': base64.b64encode(self._render(raw, size)),
+                } for size in THUMBNAIL_SIZES]
+            except Exception:
+                # Stored anyway (empty) so a broken image is not retried forever
+                _logger.warning('Could not render a thumbnail of attachment %s', attachment.id)
+                vals += [{'checksum': checksum, 'size': size} for size in THUMBNAIL_SIZES]
+        self.create(vals)
+        return len(rows)
+
+    @api.model
+    def _schedule_generation(self):
+        cron = self.env.ref('mobile_physical_inventory.cron_generate_thumbnails', raise_if_not_found=False)
+        if cron:
+            cron._trigger()
+
+    @api.model
+    def _cron_generate_thumbnails(self):
+        """Render missing thumbnails in committed batches, then drop those
+        no product image uses any more."""
+        generated = 0
+        while True:
+            processed = self._generate_missing()
+            generated += processed
+            if not processed or not self.env['ir.cron']._commit_progress(processed):
+                break
+        self.env.cr.execute("""
+            DELETE FROM mobile_inventory_thumbnail thumb
+             WHERE NOT EXISTS (
+                    SELECT 1 FROM ir_attachment att
+                     WHERE att.checksum = thumb.checksum
+                       AND att.res_field IN ('image_1920', 'image_variant_1920')
+                       AND att.res_model IN ('product.template', 'product.product')
+             )
+        """)
+        _logger.info('Rendered thumbnails of %d product images.', generated)
@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+from collections import defaultdict
+from datetime import timedelta
+import logging
+
+from odoo import api, fields, models
+
+_logger = logging.getLogger(__name__)
+
+PARAM_PREFIX = 'mobile_physical_inventory.'
+DEFAULT_WINDOW_DAYS = 90   # movement history that ranks the products
+DEFAULT_DAILY_LIMIT = 300  # quants to count per day, 0 for no limit
+# Cumulative share of a location's turnover value covered by class A, A+B
+ABC_THRESHOLDS = (0.8, 0.95)
+DEFAULT_FREQUENCY_DAYS = {'a': 7, 'b': 30, 'c': 90}
+
+
+class CycleCountMovement(models.Model):
+    """Daily moved quantity per product and internal location.
+
+    Filled once per day from the done stock.move.line of the previous days,
+    so the classification reads a few compact rows instead of rescanning the
+    move history."""
+    _name = 'mobile.inventory.movement'
+    _description = 'Daily Product Movement'
+    _order = 'date desc, id desc'
+    _log_access = False
+
+    date = fields.Date(required=True, index=True, readonly=True)
+    product_id = fields.Many2one('product.product', required=True, ondelete='cascade', readonly=True)
+    location_id = fields.Many2one('stock.location', required=True, ondelete='cascade', readonly=True)
+    quantity = fields.Float(digits='Product Unit of Measure', readonly=True)
+
+    _location_product_idx = models.Index('(location_id, product_id)')
+
+
+class CycleCountClass(models.Model):
+    """A/B/C class of a product at an internal location and its next count.
+
+    Class A holds the products making the first 80% of the location's
+    turnover value over the movement window, B the next 15%, C the rest
+    (including products that did not move). Each class is counted at its
+    own frequency; the daily plan marks the due quants with
+    stock.quant.cycle_count_date."""
+    _name = 'mobile.inventory.abc'
+    _description = 'Cycle Count Classification'
+    _order = 'location_id, abc_class, turnover_value desc'
+    _log_access = False
+
+    product_id = fields.Many2one('product.product', required=True, ondelete='cascade', readonly=True)
+    location_id = fields.Many2one(
+        'stock.location', required=True, ondelete='cascade', index=True, readonly=True,
+    )
+    abc_class = fields.Selection(
+        [('a', 'A'), ('b', 'B'), ('c', 'C')], string='Class', required=True, readonly=True,
+    )
+    turnover_qty = fields.Float(
+        string='Moved Quantity', digits='Product Unit of Measure', readonly=True,
+    )
+    turnover_value = fields.Float(string='Moved Value', readonly=True)
+    last_counted_date = fields.Date(readonly=True)
+    next_count_date = fields.Date(index=True, readonly=True)
+
+    _product_location_uniq = models.Constraint(
+        'UNIQUE(product_id, location_id)',
+        'A product has one cycle count class per location.',
+    )
+
+    # ── Settings ─────────────────────────────────────────────
+
+    @api.model
+    def _get_param(self, key, default):
+        return int(self.env['ir.config_parameter'].sudo().get_param(PARAM_PREFIX + key, default))
+
+    @api.model
+    def _get_frequencies(self):
+        """Days between two counts, per class (system parameters
+        mobile_physical_inventory.frequency_a/_b/_c)."""
+        return {
+            abc_class: max(self._get_param('frequency_%s' % abc_class, days), 1)
+            for abc_class, days in DEFAULT_FREQUENCY_DAYS.items()
+        }
+
+    # ── Daily Planning ───────────────────────────────────────
+
+    @api.model
+    def _ingest_movements(self):
+        """Add the daily movements of the days since the last run and drop
+        those that left the window. Returns the number of rows added."""
+        ICP = self.env['ir.config_parameter'].sudo()
+        today = fields.Date.today()
+        window_start = today - timedelta(days=self._get_param('window_days', DEFAULT_WINDOW_DAYS))
+        since = fields.Date.to_date(ICP.get_param(PARAM_PREFIX + 'movements_until')) or window_start
+        since = max(since, window_start)
+        added = 0
+        if since < today:
+            self.env['stock.move.line'].flush_model()
+            self.env['stock.move'].flush_model(['is_inventory'])
+            # Inventory adjustments are corrections, not turnover
+            self.env.cr.execute("""
+                INSERT INTO mobile_inventory_movement (date, product_id, location_id, quantity)
+                SELECT ml.date::date, ml.product_id, loc.id, sum(ml.quantity_product_uom)
+                  FROM stock_move_line ml
+             LEFT JOIN stock_move move ON move.id = ml.move_id
+                  JOIN stock_location loc
+                    ON loc.id IN (ml.location_id, ml.location_dest_id)
+                   AND loc.usage = 'internal'
+                 WHERE ml.state = 'done'
+                   AND ml.date >= %(since)s
+                   AND ml.date < %(until)s
+                   AND move.is_inventory IS NOT TRUE
+              GROUP BY ml.date::date, ml.product_id, loc.id
+             RETURNING id
+            """, {'since': since, 'until': today})
+            added = len(self.env.cr.fetchall())
+            ICP.set_param(PARAM_PREFIX + 'movements_until', fields.Date.to_string(today))
+        self.env.cr.execute(
+            "DELETE FROM mobile_inventory_movement WHERE date < %s", [window_start],
+        )
+        return added
+
+    @api.model
+    def _classify(self):
+        """Rank the products of every internal location by turnover value
+        and store their class. Returns the number of classified products."""
+        window_start = fields.Date.today() - timedelta(
+            days=self._get_param('window_days', DEFAULT_WINDOW_DAYS),
+        )
+        turnover = defaultdict(dict)  # {location_id: {product_id: quantity}}
+        for location, product, quantity in self.env['mobile.inventory.movement']._read_group(
+            [('date', '>=', window_start)], ['location_id', 'product_id'], ['quantity:sum'],
+        ):
+            if location.usage == 'internal':
+                turnover[location.id][product.id] = quantity
+        # Products in stock that did not move still need counting
+        for location, product in self.env['stock.quant']._read_group(
+            [('location_id.usage', '=', 'internal')], ['location_id', 'product_id'],
+        ):
+            turnover[location.id].setdefault(product.id, 0.0)
+
+        product_ids = {pid for products in turnover.values() for pid in products}
+        prices = {
+            product.id: product.standard_price
+            for product in self.env['product.product'].with_context(active_test=False).browse(product_ids)
+        }
+        rows = {key: [] for key in ('product', 'location', 'class', 'qty', 'value')}
+        threshold_a, threshold_b = ABC_THRESHOLDS
+        for location_id, products in turnover.items():
+            ranked = sorted(
+                ((abs(qty) * prices.get(pid, 0.0), abs(qty), pid) for pid, qty in products.items()),
+                reverse=True,
+            )
+            total = sum(value for value, _qty, _pid in ranked)
+            cumulative = 0.0
+            for value, qty, pid in ranked:
+                share = cumulative / total if total else 1.0
+                if value and share < threshold_a:
+                    abc_class = 'a'
+                elif value and share < threshold_b:
+                    abc_class = 'b'
+                else:
+                    abc_class = 'c'
+                cumulative += value
+                for key, val in zip(rows, (pid, location_id, abc_class, qty, value)):
+                    rows[key].append(val)
+
+        frequencies = self._get_frequencies()
+        self.flush_model()
+        # New products are due at once (the daily limit spreads them out);
+        # known ones move to the frequency of their new class
+        self.env.cr.execute("""
+            INSERT INTO mobile_inventory_abc AS abc (
+                product_id, location_id, abc_class, turnover_qty, turnover_value, next_count_date
+            )
+            SELECT r.product_id, r.location_id, r.abc_class, r.qty, r.value, %(today)s
+              FROM unnest(%(product)s::int[], %(location)s::int[], %(class)s::varchar[],
+                          %(qty)s::float8[], %(value)s::float8[])
+                   AS r(product_id, location_id, abc_class, qty, value)
+       ON CONFLICT (product_id, location_id) DO UPDATE
+               SET abc_class = EXCLUDED.abc_class,
+                   turnover_qty = EXCLUDED.turnover_qty,
+                   turnover_value = EXCLUDED.turnover_value,
+                   next_count_date = CASE
+                       WHEN abc.last_counted_date IS NULL THEN abc.next_count_date
+                       ELSE abc.last_counted_date + CASE EXCLUDED.abc_class
+                           WHEN 'a' THEN %(freq_a)s WHEN 'b' THEN %(freq_b)s ELSE %(freq_c)s END
+                   END
+         RETURNING abc.id
+        """, {
+            **rows,
+            'today': fields.Date.today(),
+            'freq_a': frequencies['a'],
+            'freq_b': frequencies['b'],
+            'freq_c': frequencies['c'],
+        })
+        kept = [row[0] for row in self.env.cr.fetchall()]
+        # Products no longer stocked nor moved at a location
+        self.env.cr.execute("DELETE FROM mobile_inventory_abc WHERE id != ALL(%s)", [kept])
+        self.invalidate_model()
+        return len(kept)
+
+    @api.model
+    def _plan_counts(self):
+        """Mark the quants due for counting today, most important class and
+        most overdue first, up to the daily limit of quants (quants planned
+        on earlier days and not counted yet included). The lots and packages
+        of a product at a location are planned together unless the limit
+        splits them; the rest follow on the next days. Returns the number
+        marked."""
+        today = fields.Date.today()
+        Quant = self.env['stock.quant']
+        limit = self._get_param('daily_limit', DEFAULT_DAILY_LIMIT)
+        if limit:
+            limit = max(limit - Quant.search_count([('cycle_count_date', '!=', False)]), 0)
+            if not limit:
+                return 0
+        Quant.flush_model(['product_id', 'location_id', 'cycle_count_date'])
+        self.flush_model()
+        self.env.cr.execute("""
+            WITH due AS (
+                SELECT q.id
+                  FROM mobile_inventory_abc abc
+                  JOIN stock_quant q
+                    ON q.product_id = abc.product_id
+                   AND q.location_id = abc.location_id
+                 WHERE abc.next_count_date <= %(today)s
+                   AND q.cycle_count_date IS NULL
+              ORDER BY abc.abc_class, abc.next_count_date, abc.turnover_value DESC, abc.id, q.id
+                 LIMIT %(limit)s
+            )
+            UPDATE stock_quant q
+               SET cycle_count_date = %(today)s
+              FROM due
+             WHERE q.id = due.id
+         RETURNING q.id
+        """, {'today': today, 'limit': limit or None})
+        planned = Quant.browse([row[0] for row in self.env.cr.fetchall()])
+        planned.invalidate_recordset(['cycle_count_date'])
+        return len(planned)
+
+    @api.model
+    def _mark_counted(self, pairs):
+        """Schedule the next count of (product_id, location_id) pairs whose
+        inventory was just applied."""
+        if not pairs:
+            return
+        frequencies = self._get_frequencies()
+        self.flush_model()
+        self.env.cr.execute("""
+            UPDATE mobile_inventory_abc abc
+               SET last_counted_date = %(today)s,
+                   next_count_date = %(today)s::date + CASE abc.abc_class
+                       WHEN 'a' THEN %(freq_a)s WHEN 'b' THEN %(freq_b)s ELSE %(freq_c)s END
+              FROM unnest(%(product)s::int[], %(location)s::int[]) AS p(product_id, location_id)
+             WHERE abc.product_id = p.product_id
+               AND abc.location_id = p.location_id
+        """, {
+            'today': fields.Date.today(),
+            'product': [product_id for product_id, _location_id in pairs],
+            'location': [location_id for _product_id, location_id in pairs],
+            'freq_a': frequencies['a'],
+            'freq_b': frequencies['b'],
+            'freq_c': frequencies['c'],
+        })
+        self.invalidate_model(['last_counted_date', 'next_count_date'])
+
+    @api.model
+    def _cron_plan_cycle_counts(self):
+        """Daily: ingest yesterday's movements, reclassify, plan today's counts."""
+        added = self._ingest_movements()
+        classified = self._classify()
+        planned = self._plan_counts()
+        _logger.info(
+            'Cycle count plan: %d movement rows added, %d products classified, %d quants due.',
+            added, classified, planned,
+        )
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+from odoo import api, fields, models
+
+# Location changes that move a bin on the counting walk
+WALK_FIELDS = {'name', 'location_id', 'usage', 'active', 'posx', 'posy', 'posz', 'walk_import_position'}
+
+
+class StockLocation(models.Model):
+    _inherit = 'stock.location'
+
+    walk_sequence = fields.Integer(
+        string='Walk Sequence', index='btree_not_null', readonly=True, copy=False,
+        help='Position of the location on the counting walk of its warehouse, '
+             'computed by the walk planner.',
+    )
+    walk_import_position = fields.Integer(
+        string='Imported Walk Position', copy=False,
+        help='Position on an imported walking path. Locations having one are '
+             'walked first, in that order, before the others.',
+    )
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        locations = super().create(vals_list)
+        self._schedule_walk_planning()
+        return locations
+
+    def write(self, vals):
+        res = super().write(vals)
+        if WALK_FIELDS & set(vals):
+            self._schedule_walk_planning()
+        return res
+
+    @api.model
+    def _schedule_walk_planning(self):
+        cron = self.env.ref('mobile_physical_inventory.cron_plan_walk', raise_if_not_found=False)
+        if cron:
+            cron._trigger()
+
+    @api.model
+    def _compute_walk_sequences(self):
+        """Number the internal locations of each warehouse in walking order.
+
+        Locations with an imported walk position come first, in that order.
+        The others are walked aisle by aisle (posx), up one aisle and down
+        the next (posy, serpentine), bottom to top (posz); locations without
+        coordinates follow the location hierarchy (complete name).
+        Returns the number of locations renumbered."""
+        self.flush_model()
+        self.env.cr.execute("""
+            WITH located AS (
+                SELECT id, warehouse_id, walk_import_position, posx, posy, posz, complete_name,
+                       DENSE_RANK() OVER (PARTITION BY warehouse_id ORDER BY posx) AS aisle
+                  FROM stock_location
+                 WHERE usage = 'internal' AND active
+            ), walk AS (
+                SELECT id, ROW_NUMBER() OVER (
+                           PARTITION BY warehouse_id
+                           ORDER BY walk_import_position NULLS LAST,
+                                    posx,
+                                    CASE WHEN aisle %% 2 = 1 THEN posy ELSE -posy END,
+                                    posz,
+                                    complete_name,
+                                    id
+                       ) AS sequence
+                  FROM located
+            )
+            UPDATE stock_location loc
+               SET walk_sequence = walk.sequence
+              FROM walk
+             WHERE loc.id = walk.id
+               AND loc.walk_sequence IS DISTINCT FROM walk.sequence
+         RETURNING loc.id
+        """)
+        renumbered = self.browse([row[0] for row in self.env.cr.fetchall()])
+        # Archived or no longer internal locations leave the walk
+        self.env.cr.execute("""
+            UPDATE stock_location SET walk_sequence = NULL
+             WHERE walk_sequence IS NOT NULL AND (usage != 'internal' OR NOT active)
+         RETURNING id
+        """)
+        renumbered |= self.browse([row[0] for row in self.env.cr.fetchall()])
+        renumbered.invalidate_recordset(['walk_sequence'])
+        return len(renumbered)
+
+    @api.model
+    def _cron_plan_walk(self):
+        self._compute_walk_sequences()
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+from odoo import api, fields, models
+
+
+class StockQuant(models.Model):
+    _inherit = 'stock.quant'
+
+    # Set by the daily cycle count plan (mobile.inventory.abc), cleared once
+    # the count is applied
+    cycle_count_date = fields.Date(
+        string='Cycle Count Planned', index='btree_not_null', readonly=True, copy=False,
+    )
+
+    def _apply_inventory(self, *args, **kwargs):
+        pairs = list({(quant.product_id.id, quant.location_id.id) for quant in self})
+        res = super()._apply_inventory(*args, **kwargs)
+        self.env['mobile.inventory.abc'].sudo()._mark_counted(pairs)
+        self.exists().filtered('cycle_count_date').sudo().write({'cycle_count_date': False})
+        return res
+
+    @api.model
+    def _get_walk(self, domain):
+        """Return [(location, quant count)] of the quants matching domain,
+        in counting walk order (see stock.location._compute_walk_sequences).
+        Locations not planned yet come last, by name."""
+        groups = self._read_group(domain, ['location_id'], ['__count'])
+        return sorted(groups, key=lambda group: (
+            not group[0].walk_sequence, group[0].warehouse_id.id or 0,
+            group[0].walk_sequence, group[0].complete_name,
+        ))
+
+    @api.model
+    def _search_walk_order(self, domain, offset=0, limit=None):
+        """Search the quants matching domain in counting walk order: location
+        by location along the walk, by product within a location. Only the
+        locations overlapping the requested page are read."""
+        locations, start, position = [], None, 0
+        for location, count in self._get_walk(domain):
+            if limit is not None and position >= offset + limit:
+                break
+            if position + count > offset:
+                if start is None:
+                    start = position
+                locations.append(location.id)
+            position += count
+        if not locations:
+            return self.browse()
+        rank = {location_id: index for index, location_id in enumerate(locations)}
+        quants = self.search(
+            domain + [('location_id', 'in', locations)], order='product_id, id',
+        ).sorted(lambda quant: rank[quant.location_id.id])
+        skip = offset - start
+        return quants[skip:skip + limit if limit is not None else None]
@@ -1,7 +1,30 @@
 # -*- coding: utf-8 -*-
-from odoo import http
+from odoo import fields, http
 from odoo.http import request
 
+ITEM_FIELDS = [
+    'id', 'product_id', 'location_id', 'lot_id',
+    'quantity', 'inventory_quantity', 'inventory_quantity_set',
+    'product_uom_id',
+]
+MANY2ONE_FIELDS = ['product_id', 'location_id', 'lot_id', 'product_uom_id']
+
+
+def _to_columns(records):
+    """Encode search_read results as column arrays. Many2one columns hold
+    ids only, their names are sent once per record in `names`. Decoded by
+    decodeColumns() in standalone_service.js."""
+    columns = {name: [] for name in records[0]} if records else {}
+    names = {name: {} for name in MANY2ONE_FIELDS}
+    for record in records:
+        for name, value in record.items():
+            if name in names:
+                if value:
+                    names[name][value[0]] = value[1]
+                    value = value[0]
+            columns[name].append(value)
+    return {'columns': columns, 'names': names}
+
 
 class InventoryCountStandalone(http.Controller):
     """
@@ -25,22 +48,39 @@ class InventoryCountStandalone(http.Controller):
         )
 
     @http.route('/inventory-count/items', type='json', auth='user')
-    def get_items(self, location_id=None, limit=500):
-        """Returns stock.quant records for inventory counting."""
+    def get_items(self, location_id=None, limit=500, due_today=False, compact=False):
+        """Returns stock.quant records for inventory counting, in counting walk
+        order when the mobile_physical_inventory planner is installed.
+        With due_today, only the quants of today's cycle count plan (when the
+        mobile_physical_inventory planner is installed). With compact, the
+        records come as columns (see _to_columns)."""
+        Quant = request.env['stock.quant']
         domain = [('location_id.usage', '=', 'internal')]
+        if due_today and 'cycle_count_date' in Quant._fields:
+            domain.append(('cycle_count_date', '<=', fields.Date.context_today(request.env.user)))
         if location_id:
             domain.append(('location_id', 'child_of', location_id))
 
-        quants = request.env['stock.quant'].search_read(
-            domain,
-            fields=[
-                'id', 'product_id', 'location_id', 'lot_id',
-                'quantity', 'inventory_quantity', 'inventory_quantity_set',
-                'product_uom_id',
-            ],
-            limit=limit,
-            order='location_id, product_id',
-        )
+        if 'walk_sequence' in request.env['stock.location']._fields:
+            # Bin by bin along the counting walk planned by mobile_physical_inventory
+            quants = Quant._search_walk_order(domain, limit=limit).read(ITEM_FIELDS)
+        else:
+            quants = Quant.search_read(
+                domain,
+                fields=ITEM_FIELDS,
+                limit=limit,
+                order='location_id, product_id',
+            )
+        # Product thumbnails, when the mobile_physical_inventory module
+        # (which renders them) is installed
+        if 'mobile.inventory.thumbnail' in request.env:
+            thumbnails = request.env['mobile.inventory.thumbnail']._get_urls(
+                {quant['product_id'][0] for quant in quants},
+            )
+            for quant in quants:
+                quant['thumbnail_url'] = thumbnails.get(quant['product_id'][0], False)
+        if compact:
+            return _to_columns(quants)
         return quants
 
     @http.route('/inventory-count/set_count', type='json', auth='user')
@@ -91,10 +131,13 @@ class InventoryCountStandalone(http.Controller):
 
     @http.route('/inventory-count/locations', type='json', auth='user')
     def get_locations(self):
-        """Returns internal locations for the location filter."""
-        locations = request.env['stock.location'].search_read(
+        """Returns internal locations for the location filter, in counting
+        walk order when the mobile_physical_inventory planner is installed."""
+        Location = request.env['stock.location']
+        locations = Location.search_read(
             [('usage', '=', 'internal'), ('active', '=', True)],
             fields=['id', 'display_name'],
             limit=100,
+            order='warehouse_id, walk_sequence, complete_name' if 'walk_sequence' in Location._fields else None,
         )
         return locations
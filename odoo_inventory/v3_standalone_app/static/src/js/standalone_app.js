@@ -105,8 +105,11 @@ export class InventoryCountStandaloneApp extends Component {
             validating: false,
             locations: [],
             selectedLocationId: null,
+            dueToday: false,      // only today's cycle count plan
         });
 
+        this._prefetched = null;  // {key, promise} of the next location's items
+
         onWillStart(async () => {
             await this.loadData();
         });
@@ -119,7 +122,7 @@ export class InventoryCountStandaloneApp extends Component {
         this.state.error = null;
         try {
             const [items, locations] = await Promise.all([
-                InventoryService.getItems(this.state.selectedLocationId),
+                this._fetchItems(this.state.selectedLocationId),
                 InventoryService.getLocations(),
             ]);
             this.state.items = items.map(r => ({
@@ -134,6 +137,36 @@ export class InventoryCountStandaloneApp extends Component {
             this.state.error = e.message || "Failed to load inventory data";
         }
         this.state.loading = false;
+        this._prefetchNextLocation();
+    }
+
+    /**
+     * Items of a location, answered from the prefetched next location when
+     * it matches.
+     */
+    _fetchItems(locationId) {
+        const key = JSON.stringify([locationId, this.state.dueToday]);
+        const prefetched = this._prefetched;
+        this._prefetched = null;
+        if (prefetched && prefetched.key === key) {
+            return prefetched.promise;
+        }
+        return InventoryService.getItems(locationId, this.state.dueToday);
+    }
+
+    /**
+     * Fetch the next location's items in the background while the current
+     * one is being counted (locations come in counting walk order).
+     */
+    _prefetchNextLocation() {
+        const next = this.nextLocation;
+        if (!next) return;
+        const promise = InventoryService.getItems(next.id, this.state.dueToday);
+        // A failed prefetch is simply fetched again on arrival
+        promise.catch(() => {
+            if (this._prefetched?.promise === promise) this._prefetched = null;
+        });
+        this._prefetched = { key: JSON.stringify([next.id, this.state.dueToday]), promise };
     }
 
     // ── Computed ──────────────────────────────────────────
@@ -165,6 +198,12 @@ export class InventoryCountStandaloneApp extends Component {
         };
     }
 
+    get nextLocation() {
+        if (!this.state.selectedLocationId) return null;
+        const index = this.state.locations.findIndex(l => l.id === this.state.selectedLocationId);
+        return index >= 0 ? this.state.locations[index + 1] || null : null;
+    }
+
     get activeItem() {
         return this.state.items.find(i => i.id === this.state.activeItemId) || null;
     }
@@ -250,6 +289,18 @@ export class InventoryCountStandaloneApp extends Component {
         this.loadData();
     }
 
+    goToNextLocation() {
+        const next = this.nextLocation;
+        if (!next) return;
+        this.state.selectedLocationId = next.id;
+        this.loadData();
+    }
+
+    toggleDueToday() {
+        this.state.dueToday = !this.state.dueToday;
+        this.loadData();
+    }
+
     // ── Toast ─────────────────────────────────────────────
 
     showToast(message, type = "success") {
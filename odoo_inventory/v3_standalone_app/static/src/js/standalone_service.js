@@ -33,12 +33,36 @@ async function jsonRpc(route, params = {}) {
     return data.result;
 }
 
+/**
+ * Rebuild search_read records from a compact (columnar) /items payload:
+ * many2one columns come back as [id, name] pairs.
+ */
+function decodeColumns({ columns, names }) {
+    const keys = Object.keys(columns);
+    const length = keys.length ? columns[keys[0]].length : 0;
+    const records = [];
+    for (let i = 0; i < length; i++) {
+        const record = {};
+        for (const key of keys) {
+            const value = columns[key][i];
+            record[key] = names[key] && value ? [value, names[key][value]] : value;
+        }
+        records.push(record);
+    }
+    return records;
+}
+
 /**
  * InventoryService — wraps all /inventory-count/* routes.
  */
 export const InventoryService = {
-    async getItems(locationId = null) {
-        return jsonRpc("/inventory-count/items", { location_id: locationId });
+    async getItems(locationId = null, dueToday = false) {
+        const result = await jsonRpc("/inventory-count/items", {
+            location_id: locationId,
+            due_today: dueToday,
+            compact: true,
+        });
+        return result.columns ? decodeColumns(result) : result;
     },
 
     async setCount(quantId, qty) {
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 {
     'name': 'Restaurant Task Manager',
-    'version': '19.0.2.0.0',
+    'version': '19.0.2.9.0',
     'category': 'Human Resources/Planning',
     'summary': 'Shift-based task management for restaurant staff with attendance integration',
     'description': """
@@ -11,6 +11,7 @@ Shift-linked task management for multi-location restaurant operations.
 
 Core Features (Phase 1):
 - Task templates with sub-task checklists
+- Versioned template snapshots shared by generated tasks
 - Multiple completion types: checkbox, photo, numeric, text note
 - Optional deadlines per task
 - PDF instruction attachments
@@ -22,7 +23,7 @@ Core Features (Phase 1):
 - 3-tier access: Owner/Admin → Manager → Staff
 - Multi-location data isolation
 - Staff comments on tasks
-- Manager dashboard with real-time today view
+- Manager dashboard with live today board (bus updates)
 
 Advanced Features (Phase 2):
 - Digital signature completion type
@@ -30,17 +31,20 @@ Advanced Features (Phase 2):
 - Clock-out enforcement: hard-block or warn (configurable per template)
 - Multi-level escalation chain (employee → lead → manager)
 - Shift handoff: auto-carry incomplete tasks to next shift
-- Ad-hoc quick tasks for managers during live shifts
+- Ad-hoc quick tasks for managers during live shifts (single or broadcast)
 - Staff score + anonymous team average comparison
 - Weekly/monthly trend analysis dashboards
 - Cross-location completion comparison
 - Excel/PDF export via standard Odoo export
+- Lightweight staff app at /restaurant-tasks (one shift payload, offline queue)
+- Archival of closed task lists into a compact summary table
     """,
     'author': 'Custom',
     'license': 'LGPL-3',
     'depends': [
         'base',
         'mail',
+        'bus',
         'hr',
         'hr_attendance',
         'planning',
@@ -58,9 +62,11 @@ Advanced Features (Phase 2):
         'views/escalation_views.xml',
         'views/quick_task_views.xml',
         'views/dashboard_views.xml',
+        'views/cron_run_views.xml',
         'views/planning_slot_views.xml',
         'views/attendance_views.xml',
         'views/menu_views.xml',
+        'views/task_app_templates.xml',
     ],
     'demo': [
         'data/demo_data.xml',
@@ -68,6 +74,19 @@ Advanced Features (Phase 2):
     'assets': {
         'web.assets_backend': [
             'restaurant_task_manager/static/src/css/task_manager.css',
+            'restaurant_task_manager/static/src/js/task_board.js',
+        ],
+        # Standalone staff app at /restaurant-tasks — separate from backend
+        'restaurant_task_manager.task_app_assets': [
+            ('include', 'web._assets_helpers'),
+            'web/static/src/libs/owl/owl.js',
+            'web/static/src/env.js',
+            'web/static/src/session.js',
+            'restaurant_task_manager/static/src/app/task_app.css',
+            'restaurant_task_manager/static/src/app/task_app.xml',
+            'restaurant_task_manager/static/src/app/task_app_service.js',
+            'restaurant_task_manager/static/src/app/task_app.js',
+            'restaurant_task_manager/static/src/app/task_app_main.js',
         ],
     },
     'installable': True,
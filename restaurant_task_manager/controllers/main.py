@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+import base64
+import os
+import re
+import shutil
+from datetime import timedelta
+
+from odoo import fields, http
+from odoo.exceptions import AccessError, UserError, ValidationError
+from odoo.http import request
+
+# Task lists whose shift overlaps now ± this buffer make up the "current shift"
+SHIFT_BUFFER = timedelta(hours=1)
+
+ITEM_FIELDS = [
+    'task_list_id', 'name', 'description', 'sequence', 'state',
+    'has_deadline', 'deadline', 'completion_type', 'numeric_label',
+    'numeric_min', 'numeric_max', 'require_proof_photo', 'proof_numeric_value',
+    'proof_text_note', 'staff_comment', 'instruction_filename', 'is_handoff',
+    'proof_photo_thumb',
+]
+
+# Chunked proof photo uploads: chunks are staged in the filestore until the
+# last one arrives (max 100 × 256 KB as sent by the app)
+UPLOAD_ID_RE = re.compile(r'[A-Za-z0-9-]{8,64}')
+MAX_UPLOAD_CHUNKS = 100
+MAX_CHUNK_SIZE = 256 * 1024
+
+
+class TaskAppController(http.Controller):
+    """
+    Lightweight staff app served at /restaurant-tasks.
+    Same pattern as the standalone inventory count app: a shell page with
+    its own asset bundle, one payload for the whole shift, and batched
+    writes so the phone never loads the backend form views.
+    """
+
+    @http.route('/restaurant-tasks', type='http', auth='user', website=False)
+    def task_app(self, **kwargs):
+        """Main entry point — renders the shell HTML that bootstraps the OWL app."""
+        if not request.env.user.has_group('restaurant_task_manager.group_task_staff'):
+            return request.redirect('/web/login')
+        return request.render(
+            'restaurant_task_manager.task_app_index',
+            {
+                'session_info': request.env['ir.http'].get_frontend_session_info(),
+                'user_name': request.env.user.name,
+            }
+        )
+
+    @http.route('/restaurant-tasks/shift', type='json', auth='user')
+    def get_shift(self):
+        """Return the current shift's task lists, items and checklist of the
+        logged-in employee in one compact payload (three queries)."""
+        employee = request.env.user.employee_id
+        if not employee:
+            return {'employee': False, 'lists': [], 'items': [], 'subtasks': []}
+        now = fields.Datetime.now()
+        lists = request.env['restaurant.task.list'].search([
+            ('employee_id', '=', employee.id),
+            ('state', '=', 'active'),
+            ('shift_start', '<=', now + SHIFT_BUFFER),
+            ('shift_end', '>=', now - SHIFT_BUFFER),
+        ])
+        # bin_size: proof_photo_thumb comes back as a size, i.e. "has a photo"
+        items = request.env['restaurant.task.item'].with_context(bin_size=True).search_read(
+            [('task_list_id', 'in', lists.ids)], ITEM_FIELDS,
+        )
+        subtasks = request.env['restaurant.task.subtask'].search_read(
+            [('task_item_id', 'in', [item['id'] for item in items])],
+            ['task_item_id', 'name', 'sequence', 'is_done'],
+        )
+        for item in items:
+            item['task_list_id'] = item['task_list_id'][0]
+        for subtask in subtasks:
+            subtask['task_item_id'] = subtask['task_item_id'][0]
+        return {
+            'employee': employee.name,
+            'server_time': fields.Datetime.to_string(now),
+            'lists': [{
+                'id': tl.id,
+                'name': tl.template_id.name,
+                'shift_start': fields.Datetime.to_string(tl.shift_start),
+                'shift_end': fields.Datetime.to_string(tl.shift_end),
+                'completed': tl.completed_tasks,
+                'total': tl.total_tasks,
+            } for tl in lists],
+            'items': items,
+            'subtasks': subtasks,
+        }
+
+    @http.route('/restaurant-tasks/sync', type='json', auth='user')
+    def sync(self, ops):
+        """Apply a batch of queued operations from the app.
+
+        Each op is a dict with an 'id' (client-side, echoed back) and a 'type':
+        - subtask:  {subtask_id, is_done}
+        - value:    {item_id, proof_numeric_value?, proof_text_note?, staff_comment?}
+        - start:    {item_id}
+        - complete: {item_id}
+        Checklist toggles (the last one per checklist item) and starts are
+        grouped into a few writes; values and completions are applied per
+        item inside a savepoint so one rejected task does not discard the
+        rest of the queue.
+        """
+        env = request.env
+        results = {}
+        Subtask = env['restaurant.task.subtask']
+        TaskItem = env['restaurant.task.item']
+
+        # Only the last queued toggle of a checklist item counts: unticking
+        # then ticking it again offline must leave it ticked
+        last_toggles = {}
+        for op in ops:
+            if op.get('type') == 'subtask':
+                last_toggles[int(op['subtask_id'])] = op
+        toggles = {True: [], False: []}
+        for op in last_toggles.values():
+            toggles[bool(op.get('is_done'))].append(op)
+        for is_done, batch in toggles.items():
+            results.update(self._apply_batch(Subtask, batch, 'subtask_id', 'write', {'is_done': is_done}))
+        # Superseded toggles share the outcome of the last one
+        for op in ops:
+            if op.get('type') == 'subtask' and op['id'] not in results:
+                results[op['id']] = results[last_toggles[int(op['subtask_id'])]['id']]
+
+        value_keys = ('proof_numeric_value', 'proof_text_note', 'staff_comment')
+        for op in ops:
+            if op.get('type') != 'value':
+                continue
+            vals = {key: op[key] for key in value_keys if key in op}
+            results[op['id']] = self._apply_op(TaskItem.browse(int(op['item_id'])), 'write', vals)
+
+        starts = [op for op in ops if op.get('type') == 'start']
+        results.update(self._apply_batch(TaskItem, starts, 'item_id', 'action_start'))
+
+        for op in ops:
+            if op.get('type') == 'complete':
+                results[op['id']] = self._apply_op(
+                    TaskItem.browse(int(op['item_id'])), 'action_complete',
+                )
+
+        for op in ops:
+            results.setdefault(op['id'], {'ok': False, 'error': 'Unknown operation'})
+        return {'results': results}
+
+    @http.route('/restaurant-tasks/photo/<int:item_id>', type='http', auth='user', methods=['POST'])
+    def upload_photo_chunk(self, item_id, upload_id, index, total, chunk, **kwargs):
+        """Receive one chunk of a proof photo. Once all chunks are in, the
+        photo is assembled and written: the Image field downscales it to
+        1920px and derives the 128px thumbnail used by list views."""
+        item = request.env['restaurant.task.item'].browse(item_id).exists()
+        if not item:
+            return request.make_json_response({'ok': False, 'error': 'Task not found'}, status=404)
+        item.check_access('write')
+        index, total = int(index), int(total)
+        if not UPLOAD_ID_RE.fullmatch(upload_id) or not 0 <= index < total <= MAX_UPLOAD_CHUNKS:
+            return request.make_json_response({'ok': False, 'error': 'Invalid upload'}, status=400)
+
+        data = chunk.read(MAX_CHUNK_SIZE + 1)
+        if len(data) > MAX_CHUNK_SIZE:
+            return request.make_json_response({'ok': False, 'error': 'Chunk too large'}, status=413)
+
+        # Scoped to the user and the task, so an upload id cannot reach the
+        # chunks of another upload; abandoned folders are removed by
+        # restaurant.task.item._gc_photo_uploads
+        folder = os.path.join(
+            item._get_photo_upload_dir(), '%d-%d-%s' % (request.env.uid, item.id, upload_id),
+        )
+        os.makedirs(folder, exist_ok=True)
+        # Written aside then renamed, so only complete chunks are counted
+        path = os.path.join(folder, '%05d' % index)
+        with open(path + '.tmp', 'wb') as f:
+            f.write(data)
+        os.replace(path + '.tmp', path)
+        received = sum(1 for name in os.listdir(folder) if not name.endswith('.tmp'))
+        if received < total:
+            return request.make_json_response({'ok': True, 'received': received})
+
+        # Concurrent last chunks (e.g. a retried one): the request that
+        # moves the folder away assembles it, the others are done
+        assembling = folder + '.assembling'
+        try:
+            os.rename(folder, assembling)
+        except OSError:
+            return request.make_json_response({'ok': True, 'received': received})
+        folder = assembling
+        try:
+            parts = []
+            for i in range(total):
+                with open(os.path.join(folder, '%05d' % i), 'rb') as f:
+                    parts.append(f.read())
+        finally:
+            shutil.rmtree(folder, ignore_errors=True)
+        try:
+            item.write({
+                'proof_photo': base64.b64encode(b''.join(parts)),
+                'proof_photo_filename': chunk.filename,
+            })
+        except UserError as e:
+            return request.make_json_response({'ok': False, 'error': str(e)}, status=400)
+        return request.make_json_response({
+            'ok': True,
+            'done': True,
+            'thumbnail': '/web/image/restaurant.task.item/%d/proof_photo_thumb' % item.id,
+        })
+
+    @http.route('/restaurant-tasks/kiosk/<string:token>/checkout-preflight', type='json', auth='public')
+    def kiosk_checkout_preflight(self, token, employee_ids):
+        """Tell an attendance kiosk which employees would be refused checkout,
+        with their incomplete task names, for a whole queue in one call."""
+        company = request.env['res.company'].sudo().search(
+            [('attendance_kiosk_key', '=', token)], limit=1,
+        )
+        if not company:
+            return {}
+        employees = request.env['hr.employee'].sudo().search([
+            ('id', 'in', employee_ids),
+            ('company_id', '=', company.id),
+        ])
+        return request.env['hr.attendance'].sudo().get_checkout_preflight(employees.ids)
+
+    def _apply_batch(self, model, ops, key, method, *args):
+        """Call `method` once on the records referenced by ops[key]. Missing
+        and inaccessible records are reported per op; if the call is
+        rejected, it is retried record by record so only the offending ops
+        fail. Returns {op id: result}."""
+        if not ops:
+            return {}
+        records = model.browse(list(dict.fromkeys(int(op[key]) for op in ops))).exists()
+        allowed = records._filtered_access('write')
+        errors = dict.fromkeys((records - allowed).ids, 'Access denied')
+        try:
+            with request.env.cr.savepoint():
+                getattr(allowed, method)(*args)
+        except (UserError, ValidationError, AccessError):
+            for record in allowed:
+                try:
+                    with request.env.cr.savepoint():
+                        getattr(record, method)(*args)
+                except (UserError, ValidationError, AccessError) as e:
+                    errors[record.id] = str(e)
+        found = set(records.ids)
+        results = {}
+        for op in ops:
+            record_id = int(op[key])
+            if record_id not in found:
+                results[op['id']] = {'ok': False, 'error': 'Record not found'}
+            elif record_id in errors:
+                results[op['id']] = {'ok': False, 'error': errors[record_id]}
+            else:
+                results[op['id']] = {'ok': True}
+        return results
+
+    def _apply_op(self, item, method, *args):
+        if not item.exists():
+            return {'ok': False, 'error': 'Task not found'}
+        try:
+            with request.env.cr.savepoint():
+                getattr(item, method)(*args)
+        except (UserError, ValidationError, AccessError) as e:
+            return {'ok': False, 'error': str(e)}
+        return {'ok': True, 'state': item.state}
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+from odoo.tools.sql import column_exists
+
+
+def migrate(cr, version):
+    """Move the legacy escalation_level_N_sent flags into the escalation log."""
+    for level in (1, 2, 3):
+        column = 'escalation_level_%d_sent' % level
+        if not column_exists(cr, 'restaurant_task_item', column):
+            continue
+        cr.execute("""
+            INSERT INTO restaurant_task_escalation_log
+                   (item_id, rule_id, level, location_id, sent_at,
+                    create_uid, create_date, write_uid, write_date)
+            SELECT item.id, rule.id, rule.level, item.location_id,
+                   now() at time zone 'UTC',
+                   1, now() at time zone 'UTC', 1, now() at time zone 'UTC'
+              FROM restaurant_task_item item
+              JOIN restaurant_escalation_rule rule ON rule.level = %s
+             WHERE item.{column}
+            ON CONFLICT (item_id, rule_id) DO NOTHING
+        """.format(column=column), (level,))
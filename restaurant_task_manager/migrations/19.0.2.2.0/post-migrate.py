@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+
+
+def migrate(cr, version):
+    """Flag legacy handoff copies, which were only marked by a name prefix."""
+    cr.execute("""
+        UPDATE restaurant_task_item
+           SET is_handoff = TRUE,
+               name = ltrim(substr(name, length('[HANDOFF]') + 1))
+         WHERE name LIKE '[HANDOFF]%'
+    """)
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+from odoo import api, SUPERUSER_ID
+from odoo.tools.sql import column_exists
+
+
+def migrate(cr, version):
+    """Move per-item instruction PDF copies to shared, checksum-keyed documents."""
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    Attachment = env['ir.attachment']
+    Document = env['restaurant.task.document']
+
+    # Items read their document through their template version line since
+    # 19.0.2.5.0, so the column is missing when upgrading past it in one go:
+    # keep the documents there for the 19.0.2.5.0 migration, which drops it
+    if not column_exists(cr, 'restaurant_task_item', 'instruction_document_id'):
+        cr.execute("ALTER TABLE restaurant_task_item ADD COLUMN instruction_document_id int4")
+
+    cr.execute("""
+        SELECT res_model, res_id, id, checksum
+          FROM ir_attachment
+         WHERE res_field = 'instruction_file'
+           AND res_model IN ('restaurant.task.template', 'restaurant.task.item')
+           AND res_id IS NOT NULL
+    """)
+    rows = cr.fetchall()
+    documents = {}
+    for res_model, res_id, attachment_id, checksum in rows:
+        if checksum not in documents:
+            attachment = Attachment.browse(attachment_id)
+            documents[checksum] = Document._get_or_create(attachment.datas, attachment.name)
+        table = res_model.replace('.', '_')
+        cr.execute(
+            "UPDATE %s SET instruction_document_id = %%s WHERE id = %%s" % table,
+            [documents[checksum].id, res_id],
+        )
+    # Items now read the shared document; their own copies are dead weight
+    Attachment.search([
+        ('res_model', '=', 'restaurant.task.item'),
+        ('res_field', '=', 'instruction_file'),
+    ]).unlink()
+
@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+from odoo import api, SUPERUSER_ID
+
+# The rules are noupdate, so point them at the denormalized columns here
+RULE_DOMAINS = {
+    'rule_task_list_staff': "[('user_id', '=', user.id)]",
+    'rule_task_item_staff': "[('user_id', '=', user.id)]",
+    'rule_subtask_staff': "[('user_id', '=', user.id)]",
+    'rule_subtask_manager': "[('location_id', 'in', user.employee_ids.work_location_id.ids)]",
+}
+
+
+def migrate(cr, version):
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    for xmlid, domain in RULE_DOMAINS.items():
+        rule = env.ref('restaurant_task_manager.%s' % xmlid, raise_if_not_found=False)
+        if rule:
+            rule.domain_force = domain
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+
+
+def migrate(cr, version):
+    """Create and fill the denormalized user/location columns in SQL so the
+    upgrade does not recompute them record by record through the ORM."""
+    cr.execute("""
+        ALTER TABLE restaurant_task_list ADD COLUMN IF NOT EXISTS user_id int4;
+        ALTER TABLE restaurant_task_item ADD COLUMN IF NOT EXISTS user_id int4;
+        ALTER TABLE restaurant_task_subtask ADD COLUMN IF NOT EXISTS user_id int4;
+        ALTER TABLE restaurant_task_subtask ADD COLUMN IF NOT EXISTS location_id int4;
+    """)
+    cr.execute("""
+        UPDATE restaurant_task_list tl
+           SET user_id = emp.user_id
+          FROM hr_employee emp
+         WHERE emp.id = tl.employee_id
+           AND emp.user_id IS NOT NULL
+    """)
+    cr.execute("""
+        UPDATE restaurant_task_item item
+           SET user_id = tl.user_id
+          FROM restaurant_task_list tl
+         WHERE tl.id = item.task_list_id
+           AND tl.user_id IS NOT NULL
+    """)
+    cr.execute("""
+        UPDATE restaurant_task_subtask sub
+           SET user_id = item.user_id,
+               location_id = item.location_id
+          FROM restaurant_task_item item
+         WHERE item.id = sub.task_item_id
+           AND (item.user_id IS NOT NULL OR item.location_id IS NOT NULL)
+    """)
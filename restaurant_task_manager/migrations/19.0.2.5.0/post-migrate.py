@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+from odoo.tools.sql import column_exists
+
+# Task content columns of restaurant.task.item now read from the template
+# version line of the item
+CONTENT_COLUMNS = [
+    'name', 'sequence', 'completion_type', 'description', 'numeric_label',
+    'numeric_min', 'numeric_max', 'require_proof_photo',
+    'instruction_document_id', 'instruction_filename',
+]
+DROPPED_COLUMNS = [
+    'description', 'numeric_label', 'numeric_min', 'numeric_max',
+    'require_proof_photo', 'instruction_document_id', 'instruction_filename',
+]
+
+
+def migrate(cr, version):
+    """Move the content of existing task items into a legacy version 0 of
+    their list template (one line per distinct content) and drop the copied
+    columns from the item table."""
+    if not column_exists(cr, 'restaurant_task_item', 'numeric_label'):
+        return
+    # Content the item table never had (depending on the version upgraded
+    # from) stays empty on the lines
+    content_columns = [
+        col for col in CONTENT_COLUMNS if column_exists(cr, 'restaurant_task_item', col)
+    ]
+    cr.execute("""
+        INSERT INTO restaurant_task_template_version (
+            list_template_id, version, create_uid, create_date, write_uid, write_date
+        )
+        SELECT DISTINCT tl.template_id, 0,
+               1, now() at time zone 'UTC', 1, now() at time zone 'UTC'
+          FROM restaurant_task_item item
+          JOIN restaurant_task_list tl ON tl.id = item.task_list_id
+         WHERE item.snapshot_line_id IS NULL
+    """)
+    columns = ', '.join('item.%s' % col for col in content_columns)
+    cr.execute("""
+        INSERT INTO restaurant_task_template_version_line (
+            version_id, %(names)s, has_deadline, reminder_minutes_before,
+            create_uid, create_date, write_uid, write_date
+        )
+        SELECT ver.id, %(columns)s,
+               bool_or(item.has_deadline), max(item.reminder_minutes_before),
+               1, now() at time zone 'UTC', 1, now() at time zone 'UTC'
+          FROM restaurant_task_item item
+          JOIN restaurant_task_list tl ON tl.id = item.task_list_id
+          JOIN restaurant_task_template_version ver
+            ON ver.list_template_id IS NOT DISTINCT FROM tl.template_id
+           AND ver.version = 0
+         WHERE item.snapshot_line_id IS NULL
+      GROUP BY ver.id, %(columns)s
+    """ % {'names': ', '.join(content_columns), 'columns': columns})
+    matches = ' AND '.join(
+        'line.%s IS NOT DISTINCT FROM item.%s' % (col, col) for col in content_columns
+    )
+    cr.execute("""
+        UPDATE restaurant_task_item item
+           SET snapshot_line_id = line.id
+          FROM restaurant_task_list tl,
+               restaurant_task_template_version ver,
+               restaurant_task_template_version_line line
+         WHERE tl.id = item.task_list_id
+           AND ver.list_template_id IS NOT DISTINCT FROM tl.template_id
+           AND ver.version = 0
+           AND line.version_id = ver.id
+           AND item.snapshot_line_id IS NULL
+           AND %s
+    """ % matches)
+    cr.execute('ALTER TABLE restaurant_task_item %s' % ', '.join(
+        'DROP COLUMN IF EXISTS %s' % col for col in DROPPED_COLUMNS
+    ))
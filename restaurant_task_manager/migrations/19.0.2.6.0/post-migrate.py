@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+
+
+def migrate(cr, version):
+    """Mark slots that already have task lists as generated, so the first
+    run of the generation queue does not look at the whole planning."""
+    cr.execute("""
+        UPDATE planning_slot slot
+           SET task_generation_state = 'done'
+         WHERE EXISTS (SELECT 1 FROM restaurant_task_list tl WHERE tl.slot_id = slot.id)
+    """)
@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+
+
+def migrate(cr, version):
+    """Create and fill the stored slot task statistics in one statement
+    instead of letting the upgrade compute them for every slot."""
+    cr.execute("""
+        ALTER TABLE planning_slot ADD COLUMN IF NOT EXISTS task_list_count int4;
+        ALTER TABLE planning_slot ADD COLUMN IF NOT EXISTS task_completion_score float8;
+    """)
+    cr.execute("""
+        UPDATE planning_slot slot
+           SET task_list_count = COALESCE(agg.count, 0),
+               task_completion_score = COALESCE(agg.score, 0)
+          FROM planning_slot s
+     LEFT JOIN (
+                SELECT slot_id, count(*) AS count, avg(completion_score) AS score
+                  FROM restaurant_task_list
+                 WHERE slot_id IS NOT NULL
+              GROUP BY slot_id
+               ) agg ON agg.slot_id = s.id
+         WHERE s.id = slot.id
+    """)
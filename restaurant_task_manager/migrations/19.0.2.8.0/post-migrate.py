@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+from odoo import api, SUPERUSER_ID
+
+
+def migrate(cr, version):
+    """Derive the stored proof photo thumbnails of existing photos in the
+    background, in committed batches, rather than during the upgrade."""
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    cron = env.ref('restaurant_task_manager.cron_backfill_photo_thumbs', raise_if_not_found=False)
+    if cron:
+        cron._trigger()
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+
+
+def migrate(cr, version):
+    """Fill the stored deadline state of task items (is_overdue,
+    deadline_bucket) in SQL, as TaskItem._compute_deadline_state does with
+    a due soon delay (DUE_SOON) of 30 minutes, so the upgrade does not
+    recompute it record by record through the ORM. Items already filled,
+    e.g. by an earlier upgrade through the ORM, are left alone."""
+    cr.execute("""
+        ALTER TABLE restaurant_task_item ADD COLUMN IF NOT EXISTS is_overdue bool;
+        ALTER TABLE restaurant_task_item ADD COLUMN IF NOT EXISTS deadline_bucket varchar;
+    """)
+    cr.execute("""
+        UPDATE restaurant_task_item
+           SET deadline_bucket = CASE
+                   WHEN state = 'done' THEN 'done'
+                   WHEN NOT COALESCE(has_deadline, FALSE) OR deadline IS NULL THEN 'none'
+                   WHEN deadline < now() at time zone 'UTC' THEN 'overdue'
+                   WHEN deadline <= now() at time zone 'UTC' + interval '30 minutes' THEN 'due_soon'
+                   ELSE 'later'
+               END,
+               is_overdue = COALESCE(
+                   state != 'done' AND has_deadline AND deadline < now() at time zone 'UTC',
+                   FALSE
+               )
+         WHERE deadline_bucket IS NULL
+    """)
@@ -1,9 +1,18 @@
 # -*- coding: utf-8 -*-
+from . import task_cron_run
+from . import task_cron_shard
+from . import task_document
+from . import task_template_version
 from . import task_template
 from . import task_list
 from . import task_item
 from . import task_subtask
 from . import escalation_rule
+from . import task_completion_stat
+from . import task_report
+from . import task_archive
 from . import quick_task
 from . import hr_attendance_inherit
 from . import planning_slot_inherit
+from . import ir_websocket
+from . import task_benchmark
@@ -13,7 +13,7 @@ class EscalationRule(models.Model):
     name = fields.Char(compute='_compute_name', store=True)
     level = fields.Integer(
         string='Escalation Level', required=True, default=1,
-        help='1 = first contact, 2 = second, 3 = third.',
+        help='1 = first contact, 2 = second, 3 = third, and so on.',
     )
     delay_minutes = fields.Integer(
         string='Delay After Overdue (min)', required=True, default=0,
@@ -52,13 +52,90 @@ class EscalationRule(models.Model):
     def _get_recipient(self, task_item):
         """Return the hr.employee record to notify for the given task item."""
         self.ensure_one()
-        employee = task_item.task_list_id.employee_id
-        if self.recipient_type == 'employee':
-            return employee
-        elif self.recipient_type == 'department_manager':
-            return employee.department_id.manager_id if employee.department_id else False
-        elif self.recipient_type == 'parent_manager':
-            return employee.parent_id or False
-        elif self.recipient_type == 'specific_employee':
-            return self.specific_employee_id
-        return False
+        return self._get_recipients(task_item).get(task_item.id, False)
+
+    def _get_recipients(self, task_items):
+        """Resolve recipients for many task items at once.
+        Returns a dict {task_item_id: hr.employee}; items without a recipient
+        are left out. Recipients are resolved once per assigned employee."""
+        self.ensure_one()
+        if self.recipient_type == 'specific_employee':
+            if not self.specific_employee_id:
+                return {}
+            return {item.id: self.specific_employee_id for item in task_items}
+        by_employee = {}
+        for employee in task_items.employee_id:
+            if self.recipient_type == 'employee':
+                by_employee[employee.id] = employee
+            elif self.recipient_type == 'department_manager':
+                by_employee[employee.id] = employee.department_id.manager_id
+            elif self.recipient_type == 'parent_manager':
+                by_employee[employee.id] = employee.parent_id
+        return {
+            item.id: by_employee[item.employee_id.id]
+            for item in task_items
+            if by_employee.get(item.employee_id.id)
+        }
+
+    @api.model
+    def _get_due_escalations(self, now, location=None):
+        """Return [(task_item_id, rule_id)] for every escalation that is due
+        and has not been logged yet, in one query over items, rules and the
+        escalation log. Rules scoped to a location only match items there.
+        When `location` is given (empty for items without location), only
+        its items are considered."""
+        for model in ('restaurant.task.item', 'restaurant.task.list',
+                      'restaurant.escalation.rule', 'restaurant.task.escalation.log'):
+            self.env[model].flush_model()
+        self.env.cr.execute("""
+            SELECT item.id, rule.id
+              FROM restaurant_task_item item
+              JOIN restaurant_task_list tl ON tl.id = item.task_list_id
+              JOIN restaurant_escalation_rule rule
+                ON rule.active
+               AND (rule.location_id IS NULL OR rule.location_id = item.location_id)
+               AND item.deadline + rule.delay_minutes * interval '1 minute' <= %(now)s
+         LEFT JOIN restaurant_task_escalation_log log
+                ON log.item_id = item.id AND log.rule_id = rule.id
+             WHERE item.has_deadline
+               AND item.state != 'done'
+               AND item.deadline < %(now)s
+               AND tl.state = 'active'
+               AND log.id IS NULL
+               AND (%(all_locations)s OR item.location_id IS NOT DISTINCT FROM %(location_id)s)
+          ORDER BY rule.level, rule.delay_minutes, item.id
+        """, {
+            'now': now,
+            'all_locations': location is None,
+            'location_id': location.id if location else None,
+        })
+        return self.env.cr.fetchall()
+
+
+class EscalationLog(models.Model):
+    """One row per (task item, escalation rule) that has fired.
+    Replaces the fixed escalation_level_N_sent flags, so any number of
+    levels is supported and the cron only looks at escalations not yet sent."""
+    _name = 'restaurant.task.escalation.log'
+    _description = 'Task Escalation Log'
+    _order = 'sent_at desc, id desc'
+
+    item_id = fields.Many2one(
+        'restaurant.task.item', string='Task',
+        required=True, ondelete='cascade', index=True,
+    )
+    rule_id = fields.Many2one(
+        'restaurant.escalation.rule', string='Escalation Rule',
+        required=True, ondelete='cascade',
+    )
+    level = fields.Integer(string='Level', readonly=True)
+    recipient_id = fields.Many2one('hr.employee', string='Notified', readonly=True)
+    location_id = fields.Many2one(
+        'hr.work.location', related='item_id.location_id', store=True, readonly=True,
+    )
+    sent_at = fields.Datetime(default=fields.Datetime.now, readonly=True)
+
+    _item_rule_uniq = models.Constraint(
+        'UNIQUE(item_id, rule_id)',
+        'An escalation rule can only fire once per task.',
+    )
@@ -3,9 +3,33 @@ from odoo import models, fields, api, _
 from odoo.exceptions import UserError
 from datetime import timedelta
 import logging
+import threading
+import time
 
 _logger = logging.getLogger(__name__)
 
+# Kiosks ask for the checkout status of the same attendances several times
+# while staff queue up; a short per-process cache absorbs the repeats.
+CHECKOUT_STATUS_TTL = 30  # seconds
+CHECKOUT_STATUS_CACHE_SIZE = 2000  # entries per process
+# {(dbname, attendance_id): (expiry, status)}, in expiry order (fixed TTL)
+_checkout_status_cache = {}
+_checkout_status_lock = threading.Lock()
+
+
+def _cache_checkout_status(key, status, now):
+    """Store a checkout status, evicting the expired entries and then the
+    oldest ones beyond CHECKOUT_STATUS_CACHE_SIZE."""
+    with _checkout_status_lock:
+        _checkout_status_cache.pop(key, None)
+        _checkout_status_cache[key] = (now + CHECKOUT_STATUS_TTL, status)
+        while _checkout_status_cache:
+            oldest = next(iter(_checkout_status_cache))
+            if (_checkout_status_cache[oldest][0] > now
+                    and len(_checkout_status_cache) <= CHECKOUT_STATUS_CACHE_SIZE):
+                break
+            del _checkout_status_cache[oldest]
+
 
 class HrAttendance(models.Model):
     _inherit = 'hr.attendance'
@@ -28,25 +52,48 @@ class HrAttendance(models.Model):
 
     @api.depends('employee_id', 'check_in', 'check_out')
     def _compute_task_completion(self):
-        TaskList = self.env['restaurant.task.list']
+        lists_by_att = self._get_overlapping_task_lists()
         for att in self:
-            if not att.check_in or not att.employee_id:
-                att.task_completion_score = 0.0
-                att.task_list_ids = False
-                continue
-            check_out = att.check_out or fields.Datetime.now()
-            buffer = timedelta(minutes=30)
-            lists = TaskList.search([
-                ('employee_id', '=', att.employee_id.id),
-                ('shift_start', '<=', check_out + buffer),
-                ('shift_end', '>=', att.check_in - buffer),
-            ])
+            lists = lists_by_att.get(att, self.env['restaurant.task.list'])
             att.task_list_ids = lists
             att.task_completion_score = (
                 sum(tl.completion_score for tl in lists) / len(lists)
                 if lists else 0.0
             )
 
+    def _get_overlapping_task_lists(self):
+        """Match every attendance in self to the task lists whose shift overlaps
+        it (with a 30 min buffer) in a single query.
+        Returns {attendance: restaurant.task.list}; open attendances are
+        matched up to now, and attendances without check-in are skipped."""
+        TaskList = self.env['restaurant.task.list']
+        now = fields.Datetime.now()
+        buffer = timedelta(minutes=30)
+        windows = [
+            (index, att.employee_id.id, att.check_in - buffer,
+             (att.check_out or now) + buffer)
+            for index, att in enumerate(self)
+            if att.check_in and att.employee_id
+        ]
+        if not windows:
+            return {}
+        TaskList.flush_model(['employee_id', 'shift_start', 'shift_end'])
+        self.env.cr.execute("""
+            SELECT w.idx, tl.id
+              FROM unnest(%s::int[], %s::int[], %s::timestamp[], %s::timestamp[])
+                   AS w(idx, employee_id, window_start, window_end)
+              JOIN restaurant_task_list tl
+                ON tl.employee_id = w.employee_id
+               AND tl.shift_start <= w.window_end
+               AND tl.shift_end >= w.window_start
+          ORDER BY w.idx, tl.shift_start
+        """, [list(column) for column in zip(*windows)])
+        list_ids = {}
+        for index, list_id in self.env.cr.fetchall():
+            list_ids.setdefault(index, []).append(list_id)
+        records = list(self)
+        return {records[index]: TaskList.browse(ids) for index, ids in list_ids.items()}
+
     @api.depends('task_completion_score', 'task_list_ids')
     def _compute_task_summary(self):
         for att in self:
@@ -57,53 +104,99 @@ class HrAttendance(models.Model):
 
     @api.depends('task_list_ids.completion_score', 'task_list_ids.checkout_policy')
     def _compute_checkout_blocked(self):
+        statuses = self._get_checkout_status()
         for att in self:
-            blocked_lists = att.task_list_ids.filtered(
-                lambda tl: tl.checkout_policy == 'block' and tl.completion_score < 100
-            )
-            att.checkout_blocked = bool(blocked_lists)
+            att.checkout_blocked = statuses[att.id]['status'] == 'block'
+
+    def _get_checkout_status(self):
+        """Evaluate the checkout policy of every attendance in self at once,
+        answering repeated kiosk questions from a short per-process cache.
+        Open attendances are evaluated as if they were checked out now.
+        Returns {attendance_id: {'status': 'ok'|'warn'|'block',
+        'tasks': [incomplete task names of the blocking/warning lists]}}."""
+        now = time.monotonic()
+        dbname = self.env.cr.dbname
+        result = {}
+        todo = self.browse()
+        for att in self:
+            cached = att.id and _checkout_status_cache.get((dbname, att.id))
+            if cached and cached[0] > now:
+                result[att.id] = cached[1]
+            else:
+                todo |= att
+        if not todo:
+            return result
+        statuses = todo._evaluate_checkout_status(todo._get_overlapping_task_lists())
+        for att in todo:
+            if att.id:
+                _cache_checkout_status((dbname, att.id), statuses[att.id], now)
+        result.update(statuses)
+        return result
+
+    def _evaluate_checkout_status(self, lists_by_att):
+        """Checkout status of every attendance in self (see
+        _get_checkout_status) given its task lists, {attendance: lists}."""
+        TaskList = self.env['restaurant.task.list']
+        open_lists = TaskList.union(*lists_by_att.values()).filtered(
+            lambda tl: tl.state == 'active'
+            and tl.checkout_policy in ('block', 'warn')
+            and tl.completion_score < 100
+        )
+        pending = dict(self.env['restaurant.task.item']._read_group(
+            [('task_list_id', 'in', open_lists.ids), ('state', '!=', 'done')],
+            ['task_list_id'], ['name:array_agg'],
+        ))
+        result = {}
+        for att in self:
+            lists = lists_by_att.get(att, TaskList) & open_lists
+            blocked = lists.filtered(lambda tl: tl.checkout_policy == 'block')
+            reported = blocked or lists
+            result[att.id] = {
+                'status': 'block' if blocked else 'warn' if lists else 'ok',
+                'tasks': [name for tl in reported for name in pending.get(tl, [])],
+            }
+        return result
+
+    @api.model
+    def get_checkout_preflight(self, employee_ids):
+        """Tell a kiosk, before it submits, whether checking these employees
+        out now would be refused. Returns {employee_id: status} as produced
+        by _get_checkout_status; employees not checked in are 'ok'."""
+        attendances = self.search([
+            ('employee_id', 'in', employee_ids),
+            ('check_out', '=', False),
+        ])
+        statuses = attendances._get_checkout_status()
+        result = {emp_id: {'status': 'ok', 'tasks': []} for emp_id in employee_ids}
+        for att in attendances:
+            result[att.employee_id.id] = statuses[att.id]
+        return result
 
     @api.constrains('check_out')
     def _check_task_completion_on_checkout(self):
         """Enforce task completion policy when clocking out."""
-        for att in self:
-            if not att.check_out or not att.employee_id:
-                continue
-            buffer = timedelta(minutes=30)
-            task_lists = self.env['restaurant.task.list'].search([
-                ('employee_id', '=', att.employee_id.id),
-                ('shift_start', '<=', att.check_out + buffer),
-                ('shift_end', '>=', att.check_in - buffer),
-                ('state', '=', 'active'),
-            ])
-            # Hard-block checkout for lists with 'block' policy
-            blocked = task_lists.filtered(
-                lambda tl: tl.checkout_policy == 'block' and tl.completion_score < 100
-            )
-            if blocked:
-                incomplete_names = []
-                for tl in blocked:
-                    pending = tl.task_item_ids.filtered(lambda i: i.state != 'done')
-                    incomplete_names.extend(pending.mapped('name'))
+        checked_out = self.filtered(lambda att: att.check_out and att.employee_id)
+        # task_list_ids is recomputed from check_in/check_out before this runs,
+        # so evaluate those lists rather than trusting a kiosk pre-flight
+        statuses = checked_out._evaluate_checkout_status(
+            {att: att.task_list_ids for att in checked_out},
+        )
+        for att in checked_out:
+            status = statuses[att.id]
+            if status['status'] == 'block':
                 raise UserError(_(
                     'Cannot clock out — the following mandatory tasks are incomplete:\n\n'
                     '• %s\n\n'
                     'Please complete all required tasks before checking out.'
-                ) % '\n• '.join(incomplete_names[:10]))
-
-            # Warn for lists with 'warn' policy (log message, allow checkout)
-            warned = task_lists.filtered(
-                lambda tl: tl.checkout_policy == 'warn' and tl.completion_score < 100
-            )
-            if warned:
-                for tl in warned:
-                    pending = tl.task_item_ids.filtered(lambda i: i.state != 'done')
-                    _logger.warning(
-                        'Employee %s clocked out with %d incomplete tasks (warn policy): %s',
-                        att.employee_id.name,
-                        len(pending),
-                        ', '.join(pending.mapped('name')[:5]),
-                    )
+                ) % '\n• '.join(status['tasks'][:10]))
+            if status['status'] == 'warn':
+                # Warn policy: log it and allow the checkout
+                _logger.warning(
+                    'Employee %s clocked out with %d incomplete tasks (warn policy): %s',
+                    att.employee_id.name,
+                    len(status['tasks']),
+                    ', '.join(status['tasks'][:5]),
+                )
 
 
 class HrEmployee(models.Model):
@@ -123,35 +216,17 @@ class HrEmployee(models.Model):
         help='Anonymous team average for comparison.',
     )
 
-    @api.depends('task_list_ids.completion_score', 'task_list_ids.state')
     def _compute_avg_task_completion(self):
+        Stat = self.env['restaurant.task.completion.stat']
+        averages = Stat._get_employee_averages(self.ids)
         for emp in self:
-            lists = emp.task_list_ids.filtered(
-                lambda l: l.state in ('active', 'done', 'expired')
-            )
-            emp.total_task_lists = len(lists)
-            emp.avg_task_completion = (
-                sum(l.completion_score for l in lists) / len(lists)
-                if lists else 0.0
-            )
+            emp.total_task_lists, emp.avg_task_completion = averages.get(emp.id, (0, 0.0))
 
     def _compute_team_avg(self):
         """Compute anonymous team average across all employees at same location."""
+        Stat = self.env['restaurant.task.completion.stat']
         for emp in self:
-            location = emp.work_location_id
-            if location:
-                all_lists = self.env['restaurant.task.list'].search([
-                    ('location_id', '=', location.id),
-                    ('state', 'in', ('active', 'done', 'expired')),
-                ])
-            else:
-                all_lists = self.env['restaurant.task.list'].search([
-                    ('state', 'in', ('active', 'done', 'expired')),
-                ])
-            emp.team_avg_task_completion = (
-                sum(l.completion_score for l in all_lists) / len(all_lists)
-                if all_lists else 0.0
-            )
+            emp.team_avg_task_completion = Stat._get_team_average(emp.work_location_id.id)
 
 
 class HrEmployeePublic(models.Model):
@@ -168,22 +243,12 @@ class HrEmployeePublic(models.Model):
     )
 
     def _compute_avg_task_completion(self):
+        Stat = self.env['restaurant.task.completion.stat']
+        averages = Stat._get_employee_averages(self.ids)
         for emp in self:
-            lists = self.env['restaurant.task.list'].search([
-                ('employee_id', '=', emp.id),
-                ('state', 'in', ('active', 'done', 'expired')),
-            ])
-            emp.avg_task_completion = (
-                sum(l.completion_score for l in lists) / len(lists)
-                if lists else 0.0
-            )
+            emp.avg_task_completion = averages.get(emp.id, (0, 0.0))[1]
 
     def _compute_team_avg(self):
+        team_avg = self.env['restaurant.task.completion.stat']._get_team_average()
         for emp in self:
-            all_lists = self.env['restaurant.task.list'].search([
-                ('state', 'in', ('active', 'done', 'expired')),
-            ])
-            emp.team_avg_task_completion = (
-                sum(l.completion_score for l in all_lists) / len(all_lists)
-                if all_lists else 0.0
-            )
+            emp.team_avg_task_completion = team_avg
@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+from odoo import models
+
+from .task_list import BOARD_CHANNEL
+
+
+class IrWebsocket(models.AbstractModel):
+    _inherit = 'ir.websocket'
+
+    def _build_bus_channel_list(self, channels):
+        """Subscribe managers to the live board of their locations.
+        Board channels requested by the client itself are dropped, so only
+        the ones granted here are ever listened to."""
+        channels = [
+            channel for channel in channels
+            if not (isinstance(channel, str) and channel.startswith(BOARD_CHANNEL))
+        ]
+        if self.env.uid and self.env.user._is_internal():
+            channels.extend(self.env['restaurant.task.list']._get_board_channels(self.env.user))
+        return super()._build_bus_channel_list(channels)
@@ -2,8 +2,14 @@
 from odoo import models, fields, api, _
 import logging
 
+from .task_cron_run import commit_progress, instrumented_cron, track_cron
+
 _logger = logging.getLogger(__name__)
 
+GENERATION_BATCH = 50  # slots per committed batch
+# Failed generations the hourly safety net retries before giving up on a slot
+GENERATION_MAX_ATTEMPTS = 3
+
 
 class PlanningSlot(models.Model):
     _inherit = 'planning.slot'
@@ -11,22 +17,39 @@ class PlanningSlot(models.Model):
     task_list_ids = fields.One2many(
         'restaurant.task.list', 'slot_id', string='Task Lists',
     )
-    task_list_count = fields.Integer(compute='_compute_task_list_count')
-    task_completion_score = fields.Float(compute='_compute_task_completion_score')
+    # Stored so the Gantt reads them with the slots; recomputed per batch of
+    # slots when their lists' scores change (see TaskList._apply_completion_deltas)
+    task_list_count = fields.Integer(compute='_compute_task_stats', store=True)
+    task_completion_score = fields.Float(
+        compute='_compute_task_stats', store=True, aggregator='avg',
+    )
+    task_generation_state = fields.Selection([
+        ('queued', 'Generating Tasks'),
+        ('done', 'Tasks Generated'),
+        ('failed', 'Generation Failed'),
+    ], string='Task Generation', copy=False, readonly=True)
+    task_generation_error = fields.Text(copy=False, readonly=True)
+    task_generation_attempts = fields.Integer(
+        string='Failed Generation Attempts', default=0, copy=False, readonly=True,
+    )
 
-    @api.depends('task_list_ids')
-    def _compute_task_list_count(self):
-        for slot in self:
-            slot.task_list_count = len(slot.task_list_ids)
+    _role_location_start_idx = models.Index('(role_id, work_location_id, start_datetime)')
+    _task_generation_queue_idx = models.Index(
+        "(start_datetime, id) WHERE task_generation_state = 'queued'"
+    )
 
     @api.depends('task_list_ids.completion_score')
-    def _compute_task_completion_score(self):
-        for slot in self:
-            lists = slot.task_list_ids
-            slot.task_completion_score = (
-                sum(l.completion_score for l in lists) / len(lists)
-                if lists else 0.0
+    def _compute_task_stats(self):
+        stats = {
+            slot.id: (count, score)
+            for slot, count, score in self.env['restaurant.task.list']._read_group(
+                [('slot_id', 'in', self.ids)],
+                ['slot_id'],
+                ['__count', 'completion_score:avg'],
             )
+        }
+        for slot in self:
+            slot.task_list_count, slot.task_completion_score = stats.get(slot.id, (0, 0.0))
 
     def action_view_task_lists(self):
         self.ensure_one()
@@ -42,29 +65,120 @@ class PlanningSlot(models.Model):
     def write(self, vals):
         result = super().write(vals)
         if vals.get('state') == 'published':
-            self._auto_generate_task_lists()
+            self._enqueue_task_generation()
         return result
 
-    def _auto_generate_task_lists(self):
+    # ── Task Generation Queue ─────────────────────────────────
+
+    def _enqueue_task_generation(self):
+        """Queue the slots for task list generation in the background
+        (see _cron_generate_queued_task_lists), so publishing a whole week
+        returns immediately. Slots already generated are left alone; failed
+        ones are queued again."""
+        slots = self.filtered(lambda s: s.employee_id and s.task_generation_state != 'done')
+        if not slots:
+            return
+        self.flush_recordset(['task_generation_state'])
+        # In SQL with a condition rather than write(): a slot the queue is
+        # generating right now must not go back to queued once it is done
+        self.env.cr.execute("""
+            UPDATE planning_slot
+               SET task_generation_state = 'queued'
+             WHERE id = ANY(%s)
+               AND task_generation_state IS DISTINCT FROM 'done'
+        """, [slots.ids])
+        slots.invalidate_recordset(['task_generation_state'])
+        cron = self.env.ref('restaurant_task_manager.cron_generate_queued_tasks', raise_if_not_found=False)
+        if cron:
+            cron._trigger()
+
+    @api.model
+    def _lock_queued_slots(self, limit):
+        """Lock a batch of queued slots. Slots another transaction is
+        generating are skipped, so the queue job and the hourly safety net
+        can run concurrently without generating a shift twice."""
+        self.env.cr.execute("""
+            SELECT id FROM planning_slot
+             WHERE task_generation_state = 'queued'
+          ORDER BY start_datetime, id
+             LIMIT %s
+               FOR UPDATE SKIP LOCKED
+        """, [limit])
+        return self.browse([row[0] for row in self.env.cr.fetchall()])
+
+    @api.model
+    def _process_task_generation_queue(self):
+        """Generate the task lists of queued slots, one committed batch at a
+        time. Returns the number of task lists created."""
+        created = 0
+        while True:
+            slots = self._lock_queued_slots(GENERATION_BATCH)
+            if not slots:
+                break
+            created += slots._generate_task_lists()
+            track_cron(scanned=len(slots))
+            remaining = self.search_count([('task_generation_state', '=', 'queued')])
+            if not commit_progress(self.env, len(slots), remaining=remaining):
+                break
+        return created
+
+    @api.model
+    @instrumented_cron
+    def _cron_generate_queued_task_lists(self):
+        """Triggered on publish: drain the task generation queue."""
+        created = self._process_task_generation_queue()
+        _logger.info('Generated %d task lists from the planning queue.', created)
+
+    def _generate_task_lists(self):
+        """Create and fill the task lists of the slots from the task list
+        templates of their role and location. Slots that already have task
+        lists are only marked as generated. Each slot is generated in its own
+        savepoint: a slot whose generation fails (e.g. a template without
+        tasks) is marked as failed with the reason and the others go on.
+        Returns the number of lists."""
         TaskList = self.env['restaurant.task.list']
         templates = self.env['restaurant.task.list.template'].search([
             ('role_ids', '!=', False),
             ('active', '=', True),
         ])
+        with_lists = {
+            slot.id for [slot] in TaskList._read_group(
+                [('slot_id', 'in', self.ids)], ['slot_id'],
+            )
+        }
+        created = 0
+        failed = self.browse()
         for slot in self:
-            if not slot.employee_id:
-                continue
-            if TaskList.search_count([('slot_id', '=', slot.id)]):
+            if not slot.employee_id or slot.id in with_lists:
                 continue
             matching = templates.filtered(
                 lambda t: slot.role_id in t.role_ids and (
                     not t.location_id or t.location_id == slot.work_location_id
                 )
             )
-            for tmpl in matching:
-                tl = TaskList.create({
-                    'template_id': tmpl.id,
-                    'slot_id': slot.id,
+            try:
+                with self.env.cr.savepoint():
+                    for tmpl in matching:
+                        tl = TaskList.create({
+                            'template_id': tmpl.id,
+                            'slot_id': slot.id,
+                        })
+                        tl.action_generate_tasks()
+                        _logger.info('Auto-generated task list "%s" for slot %s', tl.name, slot.id)
+            except Exception as e:
+                _logger.warning('Could not generate the task lists of planning slot %s: %s', slot.id, e)
+                slot.write({
+                    'task_generation_state': 'failed',
+                    'task_generation_error': str(e) or type(e).__name__,
+                    'task_generation_attempts': slot.task_generation_attempts + 1,
                 })
-                tl.action_generate_tasks()
-                _logger.info('Auto-generated task list "%s" for slot %s', tl.name, slot.id)
+                failed |= slot
+                continue
+            created += len(matching)
+        (self - failed).write({
+            'task_generation_state': 'done',
+            'task_generation_error': False,
+            'task_generation_attempts': 0,
+        })
+        track_cron(acted=created)
+        return created
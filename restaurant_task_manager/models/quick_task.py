@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 from odoo import models, fields, api, _
-from odoo.exceptions import ValidationError
+from odoo.exceptions import UserError, ValidationError
 
 
 class QuickTask(models.Model):
@@ -22,6 +22,10 @@ class QuickTask(models.Model):
         readonly=True,
     )
     location_id = fields.Many2one('hr.work.location', string='Location')
+    broadcast_id = fields.Many2one(
+        'restaurant.quick.task.broadcast', string='Broadcast',
+        ondelete='cascade', index='btree_not_null', readonly=True,
+    )
     deadline = fields.Datetime(string='Due By')
     completion_type = fields.Selection([
         ('checkbox', 'Simple Checkbox'),
@@ -87,3 +91,119 @@ class QuickTask(models.Model):
             'proof_photo_filename': False,
             'proof_text_note': False,
         })
+
+
+class QuickTaskBroadcast(models.Model):
+    """One instruction sent to every on-shift employee matching a role and/or
+    location filter, e.g. "all front-of-house: restock napkins". Creates one
+    quick task per employee and tracks their completion in aggregate."""
+    _name = 'restaurant.quick.task.broadcast'
+    _description = 'Quick Task Broadcast'
+    _inherit = ['mail.thread']
+    _order = 'create_date desc'
+
+    name = fields.Char(string='Task', required=True)
+    description = fields.Text(string='Details')
+    role_ids = fields.Many2many(
+        'planning.role',
+        string='Planning Roles',
+        help='Send to employees on shift with these roles. Leave empty for all roles.',
+    )
+    location_id = fields.Many2one(
+        'hr.work.location',
+        string='Location',
+        help='Send to employees on shift at this location. Leave empty for all.',
+    )
+    deadline = fields.Datetime(string='Due By')
+    completion_type = fields.Selection(
+        selection=lambda self: self.env['restaurant.quick.task']._fields['completion_type'].selection,
+        default='checkbox', required=True,
+    )
+    assigned_by_id = fields.Many2one(
+        'hr.employee', string='Assigned By',
+        default=lambda self: self.env.user.employee_id,
+        readonly=True,
+    )
+    state = fields.Selection([
+        ('draft', 'Draft'),
+        ('sent', 'Sent'),
+    ], default='draft', tracking=True)
+    quick_task_ids = fields.One2many('restaurant.quick.task', 'broadcast_id', string='Quick Tasks')
+    task_count = fields.Integer(compute='_compute_progress')
+    done_count = fields.Integer(compute='_compute_progress')
+    progress = fields.Float(string='Done %', compute='_compute_progress')
+
+    @api.depends('quick_task_ids.state')
+    def _compute_progress(self):
+        """Count done/total for all broadcasts in one grouped query."""
+        counts = {}
+        if self.ids:
+            for broadcast, state, count in self.env['restaurant.quick.task']._read_group(
+                [('broadcast_id', 'in', self.ids), ('state', '!=', 'cancelled')],
+                ['broadcast_id', 'state'], ['__count'],
+            ):
+                total, done = counts.get(broadcast.id, (0, 0))
+                counts[broadcast.id] = (total + count, done + (count if state == 'done' else 0))
+        for rec in self:
+            rec.task_count, rec.done_count = counts.get(rec.id, (0, 0))
+            rec.progress = rec.done_count / rec.task_count * 100 if rec.task_count else 0.0
+
+    def _get_on_shift_employees(self):
+        """Employees with a published planning shift running now that
+        matches the role and location filters."""
+        self.ensure_one()
+        now = fields.Datetime.now()
+        domain = [
+            ('start_datetime', '<=', now),
+            ('end_datetime', '>=', now),
+            ('state', '=', 'published'),
+            ('employee_id', '!=', False),
+        ]
+        if self.role_ids:
+            domain.append(('role_id', 'in', self.role_ids.ids))
+        if self.location_id:
+            domain.append(('work_location_id', '=', self.location_id.id))
+        return self.env['planning.slot'].search(domain).employee_id
+
+    def action_send(self):
+        """Create the quick tasks in one batch and notify everyone with a
+        single message on the broadcast."""
+        for rec in self.filtered(lambda b: b.state == 'draft'):
+            employees = rec._get_on_shift_employees()
+            if not employees:
+                raise UserError(_('Nobody matching these filters is on shift right now.'))
+            # Tracking and per-record chatter would cost one message per
+            # employee; the broadcast message below replaces them
+            self.env['restaurant.quick.task'].with_context(
+                tracking_disable=True,
+                mail_create_nolog=True,
+                mail_create_nosubscribe=True,
+            ).create([{
+                'name': rec.name,
+                'description': rec.description,
+                'employee_id': employee.id,
+                'assigned_by_id': rec.assigned_by_id.id,
+                'location_id': rec.location_id.id or employee.work_location_id.id,
+                'deadline': rec.deadline,
+                'completion_type': rec.completion_type,
+                'broadcast_id': rec.id,
+            } for employee in employees])
+            rec.state = 'sent'
+            rec.message_post(
+                body=_('New quick task for %(count)s employees: %(task)s',
+                       count=len(employees), task=rec.name),
+                partner_ids=employees.user_id.partner_id.ids,
+                message_type='comment',
+                subtype_xmlid='mail.mt_comment',
+            )
+
+    def action_view_quick_tasks(self):
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_window',
+            'name': self.name,
+            'res_model': 'restaurant.quick.task',
+            'view_mode': 'list,form',
+            'domain': [('broadcast_id', '=', self.id)],
+            'context': {'create': False},
+        }
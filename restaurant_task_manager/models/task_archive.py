@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+from odoo import models, fields, api
+from datetime import timedelta
+import logging
+
+from .task_cron_run import commit_progress, instrumented_cron, track_cron
+
+_logger = logging.getLogger(__name__)
+
+ARCHIVE_DAYS_PARAM = 'restaurant_task_manager.archive_after_days'
+DEFAULT_ARCHIVE_DAYS = 90
+# Never archive lists the completion reconciliation may still look at
+MIN_ARCHIVE_DAYS = 7
+ARCHIVE_BATCH = 200  # task lists per transaction
+
+
+class TaskItemArchive(models.Model):
+    """Compact, read-only copy of a task item of a closed task list.
+    Archival keeps the task list itself (its stored counters feed the
+    reporting tables) and replaces its items, checklists, chatter and proof
+    attachments by one row per item here, so the hot tables stay small."""
+    _name = 'restaurant.task.item.archive'
+    _description = 'Archived Task Item'
+    _order = 'task_list_id, sequence, id'
+
+    task_list_id = fields.Many2one(
+        'restaurant.task.list', required=True, ondelete='cascade', index=True, readonly=True,
+    )
+    name = fields.Char(readonly=True)
+    sequence = fields.Integer(readonly=True)
+    employee_id = fields.Many2one('hr.employee', readonly=True)
+    location_id = fields.Many2one('hr.work.location', index=True, readonly=True)
+    user_id = fields.Many2one('res.users', index='btree_not_null', readonly=True)
+    completion_type = fields.Selection(
+        selection=lambda self: self.env['restaurant.task.item']._fields['completion_type'].selection,
+        readonly=True,
+    )
+    state = fields.Selection(
+        selection=lambda self: self.env['restaurant.task.item']._fields['state'].selection,
+        readonly=True,
+    )
+    deadline = fields.Datetime(readonly=True)
+    completed_at = fields.Datetime(readonly=True)
+    completed_on_time = fields.Boolean(readonly=True)
+    is_handoff = fields.Boolean(string='Handed Off', readonly=True)
+    proof_numeric_value = fields.Float(string='Recorded Value', readonly=True)
+    proof_text_note = fields.Text(string='Completion Note', readonly=True)
+    staff_comment = fields.Text(readonly=True)
+    subtask_count = fields.Integer(readonly=True)
+    subtask_done_count = fields.Integer(readonly=True)
+    escalation_count = fields.Integer(readonly=True)
+
+    @api.model
+    def _archive_lists(self, task_lists):
+        """Move the items of closed task lists into the archive table.
+        Returns the number of archived items."""
+        task_lists = task_lists.filtered(
+            lambda tl: tl.state in ('done', 'expired') and not tl.items_archived
+        )
+        if not task_lists:
+            return 0
+        Item = self.env['restaurant.task.item']
+        self.env.flush_all()
+        cr = self.env.cr
+        cr.execute("""
+            INSERT INTO restaurant_task_item_archive (
+                task_list_id, name, sequence, employee_id, location_id, user_id,
+                completion_type, state, deadline, completed_at, completed_on_time,
+                is_handoff, proof_numeric_value, proof_text_note, staff_comment,
+                subtask_count, subtask_done_count, escalation_count,
+                create_uid, create_date, write_uid, write_date
+            )
+            SELECT item.task_list_id, item.name, item.sequence, item.employee_id,
+                   item.location_id, item.user_id, item.completion_type, item.state,
+                   item.deadline, item.completed_at, item.completed_on_time,
+                   item.is_handoff, item.proof_numeric_value, item.proof_text_note,
+                   item.staff_comment,
+                   (SELECT count(*) FROM restaurant_task_subtask sub
+                     WHERE sub.task_item_id = item.id),
+                   (SELECT count(*) FROM restaurant_task_subtask sub
+                     WHERE sub.task_item_id = item.id AND sub.is_done),
+                   (SELECT count(*) FROM restaurant_task_escalation_log log
+                     WHERE log.item_id = item.id),
+                   %(uid)s, now() at time zone 'UTC', %(uid)s, now() at time zone 'UTC'
+              FROM restaurant_task_item item
+             WHERE item.task_list_id = ANY(%(list_ids)s)
+         RETURNING 1
+        """, {'uid': self.env.uid, 'list_ids': task_lists.ids})
+        archived = len(cr.fetchall())
+
+        items = Item.search([('task_list_id', 'in', task_lists.ids)])
+        # Chatter and tracking values of the items (tracking values cascade
+        # with their message); the lists keep their own chatter.
+        cr.execute("""
+            DELETE FROM mail_message WHERE model = %(model)s AND res_id = ANY(%(ids)s);
+            DELETE FROM mail_followers WHERE res_model = %(model)s AND res_id = ANY(%(ids)s);
+            DELETE FROM mail_activity WHERE res_model = %(model)s AND res_id = ANY(%(ids)s);
+        """, {'model': Item._name, 'ids': items.ids})
+        # Proof photos and signatures: through the ORM so the filestore is
+        # garbage collected
+        self.env['ir.attachment'].sudo().search([
+            ('res_model', '=', Item._name),
+            ('res_id', 'in', items.ids),
+            '|', ('res_field', '=', False), ('res_field', '!=', False),
+        ]).unlink()
+        # Subtasks and escalation logs cascade in the database. The list
+        # counters stay untouched on purpose: they are the summary.
+        cr.execute("DELETE FROM restaurant_task_item WHERE id = ANY(%s)", [items.ids])
+        task_lists.write({'items_archived': True})
+        self.env.invalidate_all()
+        return archived
+
+    @api.model
+    @instrumented_cron
+    def _cron_archive_history(self):
+        """Archive task lists closed for more than the configured number of
+        days (system parameter restaurant_task_manager.archive_after_days),
+        one committed batch at a time."""
+        ICP = self.env['ir.config_parameter'].sudo()
+        days = int(ICP.get_param(ARCHIVE_DAYS_PARAM, DEFAULT_ARCHIVE_DAYS))
+        if days <= 0:
+            return
+        cutoff = fields.Datetime.now() - timedelta(days=max(days, MIN_ARCHIVE_DAYS))
+        TaskList = self.env['restaurant.task.list']
+        domain = [
+            ('state', 'in', ('done', 'expired')),
+            ('shift_end', '<', cutoff),
+            ('items_archived', '=', False),
+        ]
+        total_lists = total_items = 0
+        while True:
+            task_lists = TaskList.search(domain, order='shift_end', limit=ARCHIVE_BATCH)
+            if not task_lists:
+                break
+            archived = self._archive_lists(task_lists)
+            track_cron(scanned=len(task_lists), acted=archived)
+            total_items += archived
+            total_lists += len(task_lists)
+            if not commit_progress(
+                self.env, len(task_lists), remaining=TaskList.search_count(domain),
+            ):
+                break
+        _logger.info('Archived %d task items of %d task lists.', total_items, total_lists)
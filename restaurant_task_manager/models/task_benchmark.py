@@ -0,0 +1,464 @@
+# -*- coding: utf-8 -*-
+from odoo import models, fields, api
+from odoo.tools import split_every
+from datetime import datetime, time as dt_time, timedelta
+import json
+import logging
+import random
+import statistics
+import threading
+import time
+
+from .task_archive import ARCHIVE_DAYS_PARAM
+
+_logger = logging.getLogger(__name__)
+
+BENCH_PREFIX = '[bench]'
+BENCH_ROLES = [
+    # (name, shift start hour)
+    ('Kitchen Opener', 6),
+    ('Kitchen Closer', 15),
+    ('Front of House Opener', 10),
+    ('Front of House Closer', 16),
+    ('Bar', 17),
+    ('Shift Lead', 9),
+]
+SHIFT_HOURS = 8
+CREATE_BATCH = 500  # task lists per create batch
+
+# Every instrumented task list job, in the order the benchmarks run them
+BENCH_CRONS = [
+    '_cron_refresh_deadline_state',
+    '_cron_check_overdue_tasks',
+    '_cron_pre_deadline_reminders',
+    '_cron_escalation',
+    '_cron_shift_handoff',
+    '_cron_send_warning_emails',
+    '_cron_auto_generate_from_slots',
+    '_cron_reconcile_completion',
+]
+# Models searched, counted and grouped under the staff and manager record
+# rules, with the field they are grouped by
+BENCH_RULE_MODELS = [
+    ('restaurant.task.list', 'state'),
+    ('restaurant.task.item', 'state'),
+    ('restaurant.task.subtask', 'is_done'),
+]
+# Tables the history archive keeps small, reported with every run
+BENCH_HOT_TABLES = ['restaurant_task_item', 'restaurant_task_subtask', 'mail_tracking_value']
+
+
+class TaskBenchmark(models.AbstractModel):
+    """Synthetic production-scale datasets and timing baselines.
+
+    From an Odoo shell on a throw-away database (with no outgoing mail
+    server — the crons send emails)::
+
+        bench = env['restaurant.task.benchmark']
+        bench._generate_dataset(locations=12, employees=400, days=7, history_days=60)
+        env.cr.commit()
+        bench._run_benchmarks(output='/tmp/tasks-19.0.json',
+                              baseline='/tmp/tasks-previous.json')
+
+    Every benchmark runs inside a savepoint that is rolled back, so the same
+    dataset can be measured repeatedly and across releases."""
+    _name = 'restaurant.task.benchmark'
+    _description = 'Task Manager Dataset Generator and Benchmarks'
+
+    # ── Dataset Generator ────────────────────────────────────
+
+    @api.model
+    def _generate_dataset(self, locations=12, employees=400, days=7, history_days=0,
+                          tasks_per_template=12, subtasks_per_task=3,
+                          completion_rate=0.85, seed=42):
+        """Create locations, roles, staff users/employees, templates with
+        tasks and checklists, published planning slots (one shift per
+        employee per day) with their task lists, and — for the
+        `history_days` before today — completed history with attendances.
+        All records are named with the "[bench]" prefix.
+        Returns the number of records created per model."""
+        rng = random.Random(seed)
+        env = self.env(context=dict(
+            self.env.context,
+            tracking_disable=True,
+            mail_create_nolog=True,
+            mail_create_nosubscribe=True,
+            no_reset_password=True,
+        ))
+        counts = {}
+
+        partner = env.company.partner_id
+        work_locations = env['hr.work.location'].create([
+            {'name': '%s Location %02d' % (BENCH_PREFIX, i + 1), 'address_id': partner.id}
+            for i in range(locations)
+        ])
+        roles = env['planning.role'].create([
+            {'name': '%s %s' % (BENCH_PREFIX, name), 'color': i + 1}
+            for i, (name, _hour) in enumerate(BENCH_ROLES)
+        ])
+        start_hours = {role.id: hour for role, (_name, hour) in zip(roles, BENCH_ROLES)}
+        counts['hr.work.location'] = len(work_locations)
+        counts['planning.role'] = len(roles)
+
+        staff_group = env.ref('restaurant_task_manager.group_task_staff')
+        users = env['res.users'].create([
+            {
+                'name': '%s Employee %04d' % (BENCH_PREFIX, i + 1),
+                'login': 'bench.employee.%04d@example.com' % (i + 1),
+                'group_ids': [(4, env.ref('base.group_user').id), (4, staff_group.id)],
+            }
+            for i in range(employees)
+        ])
+        staff = env['hr.employee'].create([
+            {
+                'name': user.name,
+                'user_id': user.id,
+                'work_location_id': work_locations[i % locations].id,
+                'default_planning_role_id': roles[i % len(roles)].id,
+            }
+            for i, user in enumerate(users)
+        ])
+        counts['res.users'] = counts['hr.employee'] = len(staff)
+
+        list_templates = self._generate_templates(
+            env, roles, tasks_per_template, subtasks_per_task,
+        )
+        counts['restaurant.task.list.template'] = len(list_templates)
+
+        today = fields.Date.context_today(self)
+        slot_vals = []
+        for day in range(-history_days, days):
+            date = today + timedelta(days=day)
+            for employee in staff:
+                role = employee.default_planning_role_id
+                start = datetime.combine(date, dt_time(start_hours[role.id]))
+                slot_vals.append({
+                    'resource_id': employee.resource_id.id,
+                    'role_id': role.id,
+                    'work_location_id': employee.work_location_id.id,
+                    'start_datetime': start,
+                    'end_datetime': start + timedelta(hours=SHIFT_HOURS),
+                    'state': 'published',
+                })
+        Slot = env['planning.slot']
+        slots = Slot.browse()
+        for batch in split_every(CREATE_BATCH * 4, slot_vals):
+            slots |= Slot.create(list(batch))
+        counts['planning.slot'] = len(slots)
+
+        templates_by_role = {}
+        for tmpl in list_templates:
+            for role in tmpl.role_ids:
+                templates_by_role.setdefault(role.id, []).append(tmpl)
+        TaskList = env['restaurant.task.list']
+        lists = TaskList.browse()
+        pairs = [
+            (slot, tmpl)
+            for slot in slots
+            for tmpl in templates_by_role.get(slot.role_id.id, [])
+        ]
+        for batch in split_every(CREATE_BATCH, pairs):
+            created = TaskList.create([
+                {'slot_id': slot.id, 'template_id': tmpl.id} for slot, tmpl in batch
+            ])
+            self._generate_items(env, created)
+            lists |= created
+        counts['restaurant.task.list'] = len(lists)
+        counts['restaurant.task.item'] = sum(lists.mapped('total_tasks'))
+
+        now = fields.Datetime.now()
+        history = lists.filtered(lambda tl: tl.shift_end < now)
+        counts['hr.attendance'] = self._generate_history(env, history, completion_rate, rng)
+        env.flush_all()
+        _logger.info('Generated benchmark dataset: %s', counts)
+        return counts
+
+    def _generate_templates(self, env, roles, tasks_per_template, subtasks_per_task):
+        """One task list template per role, alternating checkout policies,
+        with a realistic mix of completion types and deadlines."""
+        completion_types = ['checkbox', 'checkbox', 'numeric', 'text', 'photo', 'checkbox']
+        list_templates = env['restaurant.task.list.template'].create([
+            {
+                'name': '%s %s Tasks' % (BENCH_PREFIX, role.name),
+                'role_ids': [(6, 0, role.ids)],
+                'checkout_policy': 'block' if i % 2 else 'warn',
+            }
+            for i, role in enumerate(roles)
+        ])
+        task_templates = env['restaurant.task.template'].create([
+            {
+                'task_list_template_id': list_template.id,
+                'name': 'Task %02d' % (n + 1),
+                'sequence': (n + 1) * 10,
+                'completion_type': completion_types[n % len(completion_types)],
+                'numeric_label': 'Temperature (°C)',
+                'numeric_min': 0,
+                'numeric_max': 4,
+                'has_deadline': n % 3 == 0,
+                'relative_deadline_minutes': 60 + 30 * n,
+                'reminder_minutes_before': 15 if n % 3 == 0 else 0,
+            }
+            for list_template in list_templates
+            for n in range(tasks_per_template)
+        ])
+        env['restaurant.subtask.template'].create([
+            {
+                'task_template_id': task_template.id,
+                'name': 'Step %d' % (n + 1),
+                'sequence': (n + 1) * 10,
+            }
+            for task_template in task_templates
+            for n in range(subtasks_per_task)
+        ])
+        return list_templates
+
+    def _generate_items(self, env, task_lists):
+        """Same items as action_generate_tasks, created in bulk."""
+        item_vals, version_lines = [], []
+        for tl in task_lists:
+            for line in tl.template_id._get_current_version().line_ids:
+                item_vals.append(tl._prepare_item_vals(line))
+                version_lines.append(line)
+        items = env['restaurant.task.item'].create(item_vals)
+        env['restaurant.task.subtask'].create([
+            {'task_item_id': item.id, 'name': st.name, 'sequence': st.sequence}
+            for item, line in zip(items, version_lines)
+            for st in line.subtask_ids
+        ])
+        task_lists.write({'state': 'active'})
+
+    def _generate_history(self, env, task_lists, completion_rate, rng):
+        """Complete past task lists (about `completion_rate` of their items),
+        close them and clock their employees in and out of the shift.
+        Returns the number of attendances created."""
+        if not task_lists:
+            return 0
+        items = env['restaurant.task.item'].search([('task_list_id', 'in', task_lists.ids)])
+        done = items.filtered(lambda i: rng.random() < completion_rate)
+        for batch in split_every(CREATE_BATCH * 20, done.ids, env['restaurant.task.item'].browse):
+            batch.subtask_ids.write({'is_done': True})
+            batch.write({'state': 'done', 'completed_at': fields.Datetime.now()})
+        # Spread completion times over the shift, as in production
+        env.flush_all()
+        env.cr.execute("""
+            UPDATE restaurant_task_item item
+               SET completed_at = tl.shift_start + random() * (tl.shift_end - tl.shift_start),
+                   completed_on_time = NULL
+              FROM restaurant_task_list tl
+             WHERE tl.id = item.task_list_id
+               AND item.id = ANY(%s)
+        """, [done.ids])
+        env.cr.execute("""
+            UPDATE restaurant_task_item
+               SET completed_on_time = NOT has_deadline OR completed_at <= deadline
+             WHERE id = ANY(%s)
+        """, [done.ids])
+        env.invalidate_all()
+        complete = task_lists.filtered(lambda tl: tl.completed_tasks == tl.total_tasks)
+        complete.write({'state': 'done'})
+        (task_lists - complete).write({'state': 'expired', 'warning_sent': True})
+        shifts = {(tl.employee_id, tl.shift_start, tl.shift_end) for tl in task_lists}
+        attendances = env['hr.attendance'].create([
+            {'employee_id': employee.id, 'check_in': start, 'check_out': end}
+            for employee, start, end in sorted(shifts, key=lambda s: (s[0].id, s[1]))
+        ])
+        return len(attendances)
+
+    # ── Benchmarks ───────────────────────────────────────────
+
+    @api.model
+    def _run_benchmarks(self, output=None, baseline=None, repeat=3, sample_size=50,
+                        tolerance=0.25):
+        """Time and count the queries of every task list cron, task
+        generation, task completion, attendance checkout, history archive
+        and of reading tasks under the staff and manager record rules, and
+        report the size of the tables the archive keeps small.
+        Results (median of `repeat` runs) are written as JSON to `output`;
+        when a previous `baseline` file is given, cases whose query count
+        grew or whose duration grew by more than `tolerance` are reported
+        as regressions. Returns the result dict."""
+        # The crons commit their batches otherwise, escaping the rolled back
+        # savepoints of _measure
+        self = self.with_context(restaurant_task_no_commit=True)
+        cases = [(name, self._bench_cron(name)) for name in BENCH_CRONS]
+        cases += [
+            ('action_generate_tasks', self._bench_generate_tasks(sample_size)),
+            ('action_complete', self._bench_complete(sample_size)),
+            ('attendance_checkout', self._bench_checkout(sample_size)),
+            ('record_rules_staff', self._bench_record_rules('group_task_staff')),
+            ('record_rules_manager', self._bench_record_rules('group_task_manager')),
+            ('_cron_archive_history', self._bench_archive()),
+        ]
+        module = self.env['ir.module.module'].search([('name', '=', 'restaurant_task_manager')])
+        result = {
+            'module_version': module.latest_version,
+            'database': self.env.cr.dbname,
+            'date': fields.Datetime.to_string(fields.Datetime.now()),
+            'sample_size': sample_size,
+            'dataset': {
+                model: self.env[model].search_count([])
+                for model in ('planning.slot', 'restaurant.task.list',
+                              'restaurant.task.item', 'restaurant.task.subtask',
+                              'hr.attendance')
+            },
+            'table_size': self._table_sizes(),
+            'results': {},
+        }
+        for name, case in cases:
+            runs = [self._measure(case) for _i in range(repeat)]
+            result['results'][name] = {
+                key: statistics.median(run[key] for run in runs)
+                for key in ('duration', 'query_count', 'query_time')
+            }
+            _logger.info('Benchmark %s: %s', name, result['results'][name])
+
+        if baseline:
+            with open(baseline) as f:
+                previous = json.load(f)['results']
+            result['regressions'] = [
+                name
+                for name, current in result['results'].items()
+                if name in previous and (
+                    current['query_count'] > previous[name]['query_count']
+                    or current['duration'] > previous[name]['duration'] * (1 + tolerance)
+                )
+            ]
+            for name in result['regressions']:
+                _logger.warning(
+                    'Benchmark regression in %s: %s (baseline %s)',
+                    name, result['results'][name], previous[name],
+                )
+        if output:
+            with open(output, 'w') as f:
+                json.dump(result, f, indent=2, sort_keys=True)
+        return result
+
+    def _measure(self, case):
+        """Run `case` (setup, run) in a rolled back savepoint and return the
+        wall time and queries of `run` alone."""
+        setup, run = case
+        thread = threading.current_thread()
+        for attr in ('query_count', 'query_time'):
+            if not hasattr(thread, attr):
+                setattr(thread, attr, 0)
+        cr = self.env.cr
+        with cr.savepoint(flush=False) as savepoint:
+            args = setup()
+            self.env.flush_all()
+            self.env.invalidate_all()
+            query_count, query_time = thread.query_count, thread.query_time
+            start = time.perf_counter()
+            run(*args)
+            self.env.flush_all()
+            measure = {
+                'duration': time.perf_counter() - start,
+                'query_count': thread.query_count - query_count,
+                'query_time': thread.query_time - query_time,
+            }
+            savepoint.rollback()
+        self.env.invalidate_all()
+        return measure
+
+    def _table_sizes(self):
+        """Total size in bytes (with indexes and TOAST) of BENCH_HOT_TABLES."""
+        self.env.cr.execute("""
+            SELECT name, pg_total_relation_size(name::regclass)
+              FROM unnest(%s::text[]) AS name
+        """, [BENCH_HOT_TABLES])
+        return dict(self.env.cr.fetchall())
+
+    def _bench_cron(self, method):
+        TaskList = self.env['restaurant.task.list']
+        return (lambda: (), lambda: getattr(TaskList, method)())
+
+    def _bench_generate_tasks(self, sample_size):
+        def setup():
+            slots = self.env['planning.slot'].search([
+                ('state', '=', 'published'),
+                ('start_datetime', '>', fields.Datetime.now()),
+                ('employee_id', '!=', False),
+                ('role_id', '!=', False),
+            ], limit=sample_size)
+            templates = self.env['restaurant.task.list.template'].search([
+                ('task_template_ids', '!=', False),
+            ])
+            vals = []
+            for slot in slots:
+                tmpl = templates.filtered(lambda t: slot.role_id in t.role_ids)[:1]
+                if tmpl:
+                    vals.append({'slot_id': slot.id, 'template_id': tmpl.id})
+            return (self.env['restaurant.task.list'].create(vals),)
+        return (setup, lambda task_lists: task_lists.action_generate_tasks())
+
+    def _bench_complete(self, sample_size):
+        def setup():
+            items = self.env['restaurant.task.item'].search([
+                ('state', '!=', 'done'),
+                ('completion_type', '=', 'checkbox'),
+                ('task_list_id.state', '=', 'active'),
+            ], limit=sample_size)
+            items.subtask_ids.write({'is_done': True})
+            return (items,)
+        return (setup, lambda items: items.action_complete())
+
+    def _bench_checkout(self, sample_size):
+        def setup():
+            now = fields.Datetime.now()
+            task_lists = self.env['restaurant.task.list'].search([
+                ('state', '=', 'active'),
+                ('shift_start', '<=', now),
+                ('shift_end', '>=', now),
+            ], limit=sample_size)
+            # Only the warn policy lets the checkout through; block lists are
+            # still evaluated, but completed first
+            task_lists.filtered(lambda tl: tl.checkout_policy == 'block').task_item_ids.write({
+                'state': 'done', 'completed_at': now,
+            })
+            checked_in = self.env['hr.attendance'].search([
+                ('employee_id', 'in', task_lists.employee_id.ids), ('check_out', '=', False),
+            ]).employee_id
+            employees = task_lists.employee_id - checked_in
+            attendances = self.env['hr.attendance'].create([
+                {'employee_id': employee.id, 'check_in': now - timedelta(hours=2)}
+                for employee in employees
+            ])
+            return (attendances,)
+        return (setup, lambda attendances: attendances.write({'check_out': fields.Datetime.now()}))
+
+    def _bench_record_rules(self, group_xmlid):
+        """Search, count and group task lists, items and subtasks as a
+        benchmark user of the `group_xmlid` group, so its record rules apply."""
+        def setup():
+            user = self.env['res.users'].search([
+                ('login', '=like', 'bench.employee.%'),
+                ('employee_ids.work_location_id', '!=', False),
+            ], limit=1)
+            group = self.env.ref('restaurant_task_manager.%s' % group_xmlid)
+            if group not in user.group_ids:
+                user.write({'group_ids': [(4, group.id)]})
+            return (user,)
+
+        def run(user):
+            for model, groupby in BENCH_RULE_MODELS:
+                Model = self.env[model].with_user(user)
+                Model.search([], limit=80)
+                Model.search_count([])
+                Model._read_group([], [groupby], ['__count'])
+        return (setup, run)
+
+    def _bench_archive(self):
+        """Steady-state archive run: the archive delay is set so that only
+        the oldest day of closed, unarchived task lists is due."""
+        def setup():
+            oldest = self.env['restaurant.task.list'].search([
+                ('state', 'in', ('done', 'expired')),
+                ('items_archived', '=', False),
+            ], order='shift_end', limit=1)
+            if oldest:
+                days = (fields.Datetime.now() - oldest.shift_end).days
+                self.env['ir.config_parameter'].sudo().set_param(
+                    ARCHIVE_DAYS_PARAM, max(days, 1),
+                )
+            return ()
+        Archive = self.env['restaurant.task.item.archive']
+        return (setup, lambda: Archive._cron_archive_history())
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+from odoo import models, fields, api
+from dateutil.relativedelta import relativedelta
+import logging
+import time
+
+from .task_cron_run import instrumented_cron
+
+_logger = logging.getLogger(__name__)
+
+# Team averages are shown next to every employee card; they only move when
+# the stat table is refreshed, so a short per-process cache is enough.
+TEAM_AVG_TTL = 300  # seconds
+_team_avg_cache = {}
+
+
+class TaskCompletionStat(models.Model):
+    """Pre-aggregated task list completion per employee, location and month.
+    Rebuilt for recent months by a cron so employee and team averages never
+    have to load an employee's full task list history."""
+    _name = 'restaurant.task.completion.stat'
+    _description = 'Task Completion Statistics'
+    _order = 'period desc'
+
+    employee_id = fields.Many2one('hr.employee', required=True, index=True, ondelete='cascade')
+    location_id = fields.Many2one('hr.work.location', index=True, ondelete='cascade')
+    period = fields.Date(string='Month', required=True, index=True)
+    list_count = fields.Integer(string='Task Lists')
+    score_sum = fields.Float(string='Sum of Completion %')
+
+    @api.model
+    def _refresh(self, since=None):
+        """Recompute the aggregates for months starting at `since` (a date),
+        or for the whole history when `since` is None."""
+        self.env['restaurant.task.list'].flush_model([
+            'employee_id', 'location_id', 'shift_start', 'state', 'completion_score',
+        ])
+        cr = self.env.cr
+        if since:
+            cr.execute("DELETE FROM restaurant_task_completion_stat WHERE period >= %s", [since])
+        else:
+            cr.execute("DELETE FROM restaurant_task_completion_stat")
+        cr.execute("""
+            INSERT INTO restaurant_task_completion_stat
+                   (employee_id, location_id, period, list_count, score_sum,
+                    create_uid, create_date, write_uid, write_date)
+            SELECT tl.employee_id, tl.location_id,
+                   date_trunc('month', tl.shift_start)::date,
+                   count(*), sum(tl.completion_score),
+                   %(uid)s, now() at time zone 'UTC', %(uid)s, now() at time zone 'UTC'
+              FROM restaurant_task_list tl
+             WHERE tl.state IN ('active', 'done', 'expired')
+               AND tl.employee_id IS NOT NULL
+               AND tl.shift_start IS NOT NULL
+               AND (%(since)s::date IS NULL OR tl.shift_start >= %(since)s::date)
+          GROUP BY 1, 2, 3
+        """, {'uid': self.env.uid, 'since': since})
+        self.invalidate_model()
+        _team_avg_cache.clear()
+
+    @api.model
+    @instrumented_cron
+    def _cron_refresh_stats(self):
+        """Refresh the current and previous month (full rebuild when empty)."""
+        since = None
+        if self.search_count([], limit=1):
+            since = fields.Date.today().replace(day=1) - relativedelta(months=1)
+        self._refresh(since)
+        _logger.info('Refreshed task completion statistics since %s.', since or 'the beginning')
+
+    @api.model
+    def _get_employee_averages(self, employee_ids):
+        """Return {employee_id: (list_count, avg_completion)}."""
+        groups = self.sudo()._read_group(
+            [('employee_id', 'in', list(employee_ids))],
+            ['employee_id'], ['list_count:sum', 'score_sum:sum'],
+        )
+        return {
+            employee.id: (count, score / count if count else 0.0)
+            for employee, count, score in groups
+        }
+
+    @api.model
+    def _get_team_average(self, location_id=False):
+        """Average completion at a location (or company-wide when falsy),
+        cached for TEAM_AVG_TTL seconds."""
+        key = (self.env.cr.dbname, location_id or False)
+        cached = _team_avg_cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+        domain = [('location_id', '=', location_id)] if location_id else []
+        [(count, score)] = self.sudo()._read_group(
+            domain, [], ['list_count:sum', 'score_sum:sum'],
+        )
+        value = score / count if count else 0.0
+        _team_avg_cache[key] = (time.monotonic() + TEAM_AVG_TTL, value)
+        return value
@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+from odoo import models, fields, api, tools
+from datetime import timedelta
+import contextvars
+import functools
+import logging
+import threading
+import time
+
+_logger = logging.getLogger(__name__)
+
+CRON_RUN_RETENTION_DAYS = 30
+INTERVAL_SECONDS = {
+    'minutes': 60,
+    'hours': 3600,
+    'days': 86400,
+    'weeks': 7 * 86400,
+    'months': 30 * 86400,
+}
+
+# Counters of the cron run in progress, see instrumented_cron()/track_cron()
+_current_run = contextvars.ContextVar('restaurant_task_cron_run', default=None)
+
+
+def instrumented_cron(method):
+    """Record wall time, SQL queries and the track_cron() counters of a
+    _cron_* method in restaurant.task.cron.run. Nested instrumented calls
+    are counted in the outer run."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if _current_run.get() is not None:
+            return method(self, *args, **kwargs)
+        stats = {'scanned': 0, 'acted': 0, 'notified': 0}
+        token = _current_run.set(stats)
+        # sql_db accumulates on these when present (as for HTTP requests)
+        thread = threading.current_thread()
+        for attr in ('query_count', 'query_time'):
+            if not hasattr(thread, attr):
+                setattr(thread, attr, 0)
+        query_count, query_time = thread.query_count, thread.query_time
+        started_at = fields.Datetime.now()
+        start = time.perf_counter()
+        error = False
+        try:
+            return method(self, *args, **kwargs)
+        except Exception as e:
+            error = str(e) or type(e).__name__
+            raise
+        finally:
+            _current_run.reset(token)
+            self.env['restaurant.task.cron.run']._log_run(
+                self._name, method.__name__, started_at,
+                duration=time.perf_counter() - start,
+                query_count=thread.query_count - query_count,
+                query_time=thread.query_time - query_time,
+                error=error,
+                **stats,
+            )
+    return wrapper
+
+
+def track_cron(scanned=0, acted=0, notified=0):
+    """Add to the counters of the instrumented cron run in progress, if any."""
+    stats = _current_run.get()
+    if stats is not None:
+        stats['scanned'] += scanned
+        stats['acted'] += acted
+        stats['notified'] += notified
+
+
+def commit_progress(env, processed, remaining=None):
+    """ir.cron._commit_progress(): commit a batch of a cron job and return
+    whether to go on. Callers that run the job inside their own transaction
+    (the benchmarks, which roll it back) set the restaurant_task_no_commit
+    context key: nothing is committed and the job goes on."""
+    if env.context.get('restaurant_task_no_commit'):
+        return True
+    return env['ir.cron']._commit_progress(processed, remaining=remaining)
+
+
+class TaskCronRun(models.Model):
+    """One execution of an instrumented restaurant task cron job."""
+    _name = 'restaurant.task.cron.run'
+    _description = 'Task Cron Run'
+    _order = 'started_at desc, id desc'
+    _log_access = False
+
+    cron_id = fields.Many2one('ir.cron', string='Scheduled Action', ondelete='set null', readonly=True)
+    model = fields.Char(readonly=True)
+    method = fields.Char(readonly=True, index=True)
+    started_at = fields.Datetime(readonly=True, index=True)
+    duration = fields.Float(string='Duration (s)', readonly=True, aggregator='avg')
+    query_count = fields.Integer(string='Queries', readonly=True, aggregator='avg')
+    query_time = fields.Float(string='Query Time (s)', readonly=True, aggregator='avg')
+    scanned = fields.Integer(string='Records Scanned', readonly=True)
+    acted = fields.Integer(string='Records Acted On', readonly=True)
+    notified = fields.Integer(string='Notifications Sent', readonly=True)
+    interval_seconds = fields.Integer(readonly=True, aggregator=False)
+    overrun = fields.Boolean(
+        readonly=True, help='The run took longer than the interval of its scheduled action.',
+    )
+    error = fields.Text(readonly=True)
+
+    @api.model
+    def _log_run(self, model, method, started_at, duration, query_count, query_time,
+                 scanned, acted, notified, error=False):
+        """Store a run in its own transaction so failed runs (whose transaction
+        is rolled back) are recorded too. Never raises."""
+        interval = 0
+        try:
+            with self.env.registry.cursor() as cr:
+                env = api.Environment(cr, self.env.uid, {})
+                cron = env['ir.cron'].sudo().with_context(active_test=False).search([
+                    ('model_id.model', '=', model),
+                    ('code', '=', 'model.%s()' % method),
+                ], limit=1)
+                interval = (
+                    cron.interval_number * INTERVAL_SECONDS.get(cron.interval_type, 0)
+                    if cron else 0
+                )
+                env[self._name].sudo().create({
+                    'cron_id': cron.id,
+                    'model': model,
+                    'method': method,
+                    'started_at': started_at,
+                    'duration': duration,
+                    'query_count': query_count,
+                    'query_time': query_time,
+                    'scanned': scanned,
+                    'acted': acted,
+                    'notified': notified,
+                    'interval_seconds': interval,
+                    'overrun': bool(interval) and duration > interval,
+                    'error': error,
+                })
+        except Exception:
+            _logger.exception('Could not log the run of %s.%s', model, method)
+        if error:
+            _logger.warning('%s.%s failed after %.2fs', model, method, duration)
+        elif interval and duration > interval:
+            _logger.warning(
+                '%s.%s took %.1fs, longer than its %ds interval',
+                model, method, duration, interval,
+            )
+
+    @api.autovacuum
+    def _gc_cron_runs(self):
+        self.search([
+            ('started_at', '<', fields.Datetime.now() - timedelta(days=CRON_RUN_RETENTION_DAYS)),
+        ]).unlink()
+
+
+class TaskCronRunStat(models.Model):
+    """Daily duration percentiles per cron job, for spotting slow trends."""
+    _name = 'restaurant.task.cron.run.stat'
+    _description = 'Task Cron Run Statistics'
+    _auto = False
+    _order = 'date desc, method'
+
+    date = fields.Date(readonly=True)
+    method = fields.Char(readonly=True)
+    run_count = fields.Integer(string='Runs', readonly=True)
+    failed_count = fields.Integer(string='Failed', readonly=True)
+    overrun_count = fields.Integer(string='Overruns', readonly=True)
+    duration_p50 = fields.Float(string='p50 (s)', readonly=True, aggregator='max')
+    duration_p95 = fields.Float(string='p95 (s)', readonly=True, aggregator='max')
+    duration_max = fields.Float(string='Max (s)', readonly=True, aggregator='max')
+    query_count_p95 = fields.Float(string='Queries p95', readonly=True, aggregator='max')
+
+    def init(self):
+        tools.drop_view_if_exists(self.env.cr, self._table)
+        self.env.cr.execute("""
+            CREATE VIEW %s AS (
+                SELECT min(id) AS id,
+                       started_at::date AS date,
+                       method,
+                       count(*) AS run_count,
+                       count(*) FILTER (WHERE error IS NOT NULL) AS failed_count,
+                       count(*) FILTER (WHERE overrun) AS overrun_count,
+                       percentile_cont(0.5) WITHIN GROUP (ORDER BY duration) AS duration_p50,
+                       percentile_cont(0.95) WITHIN GROUP (ORDER BY duration) AS duration_p95,
+                       max(duration) AS duration_max,
+                       percentile_cont(0.95) WITHIN GROUP (ORDER BY query_count) AS query_count_p95
+                  FROM restaurant_task_cron_run
+              GROUP BY started_at::date, method
+            )
+        """ % self._table)
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+from odoo import models, fields, api
+import logging
+import time
+
+from .task_cron_run import commit_progress
+
+_logger = logging.getLogger(__name__)
+
+
+class TaskCronShard(models.Model):
+    """One location's share of a sharded restaurant task cron job.
+
+    Each run of a job has a generation number. Workers claim the shards
+    not processed in the current generation one at a time with
+    SELECT ... FOR UPDATE SKIP LOCKED, process the location in a savepoint
+    and commit. A failing or slow location therefore neither rolls back nor
+    holds up the others, and duplicating a scheduled action adds a worker
+    that joins the run in progress instead of repeating it; a new
+    generation starts once every shard is processed."""
+    _name = 'restaurant.task.cron.shard'
+    _description = 'Task Cron Shard'
+    _order = 'method, location_id'
+    _log_access = False
+
+    method = fields.Char(required=True, readonly=True)
+    # Empty for task lists whose shift has no work location
+    location_id = fields.Many2one('hr.work.location', ondelete='cascade', readonly=True)
+    generation = fields.Integer(
+        default=0, readonly=True, help='Last run of the job that processed this shard.',
+    )
+    last_run_at = fields.Datetime(
+        readonly=True, help='Start of the cron run that last processed this shard.',
+    )
+    last_duration = fields.Float(string='Last Duration (s)', readonly=True)
+    last_error = fields.Text(readonly=True)
+
+    _method_location_uniq = models.UniqueIndex('(method, COALESCE(location_id, 0))')
+
+    @api.model
+    def _ensure_shards(self, method):
+        """Create the missing shards of a job, one per work location plus
+        one for lists without location. New shards join the next run."""
+        self.env.cr.execute("""
+            INSERT INTO restaurant_task_cron_shard (method, location_id, generation)
+            SELECT %(method)s, loc.id, (
+                       SELECT COALESCE(max(generation), 0)
+                         FROM restaurant_task_cron_shard WHERE method = %(method)s
+                   )
+              FROM (SELECT id FROM hr_work_location UNION ALL SELECT NULL) loc
+       ON CONFLICT DO NOTHING
+        """, {'method': method})
+
+    @api.model
+    def _get_run_generation(self, method):
+        """Generation of the run to work on: the run in progress while some
+        of its shards are left, else a new one."""
+        self.env.cr.execute("""
+            SELECT max(generation), min(generation)
+              FROM restaurant_task_cron_shard WHERE method = %s
+        """, [method])
+        latest, oldest = self.env.cr.fetchone()
+        latest, oldest = latest or 0, oldest or 0
+        return latest if oldest < latest else latest + 1
+
+    @api.model
+    def _claim(self, method, generation):
+        """Lock and return a shard of the job not processed in this
+        generation yet, skipping those other workers hold. Empty when none
+        is left."""
+        self.env.cr.execute("""
+            SELECT id FROM restaurant_task_cron_shard
+             WHERE method = %s
+               AND generation < %s
+          ORDER BY generation, id
+             LIMIT 1
+               FOR UPDATE SKIP LOCKED
+        """, [method, generation])
+        row = self.env.cr.fetchone()
+        return self.browse(row[0] if row else [])
+
+    @api.model
+    def _run(self, records, method):
+        """Call records.<method>(location) once per location shard of the job,
+        committing after each shard when running as a scheduled action
+        (see commit_progress). Returns the number of shards that failed."""
+        self._ensure_shards(method)
+        generation = self._get_run_generation(method)
+        run_started_at = fields.Datetime.now()
+        remaining_domain = [('method', '=', method), ('generation', '<', generation)]
+        failed = 0
+        while True:
+            shard = self._claim(method, generation)
+            if not shard:
+                break
+            start = time.perf_counter()
+            error = False
+            try:
+                with self.env.cr.savepoint():
+                    getattr(records, method)(shard.location_id)
+            except Exception as e:
+                error = str(e) or type(e).__name__
+                failed += 1
+                _logger.exception(
+                    '%s failed for location %s', method, shard.location_id.name or '(none)',
+                )
+            shard.write({
+                'generation': generation,
+                'last_run_at': run_started_at,
+                'last_duration': time.perf_counter() - start,
+                'last_error': error,
+            })
+            if not commit_progress(self.env, 1, remaining=self.search_count(remaining_domain)):
+                break
+        return failed
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+import base64
+import hashlib
+
+from odoo import models, fields, api
+
+
+class TaskDocument(models.Model):
+    """Instruction file stored once per content. Templates point at it and
+    every generated or handed-off task item shares the same record, instead
+    of each item holding its own copy of the PDF."""
+    _name = 'restaurant.task.document'
+    _description = 'Task Instruction Document'
+    _order = 'id desc'
+
+    name = fields.Char(string='File Name')
+    checksum = fields.Char(required=True, readonly=True)
+    datas = fields.Binary(string='File', attachment=True, readonly=True)
+
+    _checksum_uniq = models.Constraint(
+        'UNIQUE(checksum)',
+        'An instruction document with the same content already exists.',
+    )
+
+    @api.model
+    def _get_or_create(self, datas, filename=False):
+        """Return the document holding `datas` (base64), creating it if this
+        content has never been stored."""
+        if not datas:
+            return self.browse()
+        raw = base64.b64decode(datas)
+        checksum = hashlib.sha1(raw).hexdigest()
+        document = self.sudo().search([('checksum', '=', checksum)], limit=1)
+        if not document:
+            document = self.sudo().create({
+                'name': filename,
+                'checksum': checksum,
+                'datas': datas,
+            })
+        return document.sudo(False)
@@ -1,6 +1,27 @@
 # -*- coding: utf-8 -*-
 from odoo import models, fields, api, _
 from odoo.exceptions import ValidationError
+from odoo.tools import config
+from datetime import timedelta
+import logging
+import os
+import shutil
+import time
+
+from .task_cron_run import commit_progress
+
+_logger = logging.getLogger(__name__)
+
+# Open items whose deadline is this close are bucketed as "due soon"
+DUE_SOON = timedelta(minutes=30)
+# Staged chunks of proof photo uploads abandoned for this long are removed
+PHOTO_UPLOAD_MAX_AGE = 24 * 3600  # seconds
+PHOTO_THUMB_BATCH = 200  # photos per committed thumbnail backfill batch
+# Content an item created by hand carries on its own one-off version line
+ITEM_CONTENT_FIELDS = [
+    'description', 'numeric_label', 'numeric_min', 'numeric_max',
+    'require_proof_photo', 'instruction_document_id', 'instruction_filename',
+]
 
 
 class TaskItem(models.Model):
@@ -12,7 +33,15 @@ class TaskItem(models.Model):
     _inherit = ['mail.thread']
 
     name = fields.Char(required=True, tracking=True)
-    description = fields.Html(string='Instructions')
+    # Task content lives once per template version; items only keep state
+    snapshot_line_id = fields.Many2one(
+        'restaurant.task.template.version.line',
+        string='Template Version',
+        ondelete='restrict',
+        index='btree_not_null',
+        readonly=True,
+    )
+    description = fields.Html(string='Instructions', related='snapshot_line_id.description')
     sequence = fields.Integer(default=10)
     task_list_id = fields.Many2one(
         'restaurant.task.list', required=True, ondelete='cascade',
@@ -23,13 +52,26 @@ class TaskItem(models.Model):
     )
     location_id = fields.Many2one(
         'hr.work.location', related='task_list_id.location_id',
-        store=True, readonly=True,
+        store=True, readonly=True, index=True,
+    )
+    user_id = fields.Many2one(
+        'res.users', related='task_list_id.user_id',
+        store=True, readonly=True, index='btree_not_null',
     )
 
     # ── Deadline ─────────────────────────────────────────────
     has_deadline = fields.Boolean(default=False)
     deadline = fields.Datetime(tracking=True)
-    is_overdue = fields.Boolean(compute='_compute_is_overdue', search='_search_is_overdue')
+    # Stored so filters, counts and groupings are plain indexed lookups; the
+    # deadline scheduler (_refresh_deadline_state) flips them as time passes.
+    is_overdue = fields.Boolean(compute='_compute_deadline_state', store=True, index=True)
+    deadline_bucket = fields.Selection([
+        ('none', 'No Deadline'),
+        ('later', 'Later'),
+        ('due_soon', 'Due Soon'),
+        ('overdue', 'Overdue'),
+        ('done', 'Done'),
+    ], compute='_compute_deadline_state', store=True)
     time_remaining = fields.Char(compute='_compute_time_remaining')
 
     # ── Completion Type ──────────────────────────────────────
@@ -40,13 +82,19 @@ class TaskItem(models.Model):
         ('text', 'Text Note'),
         ('signature', 'Digital Signature'),
     ], default='checkbox', required=True)
-    numeric_label = fields.Char(string='Value Label')
-    numeric_min = fields.Float()
-    numeric_max = fields.Float()
-    require_proof_photo = fields.Boolean(string='Also Require Photo')
+    numeric_label = fields.Char(string='Value Label', related='snapshot_line_id.numeric_label')
+    numeric_min = fields.Float(related='snapshot_line_id.numeric_min')
+    numeric_max = fields.Float(related='snapshot_line_id.numeric_max')
+    require_proof_photo = fields.Boolean(
+        string='Also Require Photo', related='snapshot_line_id.require_proof_photo',
+    )
 
     # ── Proof / Completion Data ──────────────────────────────
-    proof_photo = fields.Binary(string='Proof Photo', attachment=True)
+    # Downscaled on write; list views only load the thumbnail
+    proof_photo = fields.Image(string='Proof Photo', max_width=1920, max_height=1920)
+    proof_photo_thumb = fields.Image(
+        related='proof_photo', max_width=128, max_height=128, store=True,
+    )
     proof_photo_filename = fields.Char()
     proof_numeric_value = fields.Float(string='Recorded Value')
     proof_text_note = fields.Text(string='Completion Note')
@@ -65,8 +113,13 @@ class TaskItem(models.Model):
     pre_reminder_sent = fields.Boolean(default=False)
 
     # ── PDF Instructions ─────────────────────────────────────
-    instruction_file = fields.Binary(string='Instructions (PDF)', attachment=True)
-    instruction_filename = fields.Char()
+    instruction_document_id = fields.Many2one(
+        'restaurant.task.document', related='snapshot_line_id.instruction_document_id',
+    )
+    instruction_file = fields.Binary(
+        string='Instructions (PDF)', related='instruction_document_id.datas',
+    )
+    instruction_filename = fields.Char(related='snapshot_line_id.instruction_filename')
 
     # ── Sub-tasks ────────────────────────────────────────────
     subtask_ids = fields.One2many(
@@ -89,27 +142,23 @@ class TaskItem(models.Model):
     reminder_sent = fields.Boolean(default=False)
 
     # ── Escalation Tracking ──────────────────────────────────
-    escalation_level_1_sent = fields.Boolean(default=False)
-    escalation_level_2_sent = fields.Boolean(default=False)
-    escalation_level_3_sent = fields.Boolean(default=False)
+    escalation_log_ids = fields.One2many(
+        'restaurant.task.escalation.log', 'item_id', string='Escalations',
+    )
 
     # ── Handoff Tracking ─────────────────────────────────────
-    is_handoff = fields.Boolean(
-        string='Handed Off',
-        compute='_compute_is_handoff',
-        search='_search_is_handoff',
+    handoff_from_id = fields.Many2one(
+        'restaurant.task.item',
+        string='Handed Off From',
+        ondelete='set null',
+        index='btree_not_null',
+        readonly=True,
     )
+    is_handoff = fields.Boolean(string='Handed Off', readonly=True)
 
-    # ── Computed Fields ──────────────────────────────────────
+    _open_deadline_idx = models.Index("(deadline) WHERE has_deadline AND state != 'done'")
 
-    def _compute_is_handoff(self):
-        for rec in self:
-            rec.is_handoff = rec.name.startswith('[HANDOFF]') if rec.name else False
-
-    def _search_is_handoff(self, operator, value):
-        if (operator == '=' and value) or (operator == '!=' and not value):
-            return [('name', '=like', '[HANDOFF]%')]
-        return [('name', 'not like', '[HANDOFF]%')]
+    # ── Computed Fields ──────────────────────────────────────
 
     @api.depends('subtask_ids.is_done')
     def _compute_subtask_progress(self):
@@ -123,26 +172,57 @@ class TaskItem(models.Model):
             )
 
     @api.depends('deadline', 'has_deadline', 'state')
-    def _compute_is_overdue(self):
+    def _compute_deadline_state(self):
         now = fields.Datetime.now()
         for rec in self:
-            rec.is_overdue = (
-                rec.has_deadline
-                and rec.state != 'done'
-                and rec.deadline
-                and rec.deadline < now
-            )
+            if rec.state == 'done':
+                rec.deadline_bucket = 'done'
+            elif not rec.has_deadline or not rec.deadline:
+                rec.deadline_bucket = 'none'
+            elif rec.deadline < now:
+                rec.deadline_bucket = 'overdue'
+            elif rec.deadline <= now + DUE_SOON:
+                rec.deadline_bucket = 'due_soon'
+            else:
+                rec.deadline_bucket = 'later'
+            rec.is_overdue = rec.deadline_bucket == 'overdue'
+
+    @api.model
+    def _refresh_deadline_state(self):
+        """Move open items to the bucket they reached since their last write.
+        Only rows with a deadline inside the due-soon horizon are touched,
+        through the partial index on open items. Returns the affected items."""
+        now = fields.Datetime.now()
+        self.flush_model(['deadline', 'has_deadline', 'state', 'is_overdue', 'deadline_bucket'])
+        self.env.cr.execute("""
+            UPDATE restaurant_task_item
+               SET deadline_bucket = CASE WHEN deadline < %(now)s
+                                          THEN 'overdue' ELSE 'due_soon' END,
+                   is_overdue = deadline < %(now)s
+             WHERE has_deadline
+               AND state != 'done'
+               AND deadline <= %(soon)s
+               AND deadline_bucket IS DISTINCT FROM
+                   CASE WHEN deadline < %(now)s THEN 'overdue' ELSE 'due_soon' END
+         RETURNING id
+        """, {'now': now, 'soon': now + DUE_SOON})
+        items = self.browse([row[0] for row in self.env.cr.fetchall()])
+        items.invalidate_recordset(['is_overdue', 'deadline_bucket'])
+        return items
 
-    def _search_is_overdue(self, operator, value):
+    def _schedule_deadline_refresh(self):
+        """Wake the deadline scheduler when these items go due-soon or overdue."""
         now = fields.Datetime.now()
-        if (operator == '=' and value) or (operator == '!=' and not value):
-            return [
-                ('has_deadline', '=', True),
-                ('state', '!=', 'done'),
-                ('deadline', '<', now),
-            ]
-        return ['|', ('has_deadline', '=', False), '|',
-                ('state', '=', 'done'), ('deadline', '>=', now)]
+        moments = {
+            moment
+            for rec in self
+            if rec.has_deadline and rec.deadline and rec.state != 'done'
+            for moment in (rec.deadline - DUE_SOON, rec.deadline)
+            if moment > now
+        }
+        cron = self.env.ref('restaurant_task_manager.cron_refresh_deadlines', raise_if_not_found=False)
+        if cron and moments:
+            cron._trigger(sorted(moments))
 
     @api.depends('completed_at', 'deadline', 'has_deadline')
     def _compute_completed_on_time(self):
@@ -173,21 +253,103 @@ class TaskItem(models.Model):
                 m = rem // 60
                 rec.time_remaining = _('%dh %02dm left') % (h, m)
 
+    # ── Completion Counters ──────────────────────────────────
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        self._create_one_off_lines(vals_list)
+        records = super().create(vals_list)
+        deltas = {}
+        for rec in records:
+            total, done = deltas.get(rec.task_list_id.id, (0, 0))
+            deltas[rec.task_list_id.id] = (total + 1, done + (rec.state == 'done'))
+        self.env['restaurant.task.list']._apply_completion_deltas(deltas)
+        records._schedule_deadline_refresh()
+        return records
+
+    @api.model
+    def _create_one_off_lines(self, vals_list):
+        """Move the content of items created without a template version line
+        (added by hand) to a one-off version, which their related content
+        fields then read like generated items do."""
+        manual = []
+        for vals in vals_list:
+            if vals.get('snapshot_line_id'):
+                continue
+            content = {name: vals.pop(name) for name in ITEM_CONTENT_FIELDS if name in vals}
+            if vals.get('instruction_file'):
+                content['instruction_document_id'] = self.env['restaurant.task.document']._get_or_create(
+                    vals['instruction_file'], content.get('instruction_filename'),
+                ).id
+            vals.pop('instruction_file', None)
+            if any(content.values()):
+                manual.append((vals, content))
+        if not manual:
+            return
+        version = self.env['restaurant.task.template.version'].sudo().create({})
+        lines = self.env['restaurant.task.template.version.line'].sudo().create([{
+            'version_id': version.id,
+            'name': vals.get('name'),
+            'sequence': vals.get('sequence', 10),
+            'has_deadline': vals.get('has_deadline', False),
+            'reminder_minutes_before': vals.get('reminder_minutes_before', 0),
+            'completion_type': vals.get('completion_type', 'checkbox'),
+            **content,
+        } for vals, content in manual])
+        for (vals, _content), line in zip(manual, lines):
+            vals['snapshot_line_id'] = line.id
+
+    def write(self, vals):
+        if 'state' in vals or 'task_list_id' in vals:
+            result = self._write_with_completion_deltas(vals)
+        else:
+            result = super().write(vals)
+        if 'deadline' in vals or 'has_deadline' in vals:
+            self._schedule_deadline_refresh()
+        return result
+
+    def _write_with_completion_deltas(self, vals):
+        before = {rec.id: (rec.task_list_id.id, rec.state == 'done') for rec in self}
+        result = super().write(vals)
+        deltas = {}
+        for rec in self:
+            old_list, was_done = before[rec.id]
+            new_list, is_done = rec.task_list_id.id, rec.state == 'done'
+            if old_list == new_list and was_done == is_done:
+                continue
+            total, done = deltas.get(old_list, (0, 0))
+            deltas[old_list] = (total - 1, done - was_done)
+            total, done = deltas.get(new_list, (0, 0))
+            deltas[new_list] = (total + 1, done + is_done)
+        self.env['restaurant.task.list']._apply_completion_deltas(deltas)
+        return result
+
+    def unlink(self):
+        deltas = {}
+        for rec in self:
+            total, done = deltas.get(rec.task_list_id.id, (0, 0))
+            deltas[rec.task_list_id.id] = (total - 1, done - (rec.state == 'done'))
+        result = super().unlink()
+        self.env['restaurant.task.list']._apply_completion_deltas(deltas)
+        return result
+
     # ── Actions ──────────────────────────────────────────────
 
     def action_start(self):
-        self.filtered(lambda r: r.state == 'todo').write({'state': 'in_progress'})
+        started = self.filtered(lambda r: r.state == 'todo')
+        started.write({'state': 'in_progress'})
+        started.task_list_id._notify_board()
 
     def action_complete(self):
         """Mark task as done with validation based on completion type."""
-        now = fields.Datetime.now()
         for rec in self:
             rec._validate_completion()
-            rec.write({'state': 'done', 'completed_at': now})
-            # Auto-complete parent list if all tasks done
-            tl = rec.task_list_id
-            if all(i.state == 'done' for i in tl.task_item_ids):
-                tl.state = 'done'
+        self.write({'state': 'done', 'completed_at': fields.Datetime.now()})
+        # Auto-complete parent lists whose counters show all tasks done
+        self.task_list_id.filtered(
+            lambda tl: tl.total_tasks and tl.completed_tasks >= tl.total_tasks
+        ).write({'state': 'done'})
+        self.task_list_id._notify_board()
 
     def action_reset(self):
         self.write({
@@ -202,11 +364,14 @@ class TaskItem(models.Model):
             'pre_reminder_sent': False,
         })
         self.subtask_ids.write({'is_done': False})
+        self.task_list_id._notify_board()
 
     def _validate_completion(self):
         """Ensure required proof is provided based on completion type."""
         self.ensure_one()
-        if self.completion_type == 'photo' and not self.proof_photo:
+        # bin_size: only test for presence, never load the binaries
+        binaries = self.with_context(bin_size=True)
+        if self.completion_type == 'photo' and not binaries.proof_photo:
             raise ValidationError(_(
                 'Task "%s" requires a photo. Please upload a proof photo.', self.name
             ))
@@ -228,11 +393,11 @@ class TaskItem(models.Model):
             raise ValidationError(_(
                 'Task "%s" requires a text note.', self.name
             ))
-        if self.completion_type == 'signature' and not self.proof_signature:
+        if self.completion_type == 'signature' and not binaries.proof_signature:
             raise ValidationError(_(
                 'Task "%s" requires a digital signature.', self.name
             ))
-        if self.require_proof_photo and not self.proof_photo:
+        if self.require_proof_photo and not binaries.proof_photo:
             raise ValidationError(_(
                 'Task "%s" also requires a photo.', self.name
             ))
@@ -241,3 +406,59 @@ class TaskItem(models.Model):
             raise ValidationError(_(
                 'All checklist items must be completed for task "%s".', self.name
             ))
+
+    # ── Proof Photo Uploads ──────────────────────────────────
+
+    @api.model
+    def _get_photo_upload_dir(self):
+        """Filestore folder where the chunks of proof photo uploads are
+        staged (see TaskAppController.upload_photo_chunk)."""
+        return os.path.join(config.filestore(self.env.cr.dbname), 'restaurant_task_uploads')
+
+    @api.autovacuum
+    def _gc_photo_uploads(self):
+        """Remove the staged chunks of uploads the app never finished."""
+        root = self._get_photo_upload_dir()
+        if not os.path.isdir(root):
+            return
+        cutoff = time.time() - PHOTO_UPLOAD_MAX_AGE
+        removed = 0
+        for entry in os.scandir(root):
+            if entry.is_dir(follow_symlinks=False) and entry.stat().st_mtime < cutoff:
+                shutil.rmtree(entry.path, ignore_errors=True)
+                removed += 1
+        if removed:
+            _logger.info('Removed %d abandoned proof photo uploads.', removed)
+
+    @api.model
+    def _cron_backfill_photo_thumbs(self):
+        """Derive the stored proof_photo_thumb of photos taken before it
+        existed, in committed batches (triggered by the 19.0.2.8.0 upgrade)."""
+        field = self._fields['proof_photo_thumb']
+        last_id = 0
+        while True:
+            self.env.cr.execute("""
+                SELECT photo.res_id
+                  FROM ir_attachment photo
+                 WHERE photo.res_model = 'restaurant.task.item'
+                   AND photo.res_field = 'proof_photo'
+                   AND photo.res_id > %s
+                   AND NOT EXISTS (
+                        SELECT 1 FROM ir_attachment thumb
+                         WHERE thumb.res_model = 'restaurant.task.item'
+                           AND thumb.res_field = 'proof_photo_thumb'
+                           AND thumb.res_id = photo.res_id
+                   )
+              ORDER BY photo.res_id
+                 LIMIT %s
+            """, [last_id, PHOTO_THUMB_BATCH])
+            ids = [row[0] for row in self.env.cr.fetchall()]
+            if not ids:
+                break
+            items = self.browse(ids).exists()
+            self.env.add_to_compute(field, items)
+            items._recompute_recordset(['proof_photo_thumb'])
+            items.flush_recordset(['proof_photo_thumb'])
+            last_id = ids[-1]
+            if not commit_progress(self.env, len(ids)):
+                break
@@ -4,8 +4,15 @@ from odoo.exceptions import UserError
 from datetime import timedelta
 import logging
 
+from .planning_slot_inherit import GENERATION_MAX_ATTEMPTS
+from .task_cron_run import instrumented_cron, track_cron
+
 _logger = logging.getLogger(__name__)
 
+# Bus channel of the live "today" board: admins listen on the bare channel,
+# managers on one suffixed with each of their work location ids.
+BOARD_CHANNEL = 'restaurant_task_board'
+
 
 class TaskList(models.Model):
     """A concrete task list linked to a specific planning slot (shift).
@@ -35,6 +42,15 @@ class TaskList(models.Model):
         store=True,
         readonly=True,
     )
+    # Denormalized for the record rules: staff and manager rules compare
+    # these columns directly instead of joining through hr.employee
+    user_id = fields.Many2one(
+        'res.users',
+        related='employee_id.user_id',
+        store=True,
+        readonly=True,
+        index='btree_not_null',
+    )
     employee_work_email = fields.Char(related='employee_id.work_email', readonly=True)
     employee_work_phone = fields.Char(related='employee_id.work_phone', readonly=True)
     location_id = fields.Many2one(
@@ -43,6 +59,7 @@ class TaskList(models.Model):
         related='slot_id.work_location_id',
         store=True,
         readonly=True,
+        index=True,
     )
     shift_start = fields.Datetime(
         related='slot_id.start_datetime', store=True, readonly=True,
@@ -55,13 +72,19 @@ class TaskList(models.Model):
     )
     # Task items
     task_item_ids = fields.One2many('restaurant.task.item', 'task_list_id', string='Tasks')
-    # Scoring
-    total_tasks = fields.Integer(compute='_compute_completion', store=True)
-    completed_tasks = fields.Integer(compute='_compute_completion', store=True)
+    # Closed lists past retention keep only a summary, see restaurant.task.item.archive
+    archived_item_ids = fields.One2many(
+        'restaurant.task.item.archive', 'task_list_id', string='Archived Tasks',
+    )
+    items_archived = fields.Boolean(readonly=True, copy=False)
+    # Scoring — maintained incrementally by restaurant.task.item, see
+    # _apply_completion_deltas(); _cron_reconcile_completion repairs drift.
+    total_tasks = fields.Integer(default=0, readonly=True)
+    completed_tasks = fields.Integer(default=0, readonly=True)
     completion_score = fields.Float(
         string='Completion %',
-        compute='_compute_completion',
-        store=True,
+        default=0.0,
+        readonly=True,
         aggregator='avg',
     )
     state = fields.Selection([
@@ -72,6 +95,10 @@ class TaskList(models.Model):
     ], default='draft', tracking=True)
     warning_sent = fields.Boolean(default=False)
     color = fields.Integer(compute='_compute_color')
+    overdue_count = fields.Integer(compute='_compute_overdue_count')
+
+    _employee_shift_idx = models.Index('(employee_id, shift_start, shift_end)')
+    _write_date_idx = models.Index('(write_date)')
 
     @api.depends('template_id.name', 'employee_id.name', 'shift_start')
     def _compute_name(self):
@@ -85,16 +112,70 @@ class TaskList(models.Model):
             ])
             rec.name = ' — '.join(parts) or _('New Task List')
 
-    @api.depends('task_item_ids.state')
-    def _compute_completion(self):
-        for rec in self:
-            items = rec.task_item_ids
-            rec.total_tasks = len(items)
-            rec.completed_tasks = len(items.filtered(lambda t: t.state == 'done'))
-            rec.completion_score = (
-                (rec.completed_tasks / rec.total_tasks * 100)
-                if rec.total_tasks else 0.0
-            )
+    def _apply_completion_deltas(self, deltas):
+        """Shift the completion counters in place.
+        deltas is {task_list_id: (total_delta, completed_delta)}; the update
+        is a single relative SQL statement so concurrent completions on the
+        same list never read-modify-write the whole item set."""
+        deltas = {k: v for k, v in deltas.items() if k and any(v)}
+        if not deltas:
+            return
+        ids = sorted(deltas)  # stable lock order between concurrent requests
+        self.flush_model(['total_tasks', 'completed_tasks', 'completion_score'])
+        self.env.cr.execute("""
+            UPDATE restaurant_task_list tl
+               SET write_date = now() at time zone 'UTC',
+                   total_tasks = COALESCE(tl.total_tasks, 0) + d.total,
+                   completed_tasks = COALESCE(tl.completed_tasks, 0) + d.done,
+                   completion_score = CASE
+                       WHEN COALESCE(tl.total_tasks, 0) + d.total > 0
+                       THEN (COALESCE(tl.completed_tasks, 0) + d.done) * 100.0
+                            / (COALESCE(tl.total_tasks, 0) + d.total)
+                       ELSE 0 END
+              FROM unnest(%s::int[], %s::int[], %s::int[]) AS d(id, total, done)
+             WHERE tl.id = d.id
+        """, [ids, [deltas[i][0] for i in ids], [deltas[i][1] for i in ids]])
+        task_lists = self.browse(ids)
+        task_lists.invalidate_recordset(
+            ['total_tasks', 'completed_tasks', 'completion_score', 'write_date'],
+        )
+        # Updated behind the ORM's back: recompute the dependent slot scores
+        task_lists.modified(['completion_score'])
+
+    def _reconcile_completion(self):
+        """Recount the completion counters of these lists from their items and
+        fix any that drifted. Returns the ids that were corrected."""
+        if not self:
+            return []
+        self.env['restaurant.task.item'].flush_model(['task_list_id', 'state'])
+        self.flush_model(['total_tasks', 'completed_tasks', 'completion_score'])
+        self.env.cr.execute("""
+            UPDATE restaurant_task_list tl
+               SET write_date = now() at time zone 'UTC',
+                   total_tasks = agg.total,
+                   completed_tasks = agg.done,
+                   completion_score = CASE WHEN agg.total > 0
+                       THEN agg.done * 100.0 / agg.total ELSE 0 END
+              FROM (
+                    SELECT l.id,
+                           count(item.id) AS total,
+                           count(item.id) FILTER (WHERE item.state = 'done') AS done
+                      FROM restaurant_task_list l
+                 LEFT JOIN restaurant_task_item item ON item.task_list_id = l.id
+                     WHERE l.id IN %s
+                  GROUP BY l.id
+                   ) agg
+             WHERE tl.id = agg.id
+               AND (tl.total_tasks IS DISTINCT FROM agg.total
+                    OR tl.completed_tasks IS DISTINCT FROM agg.done)
+         RETURNING tl.id
+        """, [tuple(self.ids)])
+        fixed = [row[0] for row in self.env.cr.fetchall()]
+        self.browse(fixed).invalidate_recordset(
+            ['total_tasks', 'completed_tasks', 'completion_score', 'write_date'],
+        )
+        self.browse(fixed).modified(['completion_score'])
+        return fixed
 
     @api.depends('completion_score', 'state')
     def _compute_color(self):
@@ -110,6 +191,63 @@ class TaskList(models.Model):
             else:
                 rec.color = 1
 
+    def _compute_overdue_count(self):
+        counts = self._get_overdue_counts()
+        for rec in self:
+            rec.overdue_count = counts.get(rec.id, 0)
+
+    def _get_overdue_counts(self):
+        """Return {task_list_id: number of overdue items} in one query."""
+        if not self.ids:
+            return {}
+        groups = self.env['restaurant.task.item']._read_group(
+            [('task_list_id', 'in', self.ids), ('is_overdue', '=', True)],
+            ['task_list_id'], ['__count'],
+        )
+        return {task_list.id: count for task_list, count in groups}
+
+    # ── Live Board ───────────────────────────────────────────
+
+    @api.model
+    def _get_board_channels(self, user):
+        """Bus channels a user receives live board updates on."""
+        if user.has_group('restaurant_task_manager.group_task_admin'):
+            return [BOARD_CHANNEL]
+        if user.has_group('restaurant_task_manager.group_task_manager'):
+            return [
+                '%s_%d' % (BOARD_CHANNEL, location_id)
+                for location_id in user.employee_ids.work_location_id.ids
+            ]
+        return []
+
+    def _notify_board(self):
+        """Publish the counters of these lists to the managers' live board,
+        one compact message per location (sent when the transaction commits)."""
+        if not self:
+            return
+        overdue = self._get_overdue_counts()
+        by_location = {}
+        for tl in self:
+            by_location.setdefault(tl.location_id.id, []).append({
+                'id': tl.id,
+                'state': tl.state,
+                'completed': tl.completed_tasks,
+                'total': tl.total_tasks,
+                'score': tl.completion_score,
+                'overdue': overdue.get(tl.id, 0),
+            })
+        notifications = []
+        for location_id, lists in by_location.items():
+            payload = {'location_id': location_id, 'lists': lists}
+            notifications.append((BOARD_CHANNEL, 'restaurant_task_board/update', payload))
+            if location_id:
+                notifications.append((
+                    '%s_%d' % (BOARD_CHANNEL, location_id),
+                    'restaurant_task_board/update',
+                    payload,
+                ))
+        self.env['bus.bus']._sendmany(notifications)
+
     # ── Actions ──────────────────────────────────────────────
 
     def action_generate_tasks(self):
@@ -125,41 +263,40 @@ class TaskList(models.Model):
                 raise UserError(_(
                     'Template "%s" has no tasks defined.', rec.template_id.name
                 ))
-            for tmpl in rec.template_id.task_template_ids:
-                # Compute deadline
-                deadline = False
-                if tmpl.has_deadline and tmpl.relative_deadline_minutes and rec.shift_start:
-                    deadline = rec.shift_start + timedelta(
-                        minutes=tmpl.relative_deadline_minutes
-                    )
-                    if rec.shift_end and deadline > rec.shift_end:
-                        deadline = rec.shift_end
-
-                item = TaskItem.create({
-                    'task_list_id': rec.id,
-                    'name': tmpl.name,
-                    'description': tmpl.description,
-                    'sequence': tmpl.sequence,
-                    'has_deadline': tmpl.has_deadline,
-                    'deadline': deadline,
-                    'completion_type': tmpl.completion_type,
-                    'numeric_label': tmpl.numeric_label,
-                    'numeric_min': tmpl.numeric_min,
-                    'numeric_max': tmpl.numeric_max,
-                    'require_proof_photo': tmpl.require_proof_photo,
-                    'instruction_file': tmpl.instruction_file,
-                    'instruction_filename': tmpl.instruction_filename,
-                    'reminder_minutes_before': tmpl.reminder_minutes_before,
-                })
-                # Create sub-tasks
-                for st in tmpl.subtask_template_ids:
-                    Subtask.create({
-                        'task_item_id': item.id,
-                        'name': st.name,
-                        'sequence': st.sequence,
-                    })
+            # Items reference the template snapshot for their content and
+            # only store what the shift changes (deadline, state, proof)
+            lines = rec.template_id._get_current_version().line_ids
+            items = TaskItem.create([rec._prepare_item_vals(line) for line in lines])
+            Subtask.create([
+                {
+                    'task_item_id': item.id,
+                    'name': st.name,
+                    'sequence': st.sequence,
+                }
+                for item, line in zip(items, lines)
+                for st in line.subtask_ids
+            ])
             rec.state = 'active'
 
+    def _prepare_item_vals(self, line):
+        """Values of the task item generated from a template version line."""
+        self.ensure_one()
+        deadline = False
+        if line.has_deadline and line.relative_deadline_minutes and self.shift_start:
+            deadline = self.shift_start + timedelta(minutes=line.relative_deadline_minutes)
+            if self.shift_end and deadline > self.shift_end:
+                deadline = self.shift_end
+        return {
+            'task_list_id': self.id,
+            'snapshot_line_id': line.id,
+            'name': line.name,
+            'sequence': line.sequence,
+            'has_deadline': line.has_deadline,
+            'deadline': deadline,
+            'completion_type': line.completion_type,
+            'reminder_minutes_before': line.reminder_minutes_before,
+        }
+
     def action_mark_done(self):
         self.write({'state': 'done'})
 
@@ -167,12 +304,21 @@ class TaskList(models.Model):
         self.write({'state': 'draft'})
 
     # ── Cron Jobs ────────────────────────────────────────────
+    # The notification jobs run per work location through
+    # restaurant.task.cron.shard: _cron_x() calls _x(location) once per
+    # location, each in its own savepoint and commit.
 
     @api.model
+    @instrumented_cron
     def _cron_check_overdue_tasks(self):
         """Notify employees and managers about overdue tasks."""
+        self.env['restaurant.task.cron.shard'].sudo()._run(self, '_check_overdue_tasks')
+
+    @api.model
+    def _check_overdue_tasks(self, location):
         now = fields.Datetime.now()
         overdue_items = self.env['restaurant.task.item'].search([
+            ('location_id', '=', location.id),
             ('has_deadline', '=', True),
             ('state', '!=', 'done'),
             ('deadline', '<', now),
@@ -195,13 +341,21 @@ class TaskList(models.Model):
                         ).strftime('%H:%M'),
                     ),
                 )
+                track_cron(notified=1)
+        track_cron(scanned=len(overdue_items), acted=len(overdue_items))
         _logger.info('Checked %d overdue task items.', len(overdue_items))
 
     @api.model
+    @instrumented_cron
     def _cron_send_warning_emails(self):
         """Send warning emails after shift ends with incomplete tasks."""
+        self.env['restaurant.task.cron.shard'].sudo()._run(self, '_send_warning_emails')
+
+    @api.model
+    def _send_warning_emails(self, location):
         now = fields.Datetime.now()
         incomplete = self.search([
+            ('location_id', '=', location.id),
             ('state', '=', 'active'),
             ('shift_end', '<', now),
             ('completion_score', '<', 100),
@@ -215,48 +369,82 @@ class TaskList(models.Model):
             if template and tl.employee_id.work_email:
                 template.send_mail(tl.id, force_send=True)
                 tl.write({'warning_sent': True})
+                track_cron(notified=1)
             tl.write({'state': 'expired'})
+        track_cron(scanned=len(incomplete), acted=len(incomplete))
         _logger.info('Processed %d incomplete task lists.', len(incomplete))
 
     @api.model
+    @instrumented_cron
     def _cron_auto_generate_from_slots(self):
-        """Auto-generate task lists for published slots in the next 7 days."""
+        """Safety net of the publish queue: queue published slots of the next
+        7 days that were never generated, or whose generation failed fewer
+        than GENERATION_MAX_ATTEMPTS times (so once an hour), then drain the
+        queue."""
         now = fields.Datetime.now()
         future = now + timedelta(days=7)
-        slots = self.env['planning.slot'].search([
+        Slot = self.env['planning.slot']
+        slots = Slot.search([
             ('start_datetime', '>=', now),
             ('start_datetime', '<=', future),
             ('employee_id', '!=', False),
             ('state', '=', 'published'),
+            '|',
+            ('task_generation_state', '=', False),
+            '&',
+            ('task_generation_state', '=', 'failed'),
+            ('task_generation_attempts', '<', GENERATION_MAX_ATTEMPTS),
         ])
-        templates = self.env['restaurant.task.list.template'].search([
-            ('role_ids', '!=', False),
-            ('active', '=', True),
-        ])
-        created = 0
-        for slot in slots:
-            if self.search_count([('slot_id', '=', slot.id)]):
-                continue
-            matching = templates.filtered(
-                lambda t: slot.role_id in t.role_ids and (
-                    not t.location_id or t.location_id == slot.work_location_id
-                )
-            )
-            for tmpl in matching:
-                tl = self.create({
-                    'template_id': tmpl.id,
-                    'slot_id': slot.id,
-                })
-                tl.action_generate_tasks()
-                created += 1
+        slots._enqueue_task_generation()
+        created = Slot._process_task_generation_queue()
         _logger.info('Auto-generated %d task lists from published slots.', created)
 
     @api.model
+    @instrumented_cron
+    def _cron_reconcile_completion(self):
+        """Repair drift in the incremental completion counters of recent lists."""
+        recent = self.search([
+            ('items_archived', '=', False),
+            '|',
+            ('state', 'in', ('draft', 'active')),
+            ('shift_start', '>=', fields.Datetime.now() - timedelta(days=2)),
+        ])
+        fixed = recent._reconcile_completion()
+        track_cron(scanned=len(recent), acted=len(fixed))
+        if fixed:
+            _logger.warning('Repaired completion counters on %d task lists.', len(fixed))
+        _logger.info('Reconciled completion counters on %d task lists.', len(recent))
+
+    @api.model
+    @instrumented_cron
+    def _cron_refresh_deadline_state(self):
+        """Advance stored deadline buckets and wake again at the next boundary."""
+        Item = self.env['restaurant.task.item']
+        changed = Item._refresh_deadline_state()
+        changed.task_list_id._notify_board()
+        now = fields.Datetime.now()
+        upcoming = Item.search([
+            ('has_deadline', '=', True),
+            ('state', '!=', 'done'),
+            ('deadline', '>', now),
+            ('deadline', '<=', now + timedelta(hours=1)),
+        ])
+        upcoming._schedule_deadline_refresh()
+        track_cron(scanned=len(upcoming), acted=len(changed))
+        _logger.info('Moved %d task items to a new deadline bucket.', len(changed))
+
+    @api.model
+    @instrumented_cron
     def _cron_pre_deadline_reminders(self):
         """Send pre-deadline reminders (X min before) via activity + email + SMS."""
+        self.env['restaurant.task.cron.shard'].sudo()._run(self, '_send_pre_deadline_reminders')
+
+    @api.model
+    def _send_pre_deadline_reminders(self, location):
         now = fields.Datetime.now()
         # Find items with reminder configured, deadline approaching, not yet reminded
         items = self.env['restaurant.task.item'].search([
+            ('location_id', '=', location.id),
             ('has_deadline', '=', True),
             ('state', '!=', 'done'),
             ('deadline', '!=', False),
@@ -275,6 +463,7 @@ class TaskList(models.Model):
                 mins = item.reminder_minutes_before
                 # Odoo activity notification
                 if user:
+                    track_cron(notified=1)
                     item.activity_schedule(
                         'mail.mail_activity_data_todo',
                         user_id=user.id,
@@ -298,6 +487,7 @@ class TaskList(models.Model):
                         template.with_context(
                             reminder_minutes=mins,
                         ).send_mail(item.id, force_send=True)
+                        track_cron(notified=1)
                 # SMS notification
                 if employee.work_phone:
                     try:
@@ -309,161 +499,220 @@ class TaskList(models.Model):
                             ).strftime('%H:%M'),
                         )
                         item._message_sms(body, partner_ids=employee.user_id.partner_id.ids)
+                        track_cron(notified=1)
                     except Exception:
                         _logger.warning('SMS sending failed for task %s', item.name)
+        track_cron(scanned=len(items), acted=reminded)
         _logger.info('Sent %d pre-deadline reminders.', reminded)
 
     @api.model
+    @instrumented_cron
     def _cron_shift_handoff(self):
         """Auto-carry incomplete tasks to next shift's person in same role."""
+        self.env['restaurant.task.cron.shard'].sudo()._run(self, '_shift_handoff')
+
+    @api.model
+    def _shift_handoff(self, location):
         now = fields.Datetime.now()
-        buffer = timedelta(minutes=15)
         # Find expired task lists (shift ended, still active)
         expired = self.search([
+            ('location_id', '=', location.id),
             ('state', '=', 'active'),
             ('shift_end', '<', now),
             ('shift_end', '>', now - timedelta(hours=2)),  # Only recent shifts
             ('completion_score', '<', 100),
         ])
-        handed_off = 0
-        for tl in expired:
-            incomplete_items = tl.task_item_ids.filtered(lambda i: i.state != 'done')
-            if not incomplete_items:
-                continue
-            # Find next shift in same role at same location
-            next_slot = self.env['planning.slot'].search([
-                ('role_id', '=', tl.slot_id.role_id.id),
-                ('work_location_id', '=', tl.location_id.id),
-                ('employee_id', '!=', False),
-                ('start_datetime', '>=', tl.shift_end - buffer),
-                ('start_datetime', '<=', tl.shift_end + timedelta(hours=4)),
-                ('state', '=', 'published'),
-            ], order='start_datetime asc', limit=1)
-            if not next_slot:
-                continue
-            # Find or create task list for next slot
-            next_list = self.search([
-                ('slot_id', '=', next_slot.id),
-                ('template_id', '=', tl.template_id.id),
-            ], limit=1)
-            if not next_list:
-                next_list = self.create({
-                    'template_id': tl.template_id.id,
-                    'slot_id': next_slot.id,
-                    'state': 'active',
-                })
-            # Copy incomplete tasks to next shift
-            Subtask = self.env['restaurant.task.subtask']
-            for item in incomplete_items:
-                new_item = self.env['restaurant.task.item'].create({
-                    'task_list_id': next_list.id,
-                    'name': _('[HANDOFF] %s') % item.name,
-                    'description': item.description,
-                    'sequence': item.sequence,
-                    'has_deadline': False,  # Reset deadline for handoff
-                    'completion_type': item.completion_type,
-                    'numeric_label': item.numeric_label,
-                    'numeric_min': item.numeric_min,
-                    'numeric_max': item.numeric_max,
-                    'require_proof_photo': item.require_proof_photo,
-                    'instruction_file': item.instruction_file,
-                    'instruction_filename': item.instruction_filename,
-                    'staff_comment': _(
-                        'Handed off from %s (%s shift).',
-                        tl.employee_id.name or 'previous shift',
-                        fields.Datetime.context_timestamp(
-                            tl, tl.shift_start
-                        ).strftime('%H:%M') if tl.shift_start else '',
-                    ),
-                })
-                for st in item.subtask_ids:
-                    Subtask.create({
-                        'task_item_id': new_item.id,
-                        'name': st.name,
-                        'sequence': st.sequence,
-                        'is_done': st.is_done,  # Preserve partial progress
-                    })
-                handed_off += 1
-            # Mark original list as expired
-            tl.state = 'expired'
-        _logger.info('Handed off %d incomplete tasks to next shifts.', handed_off)
+        track_cron(scanned=len(expired))
+        if not expired:
+            return
+        TaskItem = self.env['restaurant.task.item']
+        incomplete_items = TaskItem.search([
+            ('task_list_id', 'in', expired.ids),
+            ('state', '!=', 'done'),
+        ])
+        expired = incomplete_items.task_list_id
+        next_slots = expired._get_handoff_slots()
+        expired = expired.filtered(lambda tl: tl.id in next_slots)
+        if not expired:
+            return
+        next_lists = expired._get_handoff_lists(next_slots)
+
+        # Copy incomplete tasks to next shift in one batch
+        expired_ids = set(expired.ids)
+        to_copy = incomplete_items.filtered(lambda i: i.task_list_id.id in expired_ids)
+        item_vals = []
+        for item in to_copy:
+            tl = item.task_list_id
+            item_vals.append({
+                'task_list_id': next_lists[tl.id].id,
+                'handoff_from_id': item.id,
+                'is_handoff': True,
+                'snapshot_line_id': item.snapshot_line_id.id,
+                'name': item.name,
+                'sequence': item.sequence,
+                'has_deadline': False,  # Reset deadline for handoff
+                'completion_type': item.completion_type,
+                'staff_comment': _(
+                    'Handed off from %s (%s shift).',
+                    tl.employee_id.name or 'previous shift',
+                    fields.Datetime.context_timestamp(
+                        tl, tl.shift_start
+                    ).strftime('%H:%M') if tl.shift_start else '',
+                ),
+            })
+        new_items = TaskItem.create(item_vals)
+        self.env['restaurant.task.subtask'].create([
+            {
+                'task_item_id': new_item.id,
+                'name': st.name,
+                'sequence': st.sequence,
+                'is_done': st.is_done,  # Preserve partial progress
+            }
+            for item, new_item in zip(to_copy, new_items)
+            for st in item.subtask_ids
+        ])
+        # Mark original lists as expired
+        expired.write({'state': 'expired'})
+        track_cron(acted=len(new_items))
+        _logger.info('Handed off %d incomplete tasks to next shifts.', len(new_items))
+
+    def _get_handoff_slots(self):
+        """Return {task_list_id: planning.slot} with the first published shift
+        in the same role and location starting around each list's shift end
+        (a shift without role or location matches shifts without one too).
+        Resolved for the whole recordset with a single window query."""
+        if not self:
+            return {}
+        self.flush_model(['slot_id', 'location_id', 'shift_end'])
+        self.env['planning.slot'].flush_model([
+            'role_id', 'work_location_id', 'employee_id', 'start_datetime', 'state',
+        ])
+        self.env.cr.execute("""
+            SELECT DISTINCT ON (tl.id) tl.id, nxt.id
+              FROM restaurant_task_list tl
+              JOIN planning_slot cur ON cur.id = tl.slot_id
+              JOIN planning_slot nxt
+                ON nxt.role_id IS NOT DISTINCT FROM cur.role_id
+               AND nxt.work_location_id IS NOT DISTINCT FROM tl.location_id
+               AND nxt.start_datetime >= tl.shift_end - interval '15 minutes'
+               AND nxt.start_datetime <= tl.shift_end + interval '4 hours'
+             WHERE tl.id IN %s
+               AND nxt.employee_id IS NOT NULL
+               AND nxt.state = 'published'
+          ORDER BY tl.id, nxt.start_datetime, nxt.id
+        """, [tuple(self.ids)])
+        Slot = self.env['planning.slot']
+        return {tl_id: Slot.browse(slot_id) for tl_id, slot_id in self.env.cr.fetchall()}
+
+    def _get_handoff_lists(self, next_slots):
+        """Return {task_list_id: restaurant.task.list} on the next shift for the
+        same template, creating the missing ones in one batch."""
+        existing = self.search([
+            ('slot_id', 'in', [slot.id for slot in next_slots.values()]),
+            ('template_id', 'in', self.template_id.ids),
+        ])
+        by_key = {(tl.slot_id.id, tl.template_id.id): tl for tl in existing}
+        missing = []
+        for tl in self:
+            key = (next_slots[tl.id].id, tl.template_id.id)
+            if key not in by_key and key not in missing:
+                missing.append(key)
+        created = self.create([
+            {'slot_id': slot_id, 'template_id': template_id, 'state': 'active'}
+            for slot_id, template_id in missing
+        ])
+        by_key.update(zip(missing, created))
+        return {
+            tl.id: by_key[(next_slots[tl.id].id, tl.template_id.id)]
+            for tl in self
+        }
 
     @api.model
+    @instrumented_cron
     def _cron_escalation(self):
         """Multi-level escalation: employee → shift lead → manager at timed intervals."""
-        now = fields.Datetime.now()
         if 'restaurant.escalation.rule' not in self.env.registry:
             return
+        self.env['restaurant.task.cron.shard'].sudo()._run(self, '_escalate')
+
+    @api.model
+    def _escalate(self, location):
+        now = fields.Datetime.now()
         EscRule = self.env['restaurant.escalation.rule']
-        rules = EscRule.search([('active', '=', True)], order='delay_minutes asc')
-        if not rules:
+        due = EscRule._get_due_escalations(now, location=location)
+        track_cron(scanned=len(due))
+        if not due:
             return
-        overdue_items = self.env['restaurant.task.item'].search([
-            ('has_deadline', '=', True),
-            ('state', '!=', 'done'),
-            ('deadline', '<', now),
-            ('task_list_id.state', '=', 'active'),
-        ])
+        TaskItem = self.env['restaurant.task.item']
+        items_by_rule = {}
+        for item_id, rule_id in due:
+            items_by_rule.setdefault(rule_id, []).append(item_id)
+        template = self.env.ref(
+            'restaurant_task_manager.mail_template_escalation',
+            raise_if_not_found=False,
+        )
+        log_vals = []
         escalated = 0
-        for item in overdue_items:
-            minutes_overdue = (now - item.deadline).total_seconds() / 60
-            for rule in rules:
-                if minutes_overdue >= rule.delay_minutes:
-                    # Check if this escalation level was already sent
-                    field_name = 'escalation_level_%d_sent' % rule.level
-                    if field_name not in item._fields:
-                        continue
-                    if item[field_name]:
-                        continue
-                    # Determine recipient
-                    recipient = rule._get_recipient(item)
-                    if recipient and recipient.user_id:
-                        item.activity_schedule(
-                            'mail.mail_activity_data_todo',
-                            user_id=recipient.user_id.id,
-                            summary=_('🔴 ESCALATION L%d: %s') % (rule.level, item.name),
-                            note=_(
-                                'Task "%s" assigned to %s is %d min overdue. '
-                                'Escalation level %d triggered.',
-                                item.name,
-                                item.employee_id.name or 'Unknown',
-                                int(minutes_overdue),
-                                rule.level,
-                            ),
+        for rule in EscRule.browse(list(items_by_rule)):
+            items = TaskItem.browse(items_by_rule[rule.id])
+            recipients = rule._get_recipients(items)
+            for item in items:
+                recipient = recipients.get(item.id)
+                # Logged even without a reachable recipient, so the same
+                # (item, rule) pair is never evaluated again.
+                log_vals.append({
+                    'item_id': item.id,
+                    'rule_id': rule.id,
+                    'level': rule.level,
+                    'recipient_id': recipient.id if recipient else False,
+                    'sent_at': now,
+                })
+                if not recipient or not recipient.user_id:
+                    continue
+                minutes_overdue = (now - item.deadline).total_seconds() / 60
+                item.activity_schedule(
+                    'mail.mail_activity_data_todo',
+                    user_id=recipient.user_id.id,
+                    summary=_('🔴 ESCALATION L%d: %s') % (rule.level, item.name),
+                    note=_(
+                        'Task "%s" assigned to %s is %d min overdue. '
+                        'Escalation level %d triggered.',
+                        item.name,
+                        item.employee_id.name or 'Unknown',
+                        int(minutes_overdue),
+                        rule.level,
+                    ),
+                )
+                # Send email to escalation recipient
+                if recipient.work_email and template:
+                    template.with_context(
+                        escalation_level=rule.level,
+                        escalation_recipient=recipient.name,
+                        escalation_recipient_email=recipient.work_email,
+                        minutes_overdue=int(minutes_overdue),
+                    ).send_mail(item.id, force_send=True)
+                    track_cron(notified=1)
+                # SMS
+                if recipient.work_phone:
+                    try:
+                        body = _(
+                            '🔴 ESCALATION L%d: "%s" is %dmin overdue '
+                            '(assigned to %s). Please intervene.',
+                            rule.level, item.name,
+                            int(minutes_overdue),
+                            item.employee_id.name or 'Unknown',
+                        )
+                        item._message_sms(
+                            body, partner_ids=recipient.user_id.partner_id.ids,
+                        )
+                        track_cron(notified=1)
+                    except Exception:
+                        _logger.warning(
+                            'SMS escalation failed for task %s level %d',
+                            item.name, rule.level,
                         )
-                        # Send email to escalation recipient
-                        if recipient.work_email:
-                            template = self.env.ref(
-                                'restaurant_task_manager.mail_template_escalation',
-                                raise_if_not_found=False,
-                            )
-                            if template:
-                                template.with_context(
-                                    escalation_level=rule.level,
-                                    escalation_recipient=recipient.name,
-                                    escalation_recipient_email=recipient.work_email,
-                                    minutes_overdue=int(minutes_overdue),
-                                ).send_mail(item.id, force_send=True)
-                        # SMS
-                        if recipient.work_phone:
-                            try:
-                                body = _(
-                                    '🔴 ESCALATION L%d: "%s" is %dmin overdue '
-                                    '(assigned to %s). Please intervene.',
-                                    rule.level, item.name,
-                                    int(minutes_overdue),
-                                    item.employee_id.name or 'Unknown',
-                                )
-                                item._message_sms(
-                                    body, partner_ids=recipient.user_id.partner_id.ids,
-                                )
-                            except Exception:
-                                _logger.warning(
-                                    'SMS escalation failed for task %s level %d',
-                                    item.name, rule.level,
-                                )
-                        # Mark this level as sent (must use write() to persist)
-                        if field_name in item._fields:
-                            item.write({field_name: True})
-                        escalated += 1
+                escalated += 1
+                track_cron(notified=1)
+        self.env['restaurant.task.escalation.log'].create(log_vals)
+        track_cron(acted=len(log_vals))
         _logger.info('Processed %d escalation notifications.', escalated)
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+from odoo import models, fields, api
+from odoo.tools import SQL
+import logging
+
+from .task_cron_run import instrumented_cron, track_cron
+
+_logger = logging.getLogger(__name__)
+
+REFRESH_PARAM = 'restaurant_task_manager.report_refreshed_at'
+
+
+class TaskReport(models.Model):
+    """Task completion pre-aggregated by day × employee × location × template.
+    Backs the dashboard pivots and graphs. The table is maintained by
+    _cron_refresh_report, which only rebuilds the days whose task lists
+    changed since the previous run. Days that lose a list (deleted, also by
+    cascade from its planning slot, or moved to another day) are recorded
+    by a trigger in restaurant_task_report_dirty, as no write_date is left
+    to find them by."""
+    _name = 'restaurant.task.report'
+    _description = 'Task Completion Report'
+    _auto = False
+    _order = 'date desc'
+
+    date = fields.Date(string='Shift Date', readonly=True)
+    employee_id = fields.Many2one('hr.employee', string='Employee', readonly=True)
+    location_id = fields.Many2one('hr.work.location', string='Location', readonly=True)
+    template_id = fields.Many2one(
+        'restaurant.task.list.template', string='Template', readonly=True,
+    )
+    list_count = fields.Integer(string='Task Lists', readonly=True)
+    done_list_count = fields.Integer(string='Completed Lists', readonly=True)
+    total_tasks = fields.Integer(readonly=True)
+    completed_tasks = fields.Integer(readonly=True)
+    score_sum = fields.Float(readonly=True)
+    completion_score = fields.Float(
+        string='Completion %', readonly=True, aggregator='avg',
+    )
+
+    def init(self):
+        self.env.cr.execute("""
+            CREATE TABLE IF NOT EXISTS restaurant_task_report (
+                id SERIAL PRIMARY KEY,
+                date DATE NOT NULL,
+                employee_id INTEGER,
+                location_id INTEGER,
+                template_id INTEGER,
+                list_count INTEGER NOT NULL DEFAULT 0,
+                done_list_count INTEGER NOT NULL DEFAULT 0,
+                total_tasks INTEGER NOT NULL DEFAULT 0,
+                completed_tasks INTEGER NOT NULL DEFAULT 0,
+                score_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+                completion_score DOUBLE PRECISION NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS restaurant_task_report_date_idx
+                ON restaurant_task_report (date);
+            CREATE INDEX IF NOT EXISTS restaurant_task_report_location_date_idx
+                ON restaurant_task_report (location_id, date);
+
+            CREATE TABLE IF NOT EXISTS restaurant_task_report_dirty (
+                date DATE PRIMARY KEY
+            );
+            CREATE OR REPLACE FUNCTION restaurant_task_report_mark_dirty() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP = 'UPDATE' AND OLD.shift_start::date IS NOT DISTINCT FROM NEW.shift_start::date THEN
+                    RETURN NULL;
+                END IF;
+                -- Both days of a moved list: the recompute of the related
+                -- shift_start does not touch write_date
+                INSERT INTO restaurant_task_report_dirty (date)
+                     SELECT day
+                       FROM (VALUES (OLD.shift_start::date),
+                                    (CASE WHEN TG_OP = 'UPDATE' THEN NEW.shift_start::date END)) AS d(day)
+                      WHERE day IS NOT NULL
+                ON CONFLICT DO NOTHING;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+            DROP TRIGGER IF EXISTS restaurant_task_report_dirty ON restaurant_task_list;
+            CREATE TRIGGER restaurant_task_report_dirty
+                AFTER DELETE OR UPDATE OF shift_start ON restaurant_task_list
+                FOR EACH ROW EXECUTE FUNCTION restaurant_task_report_mark_dirty();
+        """)
+
+    def _read_group_select(self, aggregate_spec, query):
+        # Rows are already averages: weight them by list count so a pivot
+        # cell equals the average over the underlying task lists.
+        if aggregate_spec == 'completion_score:avg':
+            return SQL(
+                'SUM(%s) / NULLIF(SUM(%s), 0)',
+                self._field_to_sql(self._table, 'score_sum', query),
+                self._field_to_sql(self._table, 'list_count', query),
+            )
+        return super()._read_group_select(aggregate_spec, query)
+
+    @api.model
+    def _refresh_days(self, days=None):
+        """Rebuild the rows of the given dates, or the whole table if None."""
+        self.env['restaurant.task.list'].flush_model()
+        cr = self.env.cr
+        if days is None:
+            cr.execute("TRUNCATE restaurant_task_report")
+            day_filter = SQL()
+        else:
+            days = sorted(days)
+            if not days:
+                return
+            cr.execute("DELETE FROM restaurant_task_report WHERE date = ANY(%s)", [days])
+            # The range keeps the shift_start index usable, the ANY() drops
+            # untouched days inside it.
+            day_filter = SQL(
+                """AND tl.shift_start >= %s
+                   AND tl.shift_start < %s::date + 1
+                   AND tl.shift_start::date = ANY(%s)""",
+                days[0], days[-1], days,
+            )
+        cr.execute(SQL("""
+            INSERT INTO restaurant_task_report (
+                date, employee_id, location_id, template_id,
+                list_count, done_list_count, total_tasks, completed_tasks,
+                score_sum, completion_score
+            )
+            SELECT tl.shift_start::date, tl.employee_id, tl.location_id, tl.template_id,
+                   count(*),
+                   count(*) FILTER (WHERE tl.state = 'done'),
+                   sum(tl.total_tasks),
+                   sum(tl.completed_tasks),
+                   sum(tl.completion_score),
+                   avg(tl.completion_score)
+              FROM restaurant_task_list tl
+             WHERE tl.state IN ('active', 'done', 'expired')
+               AND tl.shift_start IS NOT NULL
+               %s
+          GROUP BY 1, 2, 3, 4
+        """, day_filter))
+        self.invalidate_model()
+
+    @api.model
+    @instrumented_cron
+    def _cron_refresh_report(self):
+        """Rebuild the days touched by task lists written since the last run
+        (with a small overlap for transactions still in flight at that time)
+        and the days marked dirty by deleted or moved lists."""
+        ICP = self.env['ir.config_parameter'].sudo()
+        last_run = ICP.get_param(REFRESH_PARAM)
+        cr = self.env.cr
+        cr.execute("SELECT now() at time zone 'UTC'")
+        [started_at] = cr.fetchone()
+        self.env['restaurant.task.list'].flush_model()
+        cr.execute("DELETE FROM restaurant_task_report_dirty RETURNING date")
+        dirty_days = {row[0] for row in cr.fetchall()}
+        if not last_run:
+            self._refresh_days()
+            _logger.info('Rebuilt the task completion report.')
+        else:
+            cr.execute("""
+                SELECT DISTINCT shift_start::date
+                  FROM restaurant_task_list
+                 WHERE write_date >= %s::timestamp - interval '5 minutes'
+                   AND shift_start IS NOT NULL
+            """, [last_run])
+            days = dirty_days | {row[0] for row in cr.fetchall()}
+            self._refresh_days(days)
+            track_cron(acted=len(days))
+            _logger.info('Refreshed the task completion report for %d days.', len(days))
+        ICP.set_param(REFRESH_PARAM, fields.Datetime.to_string(started_at))
@@ -24,3 +24,17 @@ class TaskSubtask(models.Model):
         store=True,
         readonly=True,
     )
+    user_id = fields.Many2one(
+        'res.users',
+        related='task_item_id.user_id',
+        store=True,
+        readonly=True,
+        index='btree_not_null',
+    )
+    location_id = fields.Many2one(
+        'hr.work.location',
+        related='task_item_id.location_id',
+        store=True,
+        readonly=True,
+        index=True,
+    )
@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 from odoo import models, fields, api
 
+from .task_template_version import SNAPSHOT_FIELDS
+
 
 class TaskListTemplate(models.Model):
     """A named collection of task templates assigned to shifts via planning roles.
@@ -35,12 +37,57 @@ class TaskListTemplate(models.Model):
     )
     active = fields.Boolean(default=True)
     color = fields.Integer()
+    # Snapshot of the tasks that generated task lists use; cleared on every
+    # edit of the tasks and re-created at the next generation
+    version_ids = fields.One2many(
+        'restaurant.task.template.version', 'list_template_id', string='Versions',
+    )
+    current_version_id = fields.Many2one(
+        'restaurant.task.template.version', readonly=True, copy=False,
+    )
 
     @api.depends('task_template_ids')
     def _compute_task_count(self):
         for rec in self:
             rec.task_count = len(rec.task_template_ids)
 
+    def _get_current_version(self):
+        """Return the version matching the current tasks, snapshotting them
+        first if they changed since the last one."""
+        self.ensure_one()
+        if self.current_version_id:
+            return self.current_version_id
+        # Concurrent generations would otherwise number the same version;
+        # the one locking second fails to serialize and is retried, then
+        # finds the version the first one created
+        self.env.cr.execute(
+            "SELECT id FROM restaurant_task_list_template WHERE id = %s FOR UPDATE",
+            [self.id],
+        )
+        Version = self.env['restaurant.task.template.version'].sudo()
+        last = Version.search([('list_template_id', '=', self.id)], limit=1)
+        version = Version.create({
+            'list_template_id': self.id,
+            'version': last.version + 1,
+            'line_ids': [
+                fields.Command.create({
+                    'task_template_id': task.id,
+                    **{name: task[name] for name in SNAPSHOT_FIELDS if name != 'instruction_document_id'},
+                    'instruction_document_id': task.instruction_document_id.id,
+                    'subtask_ids': [
+                        fields.Command.create({'name': st.name, 'sequence': st.sequence})
+                        for st in task.subtask_template_ids
+                    ],
+                })
+                for task in self.task_template_ids
+            ],
+        })
+        self.sudo().current_version_id = version
+        return version.with_env(self.env)
+
+    def _invalidate_version(self):
+        self.filtered('current_version_id').sudo().current_version_id = False
+
 
 class TaskTemplate(models.Model):
     """Individual task definition within a template. Supports multiple
@@ -91,9 +138,13 @@ class TaskTemplate(models.Model):
         string='Also Require Photo',
         help='Require a photo in addition to the primary completion type.',
     )
-    # PDF instructions
+    # PDF instructions — the upload is stored once per content in
+    # instruction_document_id, which generated task items share
     instruction_file = fields.Binary(string='Instructions (PDF)', attachment=True)
     instruction_filename = fields.Char()
+    instruction_document_id = fields.Many2one(
+        'restaurant.task.document', readonly=True, ondelete='set null',
+    )
     # Sub-tasks
     subtask_template_ids = fields.One2many(
         'restaurant.subtask.template',
@@ -108,6 +159,33 @@ class TaskTemplate(models.Model):
         for rec in self:
             rec.subtask_count = len(rec.subtask_template_ids)
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        for vals in vals_list:
+            self._set_instruction_document(vals)
+        records = super().create(vals_list)
+        records.task_list_template_id._invalidate_version()
+        return records
+
+    def write(self, vals):
+        self._set_instruction_document(vals)
+        if not set(vals).isdisjoint(SNAPSHOT_FIELDS + ['task_list_template_id', 'active']):
+            self.task_list_template_id._invalidate_version()
+        result = super().write(vals)
+        if 'task_list_template_id' in vals:
+            self.task_list_template_id._invalidate_version()
+        return result
+
+    def unlink(self):
+        self.task_list_template_id._invalidate_version()
+        return super().unlink()
+
+    def _set_instruction_document(self, vals):
+        if 'instruction_file' in vals:
+            vals['instruction_document_id'] = self.env['restaurant.task.document']._get_or_create(
+                vals['instruction_file'], vals.get('instruction_filename'),
+            ).id
+
 
 class SubtaskTemplate(models.Model):
     """Checklist item within a task template. For example, 'Clean Kitchen'
@@ -124,3 +202,20 @@ class SubtaskTemplate(models.Model):
         ondelete='cascade',
         required=True,
     )
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        records.task_template_id.task_list_template_id._invalidate_version()
+        return records
+
+    def write(self, vals):
+        self.task_template_id.task_list_template_id._invalidate_version()
+        result = super().write(vals)
+        if 'task_template_id' in vals:
+            self.task_template_id.task_list_template_id._invalidate_version()
+        return result
+
+    def unlink(self):
+        self.task_template_id.task_list_template_id._invalidate_version()
+        return super().unlink()
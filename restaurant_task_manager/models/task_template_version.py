@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+
+# Task template fields whose edits require a new version
+SNAPSHOT_FIELDS = [
+    'name', 'description', 'sequence', 'has_deadline', 'relative_deadline_minutes',
+    'reminder_minutes_before', 'completion_type', 'numeric_label', 'numeric_min',
+    'numeric_max', 'require_proof_photo', 'instruction_document_id',
+    'instruction_filename',
+]
+
+
+class TaskTemplateVersion(models.Model):
+    """Immutable snapshot of a task list template's tasks and checklists.
+    Generated task items reference its lines instead of copying the task
+    content, so each version of a template's content is stored once."""
+    _name = 'restaurant.task.template.version'
+    _description = 'Task List Template Version'
+    _order = 'list_template_id, version desc'
+    _rec_name = 'version'
+
+    list_template_id = fields.Many2one(
+        'restaurant.task.list.template', ondelete='set null', index=True, readonly=True,
+    )
+    version = fields.Integer(readonly=True)
+    line_ids = fields.One2many(
+        'restaurant.task.template.version.line', 'version_id', string='Tasks', readonly=True,
+    )
+
+    _version_uniq = models.Constraint(
+        'UNIQUE(list_template_id, version)',
+        'A task list template cannot have the same version twice.',
+    )
+
+    @api.depends('list_template_id.name', 'version')
+    def _compute_display_name(self):
+        for rec in self:
+            rec.display_name = _('%(template)s (v%(version)s)',
+                                 template=rec.list_template_id.name or _('Deleted template'),
+                                 version=rec.version)
+
+    def write(self, vals):
+        if set(vals) - {'list_template_id'}:
+            raise UserError(_('Task template versions cannot be modified.'))
+        return super().write(vals)
+
+
+class TaskTemplateVersionLine(models.Model):
+    """One task of a template version, as generated task items see it."""
+    _name = 'restaurant.task.template.version.line'
+    _description = 'Task Template Version Line'
+    _order = 'version_id, sequence, id'
+
+    version_id = fields.Many2one(
+        'restaurant.task.template.version', required=True, ondelete='cascade', index=True,
+    )
+    task_template_id = fields.Many2one(
+        'restaurant.task.template', ondelete='set null', readonly=True,
+    )
+    name = fields.Char(readonly=True)
+    description = fields.Html(string='Description / Instructions', readonly=True)
+    sequence = fields.Integer(readonly=True)
+    has_deadline = fields.Boolean(readonly=True)
+    relative_deadline_minutes = fields.Integer(readonly=True)
+    reminder_minutes_before = fields.Integer(readonly=True)
+    completion_type = fields.Selection(
+        selection=lambda self: self.env['restaurant.task.template']._fields['completion_type'].selection,
+        readonly=True,
+    )
+    numeric_label = fields.Char(string='Value Label', readonly=True)
+    numeric_min = fields.Float(readonly=True)
+    numeric_max = fields.Float(readonly=True)
+    require_proof_photo = fields.Boolean(string='Also Require Photo', readonly=True)
+    instruction_document_id = fields.Many2one(
+        'restaurant.task.document', ondelete='restrict', readonly=True,
+    )
+    instruction_filename = fields.Char(readonly=True)
+    subtask_ids = fields.One2many(
+        'restaurant.task.template.version.subtask', 'line_id', string='Checklist Items',
+        readonly=True,
+    )
+
+    def write(self, vals):
+        raise UserError(_('Task template versions cannot be modified.'))
+
+
+class TaskTemplateVersionSubtask(models.Model):
+    _name = 'restaurant.task.template.version.subtask'
+    _description = 'Task Template Version Checklist Item'
+    _order = 'line_id, sequence, id'
+
+    line_id = fields.Many2one(
+        'restaurant.task.template.version.line', required=True, ondelete='cascade', index=True,
+    )
+    name = fields.Char(readonly=True)
+    sequence = fields.Integer(readonly=True)
+
+    def write(self, vals):
+        raise UserError(_('Task template versions cannot be modified.'))
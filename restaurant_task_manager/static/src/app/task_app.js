@@ -0,0 +1,189 @@
+/** @odoo-module **/
+/**
+ * task_app.js
+ * Root OWL component for the staff task app.
+ * Bootstrapped by task_app_main.js via owl.mount().
+ */
+
+import { Component, useState, onWillStart, onMounted, onWillUnmount } from "@odoo/owl";
+import { TaskService } from "./task_app_service";
+
+const FLUSH_DELAY = 1500;       // ms — group quick taps into one /sync call
+const FLUSH_INTERVAL = 30000;   // ms — retry pending ops while offline
+
+export class RestaurantTaskApp extends Component {
+    static template = "restaurant_task_manager.TaskApp";
+
+    setup() {
+        this.state = useState({
+            loading: true,
+            error: null,
+            offline: false,
+            employee: "",
+            lists: [],
+            items: [],
+            subtasks: [],
+            openItemId: null,
+            uploadingItemId: null,
+            pending: TaskService.pending.length,
+            toast: null,
+        });
+
+        this.onOnline = () => this.flush();
+        onWillStart(() => this.loadShift());
+        onMounted(() => {
+            window.addEventListener("online", this.onOnline);
+            this._interval = setInterval(() => this.flush(), FLUSH_INTERVAL);
+        });
+        onWillUnmount(() => {
+            window.removeEventListener("online", this.onOnline);
+            clearInterval(this._interval);
+            clearTimeout(this._flushTimer);
+        });
+    }
+
+    // ── Data ──────────────────────────────────────────────
+
+    async loadShift() {
+        this.state.loading = true;
+        this.state.error = null;
+        try {
+            const { shift, offline } = await TaskService.getShift();
+            Object.assign(this.state, {
+                offline,
+                employee: shift.employee,
+                lists: shift.lists,
+                items: shift.items,
+                subtasks: shift.subtasks,
+            });
+        } catch (e) {
+            this.state.error = e.message || "Failed to load your tasks";
+        }
+        this.state.loading = false;
+    }
+
+    itemsOf(list) {
+        return this.state.items.filter((i) => i.task_list_id === list.id);
+    }
+
+    subtasksOf(item) {
+        return this.state.subtasks.filter((s) => s.task_item_id === item.id);
+    }
+
+    progressOf(list) {
+        const items = this.itemsOf(list);
+        const done = items.filter((i) => i.state === "done").length;
+        return { done, total: items.length, pct: items.length ? Math.round((done / items.length) * 100) : 0 };
+    }
+
+    needsPhoto(item) {
+        return item.completion_type === "photo" || item.require_proof_photo;
+    }
+
+    needsBackend(item) {
+        return item.completion_type === "signature";
+    }
+
+    thumbnailUrl(item) {
+        return `/web/image/restaurant.task.item/${item.id}/proof_photo_thumb?unique=${item.photo_version || 0}`;
+    }
+
+    backendUrl(item) {
+        return `/odoo/action-restaurant_task_manager.action_task_item_all/${item.id}`;
+    }
+
+    // ── Handlers (optimistic, queued) ─────────────────────
+
+    toggleItem(item) {
+        this.state.openItemId = this.state.openItemId === item.id ? null : item.id;
+    }
+
+    toggleSubtask(subtask) {
+        subtask.is_done = !subtask.is_done;
+        this.queue({ type: "subtask", subtask_id: subtask.id, is_done: subtask.is_done });
+    }
+
+    onValue(item, key, ev) {
+        const value = key === "proof_numeric_value" ? parseFloat(ev.target.value) || 0 : ev.target.value;
+        item[key] = value;
+        this.queue({ type: "value", item_id: item.id, [key]: value });
+    }
+
+    async onPhoto(item, ev) {
+        const file = ev.target.files[0];
+        if (!file) {
+            return;
+        }
+        this.state.uploadingItemId = item.id;
+        try {
+            await TaskService.uploadPhoto(item.id, file);
+            item.proof_photo_thumb = true;
+            item.photo_version = Date.now();
+            this.showToast("Photo saved");
+        } catch (e) {
+            this.showToast(e.message || "Photo upload failed — try again", "error");
+        }
+        this.state.uploadingItemId = null;
+    }
+
+    complete(item) {
+        if (this.needsPhoto(item) && !item.proof_photo_thumb) {
+            this.showToast("Take a photo first", "warning");
+            return;
+        }
+        if (this.subtasksOf(item).some((s) => !s.is_done)) {
+            this.showToast("Tick every checklist item first", "warning");
+            return;
+        }
+        if (item.completion_type === "text" && !item.proof_text_note) {
+            this.showToast("Add a note first", "warning");
+            return;
+        }
+        item.state = "done";
+        this.state.openItemId = null;
+        this.queue({ type: "complete", item_id: item.id });
+    }
+
+    // ── Sync ──────────────────────────────────────────────
+
+    queue(op) {
+        TaskService.enqueue(op);
+        this.state.pending = TaskService.pending.length;
+        clearTimeout(this._flushTimer);
+        this._flushTimer = setTimeout(() => this.flush(), FLUSH_DELAY);
+    }
+
+    async flush() {
+        if (this._flushing || !TaskService.pending.length) {
+            return;
+        }
+        this._flushing = true;
+        try {
+            const { rejected } = await TaskService.flush();
+            this.state.offline = false;
+            for (const op of rejected) {
+                if (op.type === "complete") {
+                    const item = this.state.items.find((i) => i.id === op.item_id);
+                    if (item) {
+                        item.state = "in_progress";
+                    }
+                }
+            }
+            if (rejected.length) {
+                this.showToast(rejected[0].error || "Some changes were refused", "error");
+            }
+        } catch {
+            this.state.offline = true;
+        }
+        this.state.pending = TaskService.pending.length;
+        this._flushing = false;
+    }
+
+    // ── Toast ─────────────────────────────────────────────
+
+    showToast(message, type = "success") {
+        this.state.toast = { message, type };
+        clearTimeout(this._toastTimer);
+        this._toastTimer = setTimeout(() => { this.state.toast = null; }, 2500);
+    }
+}
@@ -0,0 +1,17 @@
+/**
+ * task_app_main.js
+ * Entry point for the staff task app. Mounts the OWL app into
+ * #restaurant_task_app_root after DOM is ready.
+ */
+
+import { whenReady, mount } from "@odoo/owl";
+import { RestaurantTaskApp } from "./task_app";
+
+whenReady(() => {
+    const root = document.getElementById("restaurant_task_app_root");
+    if (!root) {
+        console.error("[RestaurantTasks] Mount point #restaurant_task_app_root not found.");
+        return;
+    }
+    mount(RestaurantTaskApp, root, { env: {}, dev: false });
+});
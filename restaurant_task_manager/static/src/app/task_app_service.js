@@ -0,0 +1,128 @@
+/**
+ * task_app_service.js
+ * JSON-RPC client and offline operation queue for the staff task app.
+ * Does NOT depend on @web/core — works in the standalone bundle.
+ */
+
+const QUEUE_KEY = "restaurant_tasks.queue";
+const SHIFT_KEY = "restaurant_tasks.shift";
+const CHUNK_SIZE = 256 * 1024;
+
+async function jsonRpc(route, params = {}) {
+    const response = await fetch(route, {
+        method: "POST",
+        headers: {
+            "Content-Type": "application/json",
+            "X-Requested-With": "XMLHttpRequest",
+        },
+        body: JSON.stringify({
+            jsonrpc: "2.0",
+            method: "call",
+            id: Math.floor(Math.random() * 1e9),
+            params,
+        }),
+    });
+    if (!response.ok) {
+        throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+    }
+    const data = await response.json();
+    if (data.error) {
+        throw new Error(data.error.data?.message || data.error.message || "RPC Error");
+    }
+    return data.result;
+}
+
+function readJson(key, fallback) {
+    try {
+        return JSON.parse(localStorage.getItem(key)) ?? fallback;
+    } catch {
+        return fallback;
+    }
+}
+
+/**
+ * TaskService — shift payload (cached for offline reloads) and a queue of
+ * pending operations flushed in one /sync call.
+ */
+export const TaskService = {
+    async getShift() {
+        try {
+            const shift = await jsonRpc("/restaurant-tasks/shift");
+            localStorage.setItem(SHIFT_KEY, JSON.stringify(shift));
+            return { shift, offline: false };
+        } catch (e) {
+            const cached = readJson(SHIFT_KEY, null);
+            if (!cached) {
+                throw e;
+            }
+            return { shift: cached, offline: true };
+        }
+    },
+
+    /**
+     * Upload a proof photo in CHUNK_SIZE slices (one POST each), so a weak
+     * connection only retries the slice that failed, never the whole photo.
+     */
+    async uploadPhoto(itemId, file) {
+        const csrfToken = document.querySelector("meta[name=csrf-token]")?.content || "";
+        const uploadId = `${itemId}-${Date.now()}-${Math.random().toString(36).slice(2, 8)}`;
+        const total = Math.max(1, Math.ceil(file.size / CHUNK_SIZE));
+        let result;
+        for (let index = 0; index < total; index++) {
+            const form = new FormData();
+            form.append("csrf_token", csrfToken);
+            form.append("upload_id", uploadId);
+            form.append("index", index);
+            form.append("total", total);
+            form.append("chunk", file.slice(index * CHUNK_SIZE, (index + 1) * CHUNK_SIZE), file.name);
+            let attempt = 0;
+            for (;;) {
+                try {
+                    const response = await fetch(`/restaurant-tasks/photo/${itemId}`, {
+                        method: "POST",
+                        body: form,
+                    });
+                    result = await response.json();
+                    break;
+                } catch (e) {
+                    if (++attempt >= 3) {
+                        throw e;
+                    }
+                }
+            }
+            if (!result.ok) {
+                throw new Error(result.error || "Upload failed");
+            }
+        }
+        return result;
+    },
+
+    get pending() {
+        return readJson(QUEUE_KEY, []);
+    },
+
+    enqueue(op) {
+        const queue = this.pending;
+        queue.push({ ...op, id: `${Date.now()}-${queue.length}` });
+        localStorage.setItem(QUEUE_KEY, JSON.stringify(queue));
+    },
+
+    /**
+     * Send every queued op in one request. Ops that reached the server are
+     * dropped from the queue (rejected ones are returned so the UI can
+     * revert them); on network failure the queue is kept as is.
+     */
+    async flush() {
+        const queue = this.pending;
+        if (!queue.length) {
+            return { results: {}, rejected: [] };
+        }
+        const { results } = await jsonRpc("/restaurant-tasks/sync", { ops: queue });
+        const sent = new Set(queue.map((op) => op.id));
+        const remaining = this.pending.filter((op) => !sent.has(op.id));
+        localStorage.setItem(QUEUE_KEY, JSON.stringify(remaining));
+        const rejected = queue.filter((op) => !results[op.id]?.ok)
+            .map((op) => ({ ...op, error: results[op.id]?.error }));
+        return { results, rejected };
+    },
+};
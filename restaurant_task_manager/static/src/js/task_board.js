@@ -0,0 +1,64 @@
+/** @odoo-module **/
+import { registry } from "@web/core/registry";
+import { kanbanView } from "@web/views/kanban/kanban_view";
+import { KanbanController } from "@web/views/kanban/kanban_controller";
+import { useService } from "@web/core/utils/hooks";
+import { onWillUnmount } from "@odoo/owl";
+
+/**
+ * TaskBoardController
+ * Live "today" board for managers. Listens to restaurant_task_board/update
+ * bus notifications (one per location, sent when a task is started,
+ * completed or reset) and patches only the affected cards in place.
+ * A list changing state moves between columns, so that triggers a reload.
+ */
+export class TaskBoardController extends KanbanController {
+    setup() {
+        super.setup();
+        this.busService = useService("bus_service");
+        this.onBoardUpdate = (payload) => this.applyBoardUpdate(payload);
+        this.busService.subscribe("restaurant_task_board/update", this.onBoardUpdate);
+        onWillUnmount(() => {
+            this.busService.unsubscribe("restaurant_task_board/update", this.onBoardUpdate);
+        });
+    }
+
+    get boardRecords() {
+        const root = this.model.root;
+        const records = root.isGrouped
+            ? root.groups.flatMap((group) => group.list.records)
+            : root.records;
+        return new Map(records.map((record) => [record.resId, record]));
+    }
+
+    async applyBoardUpdate({ lists }) {
+        const records = this.boardRecords;
+        let reload = false;
+        for (const update of lists) {
+            const record = records.get(update.id);
+            if (!record) {
+                continue;
+            }
+            if (record.data.state !== update.state) {
+                reload = true;
+                continue;
+            }
+            record._applyValues({
+                completed_tasks: update.completed,
+                total_tasks: update.total,
+                completion_score: update.score,
+                overdue_count: update.overdue,
+            });
+        }
+        if (reload) {
+            await this.model.load();
+        }
+    }
+}
+
+export const taskBoardView = {
+    ...kanbanView,
+    Controller: TaskBoardController,
+};
+
+registry.category("views").add("restaurant_task_board", taskBoardView);
@@ -26,6 +26,25 @@ async function jsonRpc(route, params = {}) {
     return data.result;
 }
 
+/**
+ * Rebuild the row objects of a compact (columnar) get_quants payload,
+ * resolving the dictionary-encoded columns through their lookup table.
+ */
+function decodeColumns({ columns, lookups, encoded }) {
+    const keys = Object.keys(columns);
+    const length = keys.length ? columns[keys[0]].length : 0;
+    const rows = [];
+    for (let i = 0; i < length; i++) {
+        const row = {};
+        for (const key of keys) {
+            const value = columns[key][i];
+            row[key] = encoded[key] ? lookups[encoded[key]][value] : value;
+        }
+        rows.push(row);
+    }
+    return rows;
+}
+
 class MobilePhysicalInventory extends Component {
     static template = "mobile_physical_inventory.App";
 
@@ -40,6 +59,11 @@ class MobilePhysicalInventory extends Component {
             loading: false,
             searchText: "",
             selectedLocation: "",
+            dueToday: false,      // only today's cycle count plan
+            walk: {
+                bins: [],         // [{id, name, count}] in walking order
+                index: -1,        // current bin, -1 when not walking
+            },
             totalCount: 0,
             countedItems: 0,
             diffItems: 0,
@@ -65,6 +89,7 @@ class MobilePhysicalInventory extends Component {
         this.rootRef = useRef("root");
         this._searchDebounce = null;
         this._productSearchDebounce = null;
+        this._prefetched = null;  // {key, promise} of the next bin's quants
 
         onMounted(() => {
             this._unlockScroll();
@@ -109,6 +134,30 @@ class MobilePhysicalInventory extends Component {
         }
     }
 
+    _quantParams(locationId, offset) {
+        return {
+            location_id: locationId || null,
+            search: this.state.searchText,
+            due_today: this.state.dueToday,
+            offset,
+            limit: this.state.limit,
+            compact: true,
+        };
+    }
+
+    /**
+     * get_quants, answered from the prefetched next bin when it matches.
+     */
+    _fetchQuants(params) {
+        const key = JSON.stringify(params);
+        const prefetched = this._prefetched;
+        this._prefetched = null;
+        if (prefetched && prefetched.key === key) {
+            return prefetched.promise;
+        }
+        return jsonRpc("/mobile_inventory/get_quants", params);
+    }
+
     async loadQuants(reset = false) {
         if (reset) {
             this.state.offset = 0;
@@ -116,13 +165,11 @@ class MobilePhysicalInventory extends Component {
         }
         this.state.loading = true;
         try {
-            const result = await jsonRpc("/mobile_inventory/get_quants", {
-                location_id: this.state.selectedLocation || null,
-                search: this.state.searchText,
-                offset: this.state.offset,
-                limit: this.state.limit,
-            });
-            const newQuants = result.quants.map(q => ({ ...q, modified: false }));
+            const result = await this._fetchQuants(
+                this._quantParams(this.state.selectedLocation, this.state.offset)
+            );
+            const quants = result.columns ? decodeColumns(result) : result.quants;
+            const newQuants = quants.map(q => ({ ...q, modified: false }));
             this.state.quants = reset ? newQuants : [...this.state.quants, ...newQuants];
             this.state.totalCount = result.total;
             this.state.hasMore = (this.state.offset + this.state.limit) < result.total;
@@ -131,6 +178,9 @@ class MobilePhysicalInventory extends Component {
             this.showToast("Failed to load inventory data", "error");
         }
         this.state.loading = false;
+        if (reset) {
+            this._prefetchNextBin();
+        }
     }
 
     async loadMore() {
@@ -165,15 +215,120 @@ class MobilePhysicalInventory extends Component {
     onSearchInput() {
         clearTimeout(this._searchDebounce);
         this._searchDebounce = setTimeout(() => {
-            this.loadQuants(true);
+            if (this.isWalking) {
+                this.startWalk();
+            } else {
+                this.loadQuants(true);
+            }
         }, 500);
     }
 
     onLocationChange(ev) {
         this.state.selectedLocation = ev.target.value ? parseInt(ev.target.value) : "";
+        if (this.isWalking) {
+            // Carry on walking from the chosen bin, if it is on the walk
+            const index = this.state.walk.bins.findIndex(b => b.id === this.state.selectedLocation);
+            if (index >= 0) {
+                this.goToBin(index);
+                return;
+            }
+            this.state.walk.index = -1;
+            this.state.walk.bins = [];
+        }
         this.loadQuants(true);
     }
 
+    toggleDueToday() {
+        this.state.dueToday = !this.state.dueToday;
+        if (this.isWalking) {
+            this.startWalk();
+        } else {
+            this.loadQuants(true);
+        }
+    }
+
+    // ---- Counting Walk ----
+
+    get isWalking() {
+        return this.state.walk.index >= 0;
+    }
+
+    get currentBin() {
+        return this.state.walk.bins[this.state.walk.index] || null;
+    }
+
+    toggleWalk() {
+        if (this.isWalking) {
+            this.stopWalk();
+        } else {
+            this.startWalk();
+        }
+    }
+
+    async startWalk() {
+        try {
+            this.state.walk.bins = await jsonRpc("/mobile_inventory/get_walk", {
+                search: this.state.searchText,
+                due_today: this.state.dueToday,
+            });
+        } catch (e) {
+            this.showToast("Failed to load the counting walk", "error");
+            return;
+        }
+        if (!this.state.walk.bins.length) {
+            this.showToast("Nothing to count");
+            this.stopWalk();
+            return;
+        }
+        this.goToBin(0);
+    }
+
+    stopWalk() {
+        this.state.walk.index = -1;
+        this.state.walk.bins = [];
+        this._prefetched = null;
+        this.state.selectedLocation = "";
+        this.loadQuants(true);
+    }
+
+    goToBin(index) {
+        const bin = this.state.walk.bins[index];
+        if (!bin) {
+            return;
+        }
+        this.state.walk.index = index;
+        this.state.selectedLocation = bin.id;
+        this.loadQuants(true);
+    }
+
+    nextBin() {
+        this.goToBin(this.state.walk.index + 1);
+    }
+
+    prevBin() {
+        this.goToBin(this.state.walk.index - 1);
+    }
+
+    /**
+     * Fetch the first page of the next bin in the background while the
+     * current one is being counted, so stepping on shows it at once.
+     */
+    _prefetchNextBin() {
+        const next = this.state.walk.bins[this.state.walk.index + 1];
+        if (!this.isWalking || !next) {
+            return;
+        }
+        const params = this._quantParams(next.id, 0);
+        const promise = jsonRpc("/mobile_inventory/get_quants", params);
+        // A failed prefetch is simply fetched again on arrival
+        promise.catch(() => {
+            if (this._prefetched?.promise === promise) {
+                this._prefetched = null;
+            }
+        });
+        this._prefetched = { key: JSON.stringify(params), promise };
+    }
+
     // ---- Quantity Controls ----
 
     async adjustQty(quant, delta) {
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+from datetime import timedelta
+
+from odoo import fields
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestCycleCount(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.ABC = cls.env['mobile.inventory.abc']
+        cls.Quant = cls.env['stock.quant']
+        warehouse = cls.env['stock.warehouse'].search([('company_id', '=', cls.env.company.id)], limit=1)
+        cls.location = cls.env['stock.location'].create({
+            'name': 'Cycle Count Shelf',
+            'usage': 'internal',
+            'location_id': warehouse.view_location_id.id,
+        })
+        cls.product_a, cls.product_b, cls.product_c, cls.product_idle = cls.env['product.product'].create([
+            {'name': 'Cycle Count %s' % name, 'is_storable': True, 'standard_price': 1000000.0}
+            for name in ('A', 'B', 'C', 'Idle')
+        ])
+        # 80% / 15% / 5% of the location's turnover value, priced to be
+        # planned before anything else in the database
+        yesterday = fields.Date.today() - timedelta(days=1)
+        cls.env['mobile.inventory.movement'].create([
+            {'date': yesterday, 'product_id': product.id, 'location_id': cls.location.id,
+             'quantity': quantity}
+            for product, quantity in ((cls.product_a, 80), (cls.product_b, 15), (cls.product_c, 5))
+        ])
+        for product in (cls.product_a, cls.product_b, cls.product_c, cls.product_idle):
+            cls.Quant._update_available_quantity(product, cls.location, 10)
+
+    def _abc_class(self, product):
+        return self.ABC.search([
+            ('product_id', '=', product.id), ('location_id', '=', self.location.id),
+        ]).abc_class
+
+    def test_classify_thresholds(self):
+        self.ABC._classify()
+        self.assertEqual(self._abc_class(self.product_a), 'a')
+        self.assertEqual(self._abc_class(self.product_b), 'b')
+        self.assertEqual(self._abc_class(self.product_c), 'c')
+        # In stock without moving still gets counted, as class C
+        self.assertEqual(self._abc_class(self.product_idle), 'c')
+
+    def test_plan_limit_counts_quants(self):
+        owners = self.env['res.partner'].create([{'name': 'Owner 1'}, {'name': 'Owner 2'}])
+        for owner in owners:
+            self.Quant._update_available_quantity(
+                self.product_a, self.location, 5, owner_id=owner,
+            )
+        self.ABC._classify()
+        self.Quant.search([]).cycle_count_date = False
+        self.env['ir.config_parameter'].sudo().set_param('mobile_physical_inventory.daily_limit', 2)
+        self.assertEqual(self.ABC._plan_counts(), 2)
+        planned = self.Quant.search([('cycle_count_date', '!=', False)])
+        self.assertEqual(len(planned), 2)
+        self.assertEqual(planned.product_id, self.product_a)
+
+    def test_apply_inventory_clears_plan(self):
+        self.ABC._classify()
+        quant = self.Quant.search([
+            ('product_id', '=', self.product_a.id), ('location_id', '=', self.location.id),
+        ])
+        quant.cycle_count_date = fields.Date.today()
+        quant.inventory_quantity = 9
+        quant.action_apply_inventory()
+        self.assertFalse(quant.cycle_count_date)
+        abc = self.ABC.search([
+            ('product_id', '=', self.product_a.id), ('location_id', '=', self.location.id),
+        ])
+        self.assertEqual(abc.last_counted_date, fields.Date.today())
+        self.assertGreater(abc.next_count_date, fields.Date.today())
@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Concurrent load test for the inventory counting routes.
+
+Replays stocktake sessions against a running Odoo server from many
+simulated counters at once and reports, per route, throughput, latency
+percentiles, errors and serialization failures, plus the lock waits seen
+in PostgreSQL while the test ran.
+
+    # 1. seed 10 locations x 500 quants (as an admin, once)
+    python3 tools/inventory_load_test.py seed --url http://localhost:8069 \\
+        --db stocktake --login admin --password admin --locations 10 --quants 500
+
+    # 2. 30 counters for 5 minutes on both apps
+    python3 tools/inventory_load_test.py run --url http://localhost:8069 \\
+        --db stocktake --login counter --password counter --clients 30 \\
+        --duration 300 --app both --pg-dsn "dbname=stocktake" --json report.json
+
+Only the standard library is required; lock wait sampling additionally
+needs psycopg2 and a --pg-dsn. Never point this at a production database:
+the sessions really count, and --apply really validates the inventory.
+"""
+import argparse
+import http.cookiejar
+import itertools
+import json
+import random
+import statistics
+import sys
+import threading
+import time
+import urllib.request
+
+SEED_PREFIX = 'LOADTEST'
+SERIALIZATION_MARKERS = (
+    'could not serialize access',
+    'concurrent update',
+    'deadlock detected',
+    'TransactionRollbackError',
+)
+
+
+class RpcError(Exception):
+    pass
+
+
+class OdooSession:
+    """One authenticated browser-like session (own cookie jar)."""
+
+    def __init__(self, url, db, login, password, timeout=60):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar())
+        )
+        self._ids = itertools.count(1)
+        self.call('/web/session/authenticate', {'db': db, 'login': login, 'password': password})
+
+    def call(self, route, params):
+        payload = json.dumps({
+            'jsonrpc': '2.0', 'method': 'call', 'id': next(self._ids), 'params': params,
+        }).encode()
+        req = urllib.request.Request(
+            self.url + route, data=payload, headers={'Content-Type': 'application/json'},
+        )
+        with self.opener.open(req, timeout=self.timeout) as response:
+            body = json.loads(response.read())
+        if body.get('error'):
+            error = body['error']
+            data = error.get('data') or {}
+            raise RpcError(data.get('message') or error.get('message') or str(error))
+        return body.get('result')
+
+    def call_kw(self, model, method, args, kwargs=None):
+        return self.call('/web/dataset/call_kw/%s/%s' % (model, method), {
+            'model': model, 'method': method, 'args': args, 'kwargs': kwargs or {},
+        })
+
+
+# ── Seeding ──────────────────────────────────────────────────────────
+
+def seed(args):
+    """Create N internal locations under the main stock location and M
+    products, each with on-hand stock in every location (N x M quants)."""
+    session = OdooSession(args.url, args.db, args.login, args.password)
+    rng = random.Random(args.seed)
+    [warehouse] = session.call_kw('stock.warehouse', 'search_read', [[]], {
+        'fields': ['lot_stock_id'], 'limit': 1,
+    })
+    parent_id = warehouse['lot_stock_id'][0]
+    location_ids = session.call_kw('stock.location', 'create', [[
+        {'name': '%s-%03d' % (SEED_PREFIX, i + 1), 'location_id': parent_id, 'usage': 'internal'}
+        for i in range(args.locations)
+    ]])
+    product_ids = []
+    for start in range(0, args.quants, 200):
+        product_ids += session.call_kw('product.product', 'create', [[
+            {
+                'name': '%s Product %05d' % (SEED_PREFIX, i + 1),
+                'default_code': '%s-%05d' % (SEED_PREFIX, i + 1),
+                'barcode': '99%011d' % (i + 1),
+                'type': 'consu',
+                'is_storable': True,
+            }
+            for i in range(start, min(start + 200, args.quants))
+        ]])
+    ctx = {'context': {'inventory_mode': True}}
+    for location_id in location_ids:
+        for start in range(0, len(product_ids), 200):
+            quant_ids = session.call_kw('stock.quant', 'create', [[
+                {
+                    'product_id': product_id,
+                    'location_id': location_id,
+                    'inventory_quantity': rng.randint(0, 200),
+                }
+                for product_id in product_ids[start:start + 200]
+            ]], ctx)
+            session.call_kw('stock.quant', 'action_apply_inventory', [quant_ids], ctx)
+        print('seeded location %d (%d quants)' % (location_id, len(product_ids)))
+    print('seeded %d locations x %d products' % (len(location_ids), len(product_ids)))
+
+
+# ── Simulated counters ───────────────────────────────────────────────
+
+class Stats:
+    """Thread-safe per-route samples."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {}
+        self.errors = {}
+        self.serialization = {}
+        self.error_samples = {}
+
+    def record(self, route, latency, error=None):
+        with self.lock:
+            self.latencies.setdefault(route, []).append(latency)
+            if error:
+                self.errors[route] = self.errors.get(route, 0) + 1
+                if any(marker in error for marker in SERIALIZATION_MARKERS):
+                    self.serialization[route] = self.serialization.get(route, 0) + 1
+                self.error_samples.setdefault(route, error[:200])
+
+
+class Counter(threading.Thread):
+    """One person counting: pick a location, page through it, search and
+    scan products, and type counts in bursts, with short think times."""
+
+    def __init__(self, index, args, stats, deadline):
+        super().__init__(name='counter-%d' % index, daemon=True)
+        self.args = args
+        self.stats = stats
+        self.deadline = deadline
+        self.rng = random.Random(args.seed + index)
+        self.app = args.app if args.app != 'both' else ('mobile', 'standalone')[index % 2]
+
+    def timed(self, route, params):
+        start = time.perf_counter()
+        try:
+            result = self.session.call(route, params)
+        except Exception as e:  # network errors are failures of the route too
+            self.stats.record(route, time.perf_counter() - start, str(e) or type(e).__name__)
+            return None
+        error = None
+        if isinstance(result, dict) and (result.get('error') or result.get('success') is False):
+            error = str(result.get('error'))
+        self.stats.record(route, time.perf_counter() - start, error)
+        return result
+
+    def think(self):
+        time.sleep(self.rng.uniform(0, self.args.think_time))
+
+    def run(self):
+        try:
+            self.session = OdooSession(self.args.url, self.args.db, self.args.login, self.args.password)
+        except Exception as e:
+            self.stats.record('/web/session/authenticate', 0.0, str(e))
+            return
+        session_fn = self.mobile_session if self.app == 'mobile' else self.standalone_session
+        while time.time() < self.deadline:
+            session_fn()
+
+    def burst(self):
+        return range(self.rng.randint(self.args.burst // 2 or 1, self.args.burst))
+
+    def mobile_session(self):
+        locations = self.timed('/mobile_inventory/get_locations', {}) or []
+        seeded = [l for l in locations if SEED_PREFIX in l['name']] or locations
+        if not seeded:
+            return
+        location = self.rng.choice(seeded)
+        offset, page = 0, 20
+        while time.time() < self.deadline:
+            result = self.timed('/mobile_inventory/get_quants', {
+                'location_id': location['id'], 'search': '', 'offset': offset, 'limit': page,
+            })
+            if not result or not result['quants']:
+                break
+            for quant in self.rng.sample(result['quants'], min(len(result['quants']), len(self.burst()))):
+                self.timed('/mobile_inventory/set_quantity', {
+                    'quant_id': quant['id'], 'quantity': self.rng.randint(0, 200),
+                })
+            if self.rng.random() < 0.3:
+                # Barcode scan / search for a product, then count it
+                quant = self.rng.choice(result['quants'])
+                found = self.timed('/mobile_inventory/get_quants', {
+                    'location_id': location['id'],
+                    'search': quant['product_name'].split()[-1],
+                    'offset': 0, 'limit': page,
+                })
+                if found and found['quants']:
+                    self.timed('/mobile_inventory/create_quant', {
+                        'product_id': found['quants'][0]['product_id'],
+                        'location_id': location['id'],
+                        'quantity': self.rng.randint(0, 200),
+                    })
+            self.think()
+            offset += page
+            if offset >= result['total']:
+                break
+        if self.args.apply and self.rng.random() < 0.05:
+            self.timed('/mobile_inventory/apply_all', {'location_id': location['id']})
+
+    def standalone_session(self):
+        locations = self.timed('/inventory-count/locations', {}) or []
+        seeded = [l for l in locations if SEED_PREFIX in l['display_name']] or locations
+        if not seeded:
+            return
+        location = self.rng.choice(seeded)
+        items = self.timed('/inventory-count/items', {'location_id': location['id']}) or []
+        self.rng.shuffle(items)
+        for start in range(0, len(items), self.args.burst):
+            if time.time() >= self.deadline:
+                break
+            for quant in items[start:start + self.rng.randint(1, self.args.burst)]:
+                self.timed('/inventory-count/set_count', {
+                    'quant_id': quant['id'], 'qty': self.rng.randint(0, 200),
+                })
+            self.think()
+        if self.args.apply and self.rng.random() < 0.05:
+            self.timed('/inventory-count/validate', {})
+
+
+class LockSampler(threading.Thread):
+    """Poll pg_stat_activity for backends waiting on a lock."""
+
+    def __init__(self, dsn, interval=0.5):
+        super().__init__(name='lock-sampler', daemon=True)
+        self.dsn = dsn
+        self.interval = interval
+        self.samples = 0
+        self.waiting = []
+        self.stop = threading.Event()
+
+    def run(self):
+        import psycopg2  # optional, only with --pg-dsn
+        conn = psycopg2.connect(self.dsn)
+        conn.autocommit = True
+        with conn.cursor() as cr:
+            while not self.stop.is_set():
+                cr.execute("""
+                    SELECT count(*) FILTER (WHERE wait_event_type = 'Lock'),
+                           coalesce(max(extract(epoch FROM now() - query_start))
+                                    FILTER (WHERE wait_event_type = 'Lock'), 0)
+                      FROM pg_stat_activity
+                     WHERE datname = current_database()
+                """)
+                self.waiting.append(cr.fetchone())
+                self.samples += 1
+                self.stop.wait(self.interval)
+        conn.close()
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def run(args):
+    stats = Stats()
+    sampler = None
+    if args.pg_dsn:
+        sampler = LockSampler(args.pg_dsn)
+        sampler.start()
+    started = time.time()
+    deadline = started + args.duration
+    counters = []
+    for i in range(args.clients):
+        counter = Counter(i, args, stats, deadline)
+        counter.start()
+        counters.append(counter)
+        time.sleep(args.ramp_up / max(args.clients, 1))
+    for counter in counters:
+        counter.join()
+    elapsed = time.time() - started
+    if sampler:
+        sampler.stop.set()
+        sampler.join()
+
+    report = {'clients': args.clients, 'duration': elapsed, 'app': args.app, 'routes': {}}
+    for route, latencies in sorted(stats.latencies.items()):
+        report['routes'][route] = {
+            'requests': len(latencies),
+            'throughput': len(latencies) / elapsed,
+            'p50_ms': percentile(latencies, 50) * 1000,
+            'p95_ms': percentile(latencies, 95) * 1000,
+            'p99_ms': percentile(latencies, 99) * 1000,
+            'mean_ms': statistics.fmean(latencies) * 1000,
+            'errors': stats.errors.get(route, 0),
+            'serialization_failures': stats.serialization.get(route, 0),
+            'first_error': stats.error_samples.get(route),
+        }
+    if sampler and sampler.waiting:
+        report['lock_waits'] = {
+            'samples': sampler.samples,
+            'samples_with_waiters': sum(1 for count, _age in sampler.waiting if count),
+            'max_waiting_backends': max(count for count, _age in sampler.waiting),
+            'max_wait_s': float(max(age for _count, age in sampler.waiting)),
+        }
+
+    print('%-36s %8s %8s %8s %8s %8s %6s %6s' % (
+        'route', 'reqs', 'req/s', 'p50 ms', 'p95 ms', 'p99 ms', 'errors', 'serial'))
+    for route, row in report['routes'].items():
+        print('%-36s %8d %8.1f %8.0f %8.0f %8.0f %6d %6d' % (
+            route, row['requests'], row['throughput'], row['p50_ms'], row['p95_ms'],
+            row['p99_ms'], row['errors'], row['serialization_failures']))
+    if 'lock_waits' in report:
+        print('lock waits: %(samples_with_waiters)d/%(samples)d samples, '
+              'up to %(max_waiting_backends)d backends, longest %(max_wait_s).1fs'
+              % report['lock_waits'])
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    sub = parser.add_subparsers(dest='command', required=True)
+    for name in ('seed', 'run'):
+        p = sub.add_parser(name)
+        p.add_argument('--url', default='http://localhost:8069')
+        p.add_argument('--db', required=True)
+        p.add_argument('--login', required=True)
+        p.add_argument('--password', required=True)
+        p.add_argument('--seed', type=int, default=42)
+    p_seed = sub.choices['seed']
+    p_seed.add_argument('--locations', type=int, default=10)
+    p_seed.add_argument('--quants', type=int, default=500, help='products (quants per location)')
+    p_run = sub.choices['run']
+    p_run.add_argument('--clients', type=int, default=30)
+    p_run.add_argument('--duration', type=int, default=120, help='seconds')
+    p_run.add_argument('--ramp-up', type=float, default=10, help='seconds to start all clients')
+    p_run.add_argument('--app', choices=('mobile', 'standalone', 'both'), default='both')
+    p_run.add_argument('--burst', type=int, default=8, help='max counts typed per page')
+    p_run.add_argument('--think-time', type=float, default=2.0, help='max seconds between pages')
+    p_run.add_argument('--apply', action='store_true', help='also apply/validate now and then')
+    p_run.add_argument('--pg-dsn', help='libpq DSN to sample lock waits (needs psycopg2)')
+    p_run.add_argument('--json', help='write the report to this file')
+    args = parser.parse_args(argv)
+    (seed if args.command == 'seed' else run)(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())